@@ -1,5 +1,24 @@
 
+import argparse
+import csv
+import itertools
+import json
 import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.fasta import iter_fasta, open_source
+from bioinf.meltingtemp import METHODS, melting_temperature, oligo_segments, segment_tm
+
+# oligos are read, computed and written in blocks of this many rows
+BATCH_CHUNK_SIZE = 100000
+DEFAULT_BATCH_METHODS = ['simple', 'salt_adjusted', 'nearest_neighbor']
+
+_VALID_BYTES = np.zeros(256, dtype=bool)
+_VALID_BYTES[list(b'ATGCatgc')] = True
 
 def calculate_tm_simple(dna_sequence):
     
@@ -36,13 +55,217 @@ def calculate_tm_salt_adjusted(dna_sequence, na_concentration=50):
     return tm
 
 
+def calculate_tm(dna_sequence, method='simple', na_concentration=50, oligo_concentration=50):
+    """
+    Melting temperature with a selectable method (see bioinf.meltingtemp):
+    'simple' and 'salt_adjusted' are the two formulas above, 'basic' is the
+    LAB3/ex2.py formula and 'nearest_neighbor' the SantaLucia thermodynamic model.
+
+    Args:
+        dna_sequence: DNA sequence
+        method: One of bioinf.meltingtemp.METHODS
+        na_concentration: Na+ concentration in mM
+        oligo_concentration: Oligo concentration in nM (nearest_neighbor only)
+
+    Returns:
+        float: Tm in C
+    """
+    return melting_temperature(dna_sequence, method, na_concentration, oligo_concentration)
+
+
 def validate_dna_sequence(dna_sequence):
     
     valid_nucleotides = set('ATGCatgc')
     return all(nucleotide in valid_nucleotides for nucleotide in dna_sequence)
 
 
-def main():
+def validate_dna_sequences(sequences):
+    """
+    validate_dna_sequence for many sequences at once: they are joined into
+    one byte array, and a prefix sum of invalid bytes gives each sequence's
+    count from its two boundaries.
+
+    Args:
+        sequences: List of sequences
+
+    Returns:
+        numpy.ndarray: bool per sequence
+    """
+    lengths = np.fromiter(map(len, sequences), dtype=np.intp, count=len(sequences))
+    ends = np.cumsum(lengths)
+    data = np.frombuffer(''.join(sequences).encode('latin-1', 'replace'), dtype=np.uint8)
+    invalid = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum(~_VALID_BYTES[data], out=invalid[1:])
+    return invalid[ends] == invalid[ends - lengths]
+
+
+def iter_oligo_chunks(source, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Read oligos from FASTA, or from TSV lines 'name<TAB>sequence[<TAB>Na+ mM]'
+    or bare sequences (one per line). Blank lines, '#' comments and a
+    'name/sequence' header row are skipped.
+
+    Args:
+        source: Path, '-' for stdin, or an open text file
+        chunk_size: Oligos per chunk
+
+    Yields:
+        tuple: (names, sequences, Na+ array in mM with NaN where not given)
+               for up to chunk_size oligos
+    """
+    with open_source(source) as handle:
+        first = handle.readline()
+        lines = itertools.chain([first], handle)
+
+        if first.startswith('>'):
+            records = iter_fasta(lines)
+            while True:
+                chunk = list(itertools.islice(records, chunk_size))
+                if not chunk:
+                    return
+                names, sequences = zip(*chunk)
+                yield list(names), list(sequences), np.full(len(chunk), np.nan)
+
+        reader = csv.reader(lines, delimiter='\t', quoting=csv.QUOTE_NONE)
+        count = 0
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            rows = [row for row in rows
+                    if (len(row) > 1 or row and row[0].strip()) and not row[0].startswith('#')]
+            if count == 0 and rows and len(rows[0]) > 1 and rows[0][1].strip().lower() == 'sequence':
+                rows = rows[1:]
+            if not rows:
+                continue
+
+            names = [row[0] if len(row) > 1 else f"oligo_{count + i}" for i, row in enumerate(rows, 1)]
+            sequences = [(row[1] if len(row) > 1 else row[0]).strip() for row in rows]
+            na_column = np.array([row[2].strip() if len(row) > 2 else '' for row in rows])
+            na_values = np.full(len(rows), np.nan)
+            given = na_column != ''
+            try:
+                na_values[given] = na_column[given].astype(float)
+            except ValueError:
+                bad = next(name for name, na in zip(names, na_column) if na and not _is_number(na))
+                raise ValueError(f"oligo '{bad}': invalid Na+ concentration")
+            not_positive = given & ~(na_values > 0)
+            if not_positive.any():
+                bad = names[int(np.flatnonzero(not_positive)[0])]
+                raise ValueError(f"oligo '{bad}': Na+ concentration must be positive")
+
+            count += len(rows)
+            yield names, sequences, na_values
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _positive_float(text):
+    value = float(text)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be positive: {text}")
+    return value
+
+
+def batch_tm(sequences, methods=DEFAULT_BATCH_METHODS, na_concentrations=50, oligo_concentration=50):
+    """
+    Tm of many oligos with every requested method, computed over numpy arrays.
+
+    Args:
+        sequences: List of oligo sequences
+        methods: Methods from bioinf.meltingtemp.METHODS
+        na_concentrations: Na+ in mM, one value or one per oligo
+        oligo_concentration: Oligo concentration in nM
+
+    Returns:
+        tuple: (bool array of valid oligos, dict method -> Tm array, NaN for invalid oligos)
+    """
+    valid = validate_dna_sequences(sequences)
+    stats, starts, lengths = oligo_segments(sequences)
+    valid &= lengths > 0
+
+    results = {}
+    for method in methods:
+        tm = segment_tm(stats, starts, lengths, method, na_concentrations, oligo_concentration)
+        tm[~valid] = np.nan
+        results[method] = tm
+    return valid, results
+
+
+def _tm_column(values):
+    # rounded floats, None (empty cell / null) where the Tm is undefined
+    column = np.round(values, 2).tolist()
+    for i in np.flatnonzero(np.isnan(values)).tolist():
+        column[i] = None
+    return column
+
+
+def run_batch(source, out, methods=DEFAULT_BATCH_METHODS, na_concentration=50,
+              oligo_concentration=50, output_format='csv', chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Batch mode: stream Tm rows for every oligo of the source as CSV or JSON Lines.
+    Rows with a Na+ column use it instead of na_concentration.
+
+    Returns:
+        tuple: (number of oligos, number of invalid oligos)
+    """
+    columns = ['name', 'sequence', 'length', 'valid', 'na_mM'] + [f"tm_{method}" for method in methods]
+    writer = csv.writer(out, lineterminator='\n')
+    if output_format == 'csv':
+        writer.writerow(columns)
+
+    total = invalid = 0
+    for names, sequences, na_values in iter_oligo_chunks(source, chunk_size):
+        na = np.where(np.isnan(na_values), na_concentration, na_values)
+        valid, results = batch_tm(sequences, methods, na, oligo_concentration)
+
+        total += len(sequences)
+        invalid += int((~valid).sum())
+        tm_columns = [_tm_column(results[method]) for method in methods]
+        rows = zip(names, sequences, map(len, sequences), valid.tolist(), na.tolist(), *tm_columns)
+
+        if output_format == 'jsonl':
+            out.writelines(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+        else:
+            writer.writerows(rows)
+
+    return total, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DNA melting temperature (Tm) calculator")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="compute Tm for every oligo of a FASTA/TSV file ('-' for stdin) "
+                             "instead of asking for one sequence")
+    parser.add_argument('--methods', nargs='+', choices=METHODS, default=DEFAULT_BATCH_METHODS)
+    parser.add_argument('--na', type=_positive_float, default=50,
+                        help="Na+ concentration in mM for rows without their own value")
+    parser.add_argument('--oligo-nm', type=_positive_float, default=50, help="oligo concentration in nM")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    parser.add_argument('-o', '--output', help="output file for --batch (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        try:
+            if args.output:
+                with open(args.output, 'w', newline='') as out:
+                    total, invalid = run_batch(args.batch, out, args.methods, args.na,
+                                               args.oligo_nm, args.format)
+            else:
+                total, invalid = run_batch(args.batch, sys.stdout, args.methods, args.na,
+                                           args.oligo_nm, args.format)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{total} oligos, {invalid} invalid", file=sys.stderr)
+        return
+
     print("=" * 60)
     print("DNA Melting Temperature (Tm) Calculator")
     print("=" * 60)
@@ -97,6 +320,15 @@ def main():
     print(f"Na+ concentration: {na_conc} mM")
     print(f"Result: {tm_salt:.2f} C")
     print()
+
+    print("Method 3: Nearest-Neighbor (SantaLucia 1998)")
+    print("Formula: Tm = dH / (dS + R ln(Ct/4)) - 273.15, 50 nM oligo")
+    tm_nn = calculate_tm(dna_sequence, 'nearest_neighbor', na_conc)
+    if len(dna_sequence) < 2:
+        print("Result: not defined for a single base")
+    else:
+        print(f"Result: {tm_nn:.2f} C")
+    print()
     print("=" * 60)
 
 
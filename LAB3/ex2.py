@@ -1,27 +1,32 @@
 """
 Sliding Window Melting Temperature Calculator
 Calculates melting temperature (Tm) over a DNA sequence using a sliding window approach.
-Window size: 8 base pairs
+Window size: 8 base pairs (--sweep: many sizes from one prefix-sum pass)
 Input: FASTA file
 Output: Chart/plot of melting temperatures
 """
 
-import matplotlib.pyplot as plt
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.fasta import iter_fasta
+from bioinf.plotting import get_pyplot, plot_decimated
+from bioinf.meltingtemp import METHODS, tm_windows, window_sweep
 
 
 def read_fasta(filename):
     
     header = ""
-    sequence = ""
+    chunks = []
 
     try:
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-                if line.startswith('>'):
-                    header = line[1:]  # Remove '>' character
-                else:
-                    sequence += line.upper()
+        for header, chunk in iter_fasta(filename, upper=True):
+            chunks.append(chunk)
+        sequence = ''.join(chunks)
 
         if not sequence:
             raise ValueError("No sequence found in FASTA file")
@@ -58,25 +63,155 @@ def calculate_melting_temperature(sequence):
     return tm
 
 
-def sliding_window_tm(sequence, window_size=8):
-   
-    results = []
+def window_tm_values(sequence, window_size=8, step=1, method='basic', **conditions):
+    """
+    Tm of every window from prefix sums (bioinf.meltingtemp), O(n) in total.
+    The default 'basic' method is the calculate_melting_temperature formula;
+    'nearest_neighbor' uses the SantaLucia thermodynamic model.
+
+    Args:
+        sequence: DNA sequence
+        window_size: Window length
+        step: Distance between window starts
+        method: One of bioinf.meltingtemp.METHODS
+        conditions: na (mM) and oligo_concentration (nM)
+
+    Returns:
+        tuple: numpy arrays (positions, tm_values)
+    """
+    return tm_windows(sequence, window_size, method, step, **conditions)
+
+
+class TmProfile:
+    """
+    Result of sliding_window_tm(..., vectorized=True): positions and Tm values
+    as arrays. Rows read like the (position, window, tm) tuples of the list
+    mode, but each window string is sliced only when its row is read.
+    """
+
+    def __init__(self, sequence, window_size, positions, tm_values):
+        self.sequence = sequence
+        self.window_size = window_size
+        self.positions = positions
+        self.tm_values = tm_values
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, i):
+        pos = int(self.positions[i])
+        return pos, self.sequence[pos:pos + self.window_size], float(self.tm_values[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def sliding_window_tm(sequence, window_size=8, vectorized=False, method='basic', **conditions):
+    """
+    Melting temperature of every window of the sequence.
+
+    Args:
+        sequence: DNA sequence
+        window_size: Window length
+        vectorized: Return a TmProfile (arrays) instead of a list of tuples
+        method: One of bioinf.meltingtemp.METHODS
+        conditions: na (mM) and oligo_concentration (nM)
+
+    Returns:
+        list or TmProfile: (position, window sequence, Tm) rows
+    """
     sequence = sequence.upper()
     seq_length = len(sequence)
 
     if seq_length < window_size:
         print(f"Warning: Sequence length ({seq_length}) is shorter than window size ({window_size})")
         print(f"Calculating Tm for the entire sequence")
-        tm = calculate_melting_temperature(sequence)
-        results.append((0, sequence, tm))
-        return results
+        window_size = seq_length
+        if seq_length == 0:
+            return TmProfile(sequence, 0, [0], [0.0]) if vectorized else [(0, sequence, 0.0)]
+
+    positions, tm_values = window_tm_values(sequence, window_size, method=method, **conditions)
+    profile = TmProfile(sequence, window_size, positions, tm_values)
+    if vectorized:
+        return profile
+    return list(profile)
+
+
+def parse_window_sizes(spec):
+    """
+    Window sizes from a range '8-500', a range with a stride '8-500:4' or a
+    list '8,16,32'.
+
+    Returns:
+        list: window sizes in the given order
+    """
+    sizes = []
+    for part in spec.split(','):
+        part, _, stride = part.partition(':')
+        first, dash, last = part.partition('-')
+        if dash:
+            sizes.extend(range(int(first), int(last) + 1, int(stride or 1)))
+        else:
+            sizes.append(int(first))
+    if not sizes or min(sizes) < 1:
+        raise ValueError(f"Invalid window sizes '{spec}'")
+    return sizes
+
+
+def sweep_window_sizes(sequence, window_sizes, method='basic', step=1, **conditions):
+    """
+    Tm and GC profiles for every window size, all read from one set of prefix
+    sums (bioinf.meltingtemp.window_sweep) instead of one scan per size.
+
+    Args:
+        sequence: DNA sequence
+        window_sizes: Window lengths
+        method: One of bioinf.meltingtemp.METHODS
+        step: Distance between window starts
+        conditions: na (mM) and oligo_concentration (nM)
+
+    Returns:
+        tuple: (window sizes, positions, tm, gc); tm and gc are float32 arrays
+               of shape (window sizes, positions), NaN past the sequence end
+    """
+    window_sizes = np.asarray(window_sizes, dtype=np.int64)
+    positions, tm, gc = window_sweep(sequence.upper(), window_sizes, method, step, **conditions)
+    return window_sizes, positions, tm, gc
+
+
+def save_sweep(output_file, window_sizes, positions, tm, gc):
+    """Write a sweep as a .npz file with arrays window_sizes, positions, tm and gc."""
+    np.savez(output_file, window_sizes=window_sizes, positions=positions, tm=tm, gc=gc)
+
+
+def display_sweep(header, sequence, window_sizes, tm, gc):
+    
+    print("\n" + "="*70)
+    print("MELTING TEMPERATURE ANALYSIS - WINDOW SIZE SWEEP")
+    print("="*70)
+    print(f"\nSequence Header: {header}")
+    print(f"Sequence Length: {len(sequence)} bp")
+    print(f"Window Sizes: {len(window_sizes)} ({window_sizes.min()} - {window_sizes.max()} bp)")
+    print("\n" + "-"*70)
+    print(f"{'Window':<10} {'Windows':<10} {'Avg Tm':>8} {'Min Tm':>8} {'Max Tm':>8} {'Avg GC%':>8}")
+    print("-"*70)
 
-    for i in range(seq_length - window_size + 1):
-        window = sequence[i:i + window_size]
-        tm = calculate_melting_temperature(window)
-        results.append((i, window, tm))
+    for window_size, tm_row, gc_row in zip(window_sizes.tolist(), tm, gc):
+        windows = int(np.count_nonzero(~np.isnan(gc_row)))
+        if not np.any(~np.isnan(tm_row)):
+            print(f"{window_size:<10} {windows:<10} {'-':>8} {'-':>8} {'-':>8} {'-':>8}")
+            continue
+        print(f"{window_size:<10} {windows:<10} {np.nanmean(tm_row):>8.2f} {np.nanmin(tm_row):>8.2f} "
+              f"{np.nanmax(tm_row):>8.2f} {100 * np.nanmean(gc_row):>8.2f}")
+    print("="*70 + "\n")
 
-    return results
+
+def _columns(results):
+    """Positions and Tm values of list or TmProfile results, as arrays."""
+    if isinstance(results, TmProfile):
+        return np.asarray(results.positions), np.asarray(results.tm_values)
+    return np.array([pos for pos, _, _ in results]), np.array([tm for _, _, tm in results])
 
 
 def display_results(header, sequence, results, window_size):
@@ -95,11 +230,12 @@ def display_results(header, sequence, results, window_size):
     for pos, window, tm in results:
         print(f"{pos:<10} {window:<15} {tm:>6.2f}")
 
-    if results:
-        tm_values = [tm for _, _, tm in results]
-        avg_tm = sum(tm_values) / len(tm_values)
-        min_tm = min(tm_values)
-        max_tm = max(tm_values)
+    if len(results):
+        _, tm_values = _columns(results)
+        # windows with non-ACGT bases have no nearest-neighbor Tm (NaN)
+        avg_tm = np.nanmean(tm_values)
+        min_tm = np.nanmin(tm_values)
+        max_tm = np.nanmax(tm_values)
 
         print("\n" + "-"*70)
         print("STATISTICS:")
@@ -109,22 +245,23 @@ def display_results(header, sequence, results, window_size):
         print("="*70 + "\n")
 
 
-def plot_melting_temperatures(header, results, window_size):
+def plot_melting_temperatures(header, results, window_size, output_file=None):
+    plt = get_pyplot('Agg' if output_file else None)
     
-    if not results:
+    if not len(results):
         print("No data to plot.")
         return
 
     
-    positions = [pos for pos, _, _ in results]
-    tm_values = [tm for _, _, tm in results]
+    positions, tm_values = _columns(results)
 
   
-    avg_tm = sum(tm_values) / len(tm_values)
+    avg_tm = np.nanmean(tm_values)
 
    
     plt.figure(figsize=(12, 6))
-    plt.plot(positions, tm_values, 'b-', linewidth=2, label='Melting Temperature')
+    # reduced to the plot's pixel resolution, refined when zooming in
+    plot_decimated(positions, tm_values, 'b-', linewidth=2, label='Melting Temperature')
     plt.axhline(y=avg_tm, color='r', linestyle='--', linewidth=1, label=f'Average Tm: {avg_tm:.2f}°C')
 
    
@@ -135,39 +272,68 @@ def plot_melting_temperatures(header, results, window_size):
     plt.legend()
 
    
-    y_margin = (max(tm_values) - min(tm_values)) * 0.1
-    plt.ylim(min(tm_values) - y_margin, max(tm_values) + y_margin)
+    y_margin = (np.nanmax(tm_values) - np.nanmin(tm_values)) * 0.1
+    plt.ylim(np.nanmin(tm_values) - y_margin, np.nanmax(tm_values) + y_margin)
 
     plt.tight_layout()
-    plt.show()
-
-    print("\nChart displayed successfully!")
-
-
-def main():
-   
-    import sys
+    if output_file:
+        plt.savefig(output_file, dpi=150)
+        plt.close()
+        print(f"\nChart saved to {output_file}")
+    else:
+        plt.show()
+        print("\nChart displayed successfully!")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sliding window melting temperature calculator")
+    parser.add_argument('fasta', nargs='?', help="FASTA file (asked for when missing)")
+    parser.add_argument('method', nargs='?', default='basic',
+                        help=f"Tm method: {', '.join(METHODS)} (default: basic)")
+    parser.add_argument('--window', type=int, default=8, help="window size (default: 8)")
+    parser.add_argument('--sweep', metavar='SIZES',
+                        help="profiles for many window sizes at once, e.g. 8-500, 8-500:4 or 8,16,32")
+    parser.add_argument('--step', type=int, default=1, help="distance between window starts for --sweep")
+    parser.add_argument('-o', '--output', metavar='NPZ',
+                        help="with --sweep: save the window size x position Tm/GC arrays")
+    args = parser.parse_args(argv)
 
     print("\n" + "="*70)
     print("MELTING TEMPERATURE CALCULATOR - SLIDING WINDOW METHOD")
     print("="*70)
 
    
-    if len(sys.argv) > 1:
-        fasta_file = sys.argv[1]
+    if args.fasta:
+        fasta_file = args.fasta
     else:
         fasta_file = input("\nEnter the path to the FASTA file: ").strip()
 
+    # optional second argument: Tm method (default: the formula above)
+    method = args.method
+    if method not in METHODS:
+        print(f"\nError: Unknown method '{method}'. Choose one of: {', '.join(METHODS)}")
+        sys.exit(1)
+
     try:
        
         print(f"\nReading FASTA file: {fasta_file}")
         header, sequence = read_fasta(fasta_file)
 
+        if args.sweep:
+            window_sizes = parse_window_sizes(args.sweep)
+            print(f"Calculating melting temperatures for {len(window_sizes)} window sizes ({method} method)...")
+            window_sizes, positions, tm, gc = sweep_window_sizes(sequence, window_sizes, method, args.step)
+            display_sweep(header, sequence, window_sizes, tm, gc)
+            if args.output:
+                save_sweep(args.output, window_sizes, positions, tm, gc)
+                print(f"Sweep ({tm.shape[0]} x {tm.shape[1]}) saved to {args.output}")
+            return
+
        
-        window_size = 8
+        window_size = args.window
 
-        print(f"Calculating melting temperatures with window size {window_size}...")
-        results = sliding_window_tm(sequence, window_size)
+        print(f"Calculating melting temperatures with window size {window_size} ({method} method)...")
+        results = sliding_window_tm(sequence, window_size, vectorized=True, method=method)
 
         display_results(header, sequence, results, window_size)
 
@@ -0,0 +1,224 @@
+"""
+Scaling benchmarks for the lab analyses.
+
+Every analysis is run on synthetic random genomes of growing size (1 kb to
+10 Mb by default). Wall time and peak traced memory are recorded per size and a
+scaling exponent is fitted (slope of log(cost) against log(size)). Sizes whose
+predicted run time exceeds the time budget are skipped, so quadratic
+analyses stop early instead of running for hours.
+
+Usage:
+    python benchmarks/scaling.py -o results.json
+    python benchmarks/scaling.py --only count_codons compute_frequencies
+    python benchmarks/scaling.py --compare baseline.json -o results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.labs import load_lab
+
+# 1-2-5 series from 1 kb to 10 Mb
+DEFAULT_SIZES = [step * 10 ** power for power in range(3, 7) for step in (1, 2, 5)] + [10_000_000]
+
+
+def generate_random_dna(length, seed=0):
+    """Random ACGT string built with numpy (same idea as lab8 generate_random_dna)."""
+    codes = np.random.default_rng(seed).integers(0, 4, length, dtype=np.uint8)
+    return np.frombuffer(b'ACGT', dtype=np.uint8)[codes].tobytes().decode('ascii')
+
+
+# Each benchmark: (module path, function name, initial complexity guess, input builder, call)
+def _samples_for(sequence, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(sequence)
+    count = max(1, 5 * n // 125)
+    samples = []
+    for _ in range(count):
+        length = min(n, int(rng.integers(100, 151)))
+        start = int(rng.integers(0, n - length + 1))
+        samples.append(sequence[start:start + length])
+    return samples
+
+
+BENCHMARKS = {
+    'detect_repetitions': ('lab7/dna_repetition_detector.py', 2,
+                           lambda seq: (seq,),
+                           lambda mod, seq: mod.detect_repetitions(seq, 6, 10)),
+    'find_inverted_repeats': ('lab8/detect_transposons.py', 1,
+                              lambda seq: (seq,),
+                              lambda mod, seq: mod.find_inverted_repeats(seq)),
+    'detect_transposons': ('lab8/detect_transposons.py', 1,
+                           lambda seq: (seq,),
+                           lambda mod, seq: mod.detect_transposons(seq)),
+    'reconstruct_sequence': ('lab5/ex1.py', 2,
+                             lambda seq: (_samples_for(seq),),
+                             lambda mod, samples: mod.reconstruct_sequence(samples, 20)),
+    'sliding_window_tm': ('LAB3/ex2.py', 1,
+                          lambda seq: (seq,),
+                          lambda mod, seq: mod.sliding_window_tm(seq, 8)),
+    'compute_frequencies': ('lab2/ex3.py', 1,
+                            lambda seq: (seq,),
+                            lambda mod, seq: mod.compute_frequencies(seq, 30)),
+    'count_codons': ('lab4/ex2.py', 1,
+                     lambda seq: (seq,),
+                     lambda mod, seq: mod.count_codons(seq)),
+}
+
+
+def measure(call, module, arguments, trace_memory):
+    """Run one benchmark call and return (seconds, peak traced bytes or None)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        call(module, *arguments)
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if trace_memory:
+            tracemalloc.start()
+            try:
+                call(module, *arguments)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return seconds, peak
+
+
+def fit_exponent(sizes, values):
+    """Least-squares slope of log(value) against log(size)."""
+    points = [(math.log(n), math.log(v)) for n, v in zip(sizes, values) if v and v > 0]
+    if len(points) < 2:
+        return None
+    xs, ys = zip(*points)
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+def run_benchmark(name, sizes, max_seconds, trace_memory, seed=0):
+    relative_path, guess, build, call = BENCHMARKS[name]
+    module = load_lab(relative_path)
+
+    result = {'module': relative_path, 'sizes': [], 'seconds': [], 'peak_bytes': [], 'skipped': []}
+    for size in sorted(sizes):
+        if result['seconds']:
+            exponent = fit_exponent(result['sizes'], result['seconds']) or guess
+            exponent = max(exponent, guess if len(result['seconds']) < 2 else 1.0)
+            predicted = result['seconds'][-1] * (size / result['sizes'][-1]) ** exponent
+            if predicted > max_seconds:
+                result['skipped'].append(size)
+                continue
+
+        arguments = build(generate_random_dna(size, seed))
+        seconds, peak = measure(call, module, arguments, trace_memory)
+        result['sizes'].append(size)
+        result['seconds'].append(seconds)
+        result['peak_bytes'].append(peak)
+        print(f"  {name:<24} {size:>10,} bp  {seconds:>9.4f} s"
+              + (f"  {peak / 1e6:>9.2f} MB" if peak is not None else ''))
+
+    result['time_exponent'] = fit_exponent(result['sizes'], result['seconds'])
+    result['memory_exponent'] = (fit_exponent(result['sizes'], result['peak_bytes'])
+                                 if trace_memory else None)
+    return result
+
+
+def compare(results, baseline, threshold, min_seconds=0.01):
+    """
+    Compare results against a baseline run. Timings below min_seconds are
+    too noisy to compare and are ignored.
+
+    Returns:
+        list: (benchmark, size, metric, baseline value, new value) for every regression
+    """
+    regressions = []
+    for name, new in results['benchmarks'].items():
+        old = baseline.get('benchmarks', {}).get(name)
+        if not old:
+            continue
+        old_by_size = {size: (sec, peak) for size, sec, peak
+                       in zip(old['sizes'], old['seconds'], old['peak_bytes'])}
+        for size, sec, peak in zip(new['sizes'], new['seconds'], new['peak_bytes']):
+            if size not in old_by_size:
+                continue
+            old_sec, old_peak = old_by_size[size]
+            if old_sec and old_sec >= min_seconds and sec > old_sec * threshold:
+                regressions.append((name, size, 'seconds', old_sec, sec))
+            if old_peak and peak and peak > old_peak * threshold:
+                regressions.append((name, size, 'peak_bytes', old_peak, peak))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmarks for the lab analyses")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="sequence lengths in bp")
+    parser.add_argument('--max-seconds', type=float, default=10.0,
+                        help="skip sizes predicted to take longer than this")
+    parser.add_argument('--no-memory', action='store_true', help="do not trace peak memory")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE', help="baseline JSON to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="ratio over the baseline counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'max_seconds': args.max_seconds,
+        'benchmarks': {}
+    }
+
+    for name in args.only or sorted(BENCHMARKS):
+        print(f"Running {name}...")
+        results['benchmarks'][name] = run_benchmark(name, args.sizes, args.max_seconds,
+                                                    not args.no_memory, args.seed)
+
+    print(f"\n{'Benchmark':<24} {'Time exp.':>10} {'Memory exp.':>12}")
+    print("-" * 48)
+    for name, result in results['benchmarks'].items():
+        time_exp = result['time_exponent']
+        mem_exp = result['memory_exponent']
+        print(f"{name:<24} {time_exp if time_exp is not None else float('nan'):>10.2f} "
+              f"{mem_exp if mem_exp is not None else float('nan'):>12.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for name, size, metric, old, new in regressions:
+                print(f"  {name} @ {size:,} bp: {metric} {old:.4g} -> {new:.4g} ({new / old:.2f}x)")
+            return 1
+        print(f"\nNo regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,5 @@
+import sys
+
+from bioinf.cli import main
+
+sys.exit(main())
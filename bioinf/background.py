@@ -0,0 +1,164 @@
+"""
+Run long analyses off the Tk main thread.
+
+A job is a generator function that does its work chunk by chunk, yields
+(done, total) after every chunk and returns its result. done and total must
+be in the same unit; jobs that read a file report bytes consumed against the
+file size (bioinf.fasta.ProgressFile), not bases. BackgroundTask runs
+the job on a worker thread and hands progress, the result or the error back
+through a queue that the GUI polls with root.after, so widgets are only ever
+touched from the main thread. cancel() sets a flag that the worker checks
+before every chunk; the generator is then closed, so no further chunk is
+computed and its cleanup (open files, process pools) runs.
+"""
+
+import queue
+import threading
+
+POLL_INTERVAL = 50  # ms
+CHUNK_SIZE = 1 << 20  # bases per step of the GUI jobs
+
+
+class BackgroundTask:
+    """
+    One job running on a daemon worker thread.
+
+    Args:
+        root: Any Tk widget (used for after())
+        job: Generator function; called as job(*args)
+        on_progress: Called with (done, total) on the main thread
+        on_done: Called with the job's return value
+        on_error: Called with the exception raised by the job
+        on_cancel: Called without arguments once the worker has stopped
+    """
+
+    def __init__(self, root, job, *args, on_progress=None, on_done=None, on_error=None,
+                 on_cancel=None, poll_interval=POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.finished = False
+        self._callbacks = {'progress': on_progress, 'done': on_done,
+                           'error': on_error, 'cancelled': on_cancel}
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(job, args), daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_interval, self._poll)
+
+    def _run(self, job, args):
+        try:
+            steps = job(*args)
+            while True:
+                if self._cancel.is_set():
+                    steps.close()
+                    self._messages.put(('cancelled', None))
+                    return
+                try:
+                    progress = next(steps)
+                except StopIteration as stop:
+                    self._messages.put(('done', stop.value))
+                    return
+                self._messages.put(('progress', progress))
+        except Exception as e:
+            self._messages.put(('error', e))
+
+    def cancel(self):
+        """Ask the worker to stop before its next chunk."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _poll(self):
+        progress = None
+        while True:
+            try:
+                kind, value = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                # only the latest progress matters when several are waiting
+                progress = value
+                continue
+
+            self.finished = True
+            if kind == 'done' and self.cancelled:
+                kind = 'cancelled'
+            callback = self._callbacks[kind]
+            if callback is None:
+                return
+            if kind == 'cancelled':
+                callback()
+            else:
+                callback(value)
+            return
+
+        if progress is not None and self._callbacks['progress'] is not None:
+            self._callbacks['progress'](*progress)
+        self.root.after(self.poll_interval, self._poll)
+
+
+class TaskPanel:
+    """
+    Progress bar, status text and Cancel button for one background job at a
+    time. Call pack()/grid() on .frame to place it.
+    """
+
+    def __init__(self, parent):
+        from tkinter import ttk
+
+        self.root = parent
+        self.task = None
+        self.frame = ttk.Frame(parent)
+        self.bar = ttk.Progressbar(self.frame, mode='determinate', maximum=1)
+        self.bar.pack(side='left', fill='x', expand=True, padx=5)
+        self.label = ttk.Label(self.frame, text="", width=14)
+        self.label.pack(side='left', padx=5)
+        self.cancel_btn = ttk.Button(self.frame, text="Cancel", command=self.cancel, state='disabled')
+        self.cancel_btn.pack(side='left', padx=5)
+
+    @property
+    def busy(self):
+        return self.task is not None and not self.task.finished
+
+    def start(self, job, *args, on_done=None, on_error=None, on_finish=None):
+        """
+        Run job(*args) in the background. on_finish is called (before
+        on_done/on_error) whenever the job ends, including on cancel.
+
+        Returns:
+            BackgroundTask, or None if a job is already running
+        """
+        if self.busy:
+            return None
+
+        def finish(callback, text, complete=False):
+            def handler(*value):
+                self.cancel_btn.config(state='disabled')
+                self.label.config(text=text)
+                if complete:
+                    self.bar.config(value=self.bar.cget('maximum'))
+                if on_finish is not None:
+                    on_finish()
+                if callback is not None:
+                    callback(*value)
+            return handler
+
+        self.bar.config(maximum=1, value=0)
+        self.label.config(text="Working...")
+        self.cancel_btn.config(state='normal')
+        self.task = BackgroundTask(self.root, job, *args, on_progress=self._progress,
+                                   on_done=finish(on_done, "Done", complete=True),
+                                   on_error=finish(on_error, "Failed"),
+                                   on_cancel=finish(None, "Cancelled"))
+        return self.task
+
+    def _progress(self, done, total):
+        self.bar.config(maximum=max(total, 1), value=min(done, total))
+        self.label.config(text=f"{100 * done / max(total, 1):.0f}%")
+
+    def cancel(self):
+        if self.busy:
+            self.task.cancel()
+            self.label.config(text="Cancelling...")
@@ -0,0 +1,175 @@
+"""
+On-disk cache of parsed genomes.
+
+Entries are keyed by the absolute path, size, modification time and a hash of
+the file content, so an edited or replaced file never hits a stale entry.
+The cache directory is kept under a size limit by evicting the least recently
+used entries (a hit refreshes the entry's modification time).
+
+Settings can come from the environment:
+    BIOINF_CACHE_DIR        cache directory (default: ~/.cache/bioinf)
+    BIOINF_CACHE_MAX_MB     size limit in MB (default: 1024)
+    BIOINF_NO_CACHE         set to 1 to disable the cache
+"""
+
+import hashlib
+import os
+import tempfile
+
+from bioinf.fasta import read_sequence
+
+_settings = {
+    'enabled': os.environ.get('BIOINF_NO_CACHE', '') in ('', '0'),
+    'directory': os.environ.get('BIOINF_CACHE_DIR',
+                                os.path.join(os.path.expanduser('~'), '.cache', 'bioinf')),
+    'max_bytes': int(float(os.environ.get('BIOINF_CACHE_MAX_MB', 1024)) * 1024 * 1024),
+}
+
+
+def configure(enabled=None, directory=None, max_bytes=None):
+    """Change the cache settings for the current process."""
+    if enabled is not None:
+        _settings['enabled'] = enabled
+    if directory is not None:
+        _settings['directory'] = directory
+    if max_bytes is not None:
+        _settings['max_bytes'] = max_bytes
+
+
+def is_enabled():
+    return _settings['enabled']
+
+
+def cache_dir():
+    return _settings['directory']
+
+
+def clear_cache():
+    """Delete every cache entry and return how many were removed."""
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """BLAKE2b hash of a file's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(path, kind):
+    """
+    Key of the cache entry of a given kind ('sequence', 'packed', ...) for a file.
+    """
+    stat = os.stat(path)
+    parts = [os.path.abspath(path), str(stat.st_size), str(stat.st_mtime_ns), file_digest(path), kind]
+    return hashlib.blake2b('\0'.join(parts).encode(), digest_size=20).hexdigest()
+
+
+def cache_file(path, kind, suffix):
+    """Path of the cache entry for a file (the entry may not exist yet)."""
+    return os.path.join(cache_dir(), cache_key(path, kind) + suffix)
+
+
+def lookup(entry):
+    """Return True and mark the entry as recently used if it exists."""
+    if not os.path.exists(entry):
+        return False
+    os.utime(entry)
+    return True
+
+
+def store(entry, write):
+    """
+    Create a cache entry atomically by calling write(temporary_path), then
+    evict old entries to stay under the size limit.
+    """
+    directory = os.path.dirname(entry)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, entry)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict(keep=entry)
+
+
+def evict(keep=None):
+    """Remove least recently used entries until the cache fits its size limit."""
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and not name.endswith('.tmp'):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= _settings['max_bytes']:
+            break
+        if path == keep:
+            continue
+        os.remove(path)
+        total -= size
+
+
+def cached_sequence(path, upper=False):
+    """
+    read_sequence() with a cache: the parsed sequence is stored as a .npy byte
+    array and later runs load it without parsing the FASTA file again.
+    Sequences with characters outside latin-1 are returned without caching.
+    """
+    if not is_enabled():
+        return read_sequence(path, upper)
+
+    import numpy as np
+
+    entry = cache_file(path, 'sequence-upper' if upper else 'sequence', '.npy')
+    if lookup(entry):
+        return np.load(entry).tobytes().decode('latin-1')
+
+    sequence = read_sequence(path, upper)
+    try:
+        data = sequence.encode('latin-1')
+    except UnicodeEncodeError:
+        # one byte per character cannot hold it; such files are just not cached
+        return sequence
+
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.frombuffer(data, dtype=np.uint8))
+
+    store(entry, write)
+    return sequence
+
+
+def add_cache_arguments(parser):
+    """Add the --no-cache / --clear-cache options to an argparse parser."""
+    parser.add_argument('--no-cache', action='store_true',
+                        help="do not read or write the parsed-genome cache")
+    parser.add_argument('--clear-cache', action='store_true',
+                        help="delete all cached genomes before running")
+
+
+def apply_cache_arguments(args):
+    if args.clear_cache:
+        removed = clear_cache()
+        print(f"Cleared {removed} cached genome(s) from {cache_dir()}")
+    if args.no_cache:
+        configure(enabled=False)
@@ -0,0 +1,290 @@
+"""
+Out-of-core sliding-window statistics.
+
+The FASTA file is read in pieces of about chunk_size bases. Every window that
+fits in the buffered sequence is computed with the same prefix-sum engines as
+the in-memory path (bioinf.windows, bioinf.meltingtemp), written out, and
+dropped; only the tail that later windows still need (the window - 1 halo,
+aligned to the step) is carried over to the next piece. Memory therefore
+depends on chunk_size, not on the genome size, and the values are identical
+to computing the whole sequence at once.
+
+Binary window file layout (little endian):
+    magic     8 bytes  b'BIOWIN\\x00\\x02'
+    window    uint32
+    step      uint32
+    columns   uint32
+    itemsize  uint32   4 (float32) or 8 (float64)
+    rows      uint64
+    records   uint64
+    names     per column: uint16 name length, UTF-8 name; NUL padded to a
+              multiple of 8 bytes
+    values    rows x columns floats, row-major
+    records   per record: uint64 first row, uint64 rows, uint16 name length, name
+"""
+
+import struct
+
+import numpy as np
+
+from bioinf.fasta import iter_fasta_pieces
+from bioinf.meltingtemp import DEFAULT_NA, DEFAULT_OLIGO_CONCENTRATION, tm_windows
+from bioinf.windows import window_counts
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+COLUMNS = ('A', 'C', 'G', 'T', 'GC', 'tm')
+
+MAGIC = b'BIOWIN\x00\x02'
+_HEADER = struct.Struct('<8sIIIIQQ')
+_RECORD = struct.Struct('<QQH')
+_NAME_LENGTH = struct.Struct('<H')
+
+
+def iter_window_chunks(source, window_size, step=1, chunk_size=DEFAULT_CHUNK_SIZE, join_records=False,
+                       keep_empty=False):
+    """
+    Split a FASTA file into overlapping pieces whose windows, taken from
+    position 0 every `step`, are exactly the windows of the whole record.
+    The first piece of every record starts at 0.
+
+    Args:
+        source: FASTA path or '-'
+        window_size: Window length
+        step: Distance between window starts
+        chunk_size: Bases read before the buffered windows are emitted
+        join_records: Treat all records as one sequence (like read_sequence)
+        keep_empty: Yield (name, 0, piece) once for a record shorter than the
+                    window (the piece then has no complete window)
+
+    Yields:
+        tuple: (record name, start of the first window, sequence piece)
+    """
+    if window_size < 1 or step < 1:
+        raise ValueError("window size and step must be at least 1")
+
+    name = None
+    current = None
+    pending = ''
+    pending_start = 0
+    skip = 0  # bases still to drop when the next window starts past the buffer (step > window)
+    emitted = False
+
+    def emit(final):
+        nonlocal pending, pending_start, skip, emitted
+        if len(pending) < window_size:
+            if final and keep_empty and not emitted:
+                emitted = True
+                return name, 0, pending
+            return None
+        emitted = True
+        windows = (len(pending) - window_size) // step + 1
+        piece = (name, pending_start, pending)
+        consumed = windows * step
+        skip = max(consumed - len(pending), 0)
+        pending = '' if final else pending[consumed:]
+        pending_start += consumed
+        return piece
+
+    for record, header, piece in iter_fasta_pieces(source, chunk_size, upper=True, keep_empty=keep_empty):
+        if record != current and not (join_records and current is not None):
+            if current is not None:
+                chunk = emit(True)
+                if chunk:
+                    yield chunk
+            name = header.split(None, 1)[0] if header.strip() else f"record_{record + 1}"
+            pending, pending_start, skip, emitted = '', 0, 0, False
+        current = record
+
+        if skip:
+            dropped = min(skip, len(piece))
+            piece = piece[dropped:]
+            skip -= dropped
+        pending += piece
+        if len(pending) >= chunk_size + window_size:
+            chunk = emit(False)
+            if chunk:
+                yield chunk
+
+    if current is not None:
+        chunk = emit(True)
+        if chunk:
+            yield chunk
+
+
+def chunk_columns(sequence, window_size, step=1, columns=COLUMNS, tm_method='basic',
+                  na=DEFAULT_NA, oligo_concentration=DEFAULT_OLIGO_CONCENTRATION):
+    """
+    Window statistics of one piece, all windows starting at 0, step, ...
+
+    Args:
+        sequence: Sequence piece (upper case)
+        columns: Names from COLUMNS: base frequencies 'A'/'C'/'G'/'T',
+                 'GC' fraction and 'tm' (with tm_method)
+
+    Returns:
+        numpy.ndarray: float64 array of shape (windows, len(columns))
+    """
+    _, counts = window_counts(sequence, window_size, ('A', 'C', 'G', 'T'), step)
+    values = np.empty((counts.shape[1], len(columns)))
+    for i, column in enumerate(columns):
+        if column in ('A', 'C', 'G', 'T'):
+            values[:, i] = counts['ACGT'.index(column)] / window_size
+        elif column == 'GC':
+            values[:, i] = (counts[1] + counts[2]) / window_size
+        elif column == 'tm':
+            values[:, i] = tm_windows(sequence, window_size, tm_method, step, na, oligo_concentration)[1]
+        else:
+            raise ValueError(f"Unknown column '{column}', expected one of {', '.join(COLUMNS)}")
+    return values
+
+
+def column_names(columns, tm_method='basic'):
+    return [f"tm_{tm_method}" if column == 'tm' else column for column in columns]
+
+
+class BedGraphWriter:
+    """
+    One bedGraph file per column. A window starting at `start` is written as
+    the interval [start, start + min(step, window)), so consecutive windows do
+    not overlap.
+    """
+
+    def __init__(self, path, names, window_size, step):
+        self.span = min(step, window_size)
+        # repr() is the shortest text that reads back as the same float
+        self.format = "%s\t%d\t%d\t%r\n"
+        if len(names) == 1:
+            paths = [path]
+        else:
+            stem, dot, suffix = path.rpartition('.')
+            paths = [f"{stem}.{name}.{suffix}" if dot else f"{path}.{name}" for name in names]
+        self.paths = paths
+        self.files = [open(p, 'w') for p in paths]
+        for f, name in zip(self.files, names):
+            f.write(f'track type=bedGraph name="{name}"\n')
+
+    def write(self, record, starts, values):
+        ends = starts + self.span
+        for column, f in enumerate(self.files):
+            f.writelines(self.format % (record, start, end, value)
+                         for start, end, value in zip(starts.tolist(), ends.tolist(),
+                                                      values[:, column].tolist())
+                         if value == value)  # NaN windows are left out
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
+
+class WindowFileWriter:
+    """Writer for the binary window file (see the module docstring)."""
+
+    def __init__(self, path, names, window_size, step, dtype=np.float32):
+        self.path = path
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.names = list(names)
+        self.window_size = window_size
+        self.step = step
+        self.rows = 0
+        self.records = []
+        self.file = open(path, 'wb')
+        self._write_header()
+        names = b''.join(_NAME_LENGTH.pack(len(encoded)) + encoded
+                         for encoded in (name.encode('utf-8') for name in self.names))
+        # keeps the values aligned to their item size
+        self.file.write(names.ljust(-(-len(names) // 8) * 8, b'\0'))
+
+    def _write_header(self):
+        self.file.write(_HEADER.pack(MAGIC, self.window_size, self.step, len(self.names),
+                                     self.dtype.itemsize, self.rows, len(self.records)))
+
+    def write(self, record, starts, values):
+        if not self.records or self.records[-1][0] != record:
+            self.records.append([record, self.rows, 0])
+        self.records[-1][2] += len(values)
+        self.rows += len(values)
+        self.file.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+
+    def close(self):
+        for name, first_row, rows in self.records:
+            encoded = name.encode('utf-8')
+            self.file.write(_RECORD.pack(first_row, rows, len(encoded)) + encoded)
+        self.file.seek(0)
+        self._write_header()
+        self.file.close()
+
+
+def read_window_file(path):
+    """
+    Read a binary window file.
+
+    Returns:
+        tuple: (info dict with window, step and column names,
+                dict record name -> (window starts, values array of shape (rows, columns)))
+    """
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    magic, window_size, step, n_columns, itemsize, rows, n_records = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a window file")
+
+    offset = _HEADER.size
+    names = []
+    for _ in range(n_columns):
+        length, = _NAME_LENGTH.unpack_from(data, offset)
+        offset += _NAME_LENGTH.size
+        names.append(bytes(data[offset:offset + length]).decode('utf-8'))
+        offset += length
+    offset = _HEADER.size + -(-(offset - _HEADER.size) // 8) * 8
+    dtype = np.dtype('<f4' if itemsize == 4 else '<f8')
+    values = np.frombuffer(data, dtype=dtype, count=rows * n_columns, offset=offset).reshape(rows, n_columns)
+    offset += rows * n_columns * itemsize
+
+    records = {}
+    for _ in range(n_records):
+        first_row, count, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        name = bytes(data[offset:offset + length]).decode('utf-8')
+        offset += length
+        records[name] = (np.arange(count) * step, values[first_row:first_row + count])
+
+    return {'window': window_size, 'step': step, 'columns': names}, records
+
+
+def run_pipeline(source, output, window_size, step=1, columns=COLUMNS, output_format='bedgraph',
+                 chunk_size=DEFAULT_CHUNK_SIZE, join_records=False, tm_method='basic',
+                 dtype=np.float32, **conditions):
+    """
+    Stream window statistics of a FASTA file to bedGraph or a binary window file.
+
+    Args:
+        source: FASTA path or '-'
+        output: Output path (bedGraph: one file per column when there are several)
+        window_size, step: Window geometry
+        columns: Names from COLUMNS
+        output_format: 'bedgraph' or 'binary'
+        chunk_size: Bases processed at a time
+        join_records: Concatenate all records, like the in-memory lab scripts
+        tm_method: Method for the 'tm' column (see bioinf.meltingtemp.METHODS)
+        dtype: Value type of the binary file
+        conditions: na (mM) and oligo_concentration (nM) for the Tm column
+
+    Returns:
+        int: number of windows written
+    """
+    names = column_names(columns, tm_method)
+    if output_format == 'binary':
+        writer = WindowFileWriter(output, names, window_size, step, dtype)
+    else:
+        writer = BedGraphWriter(output, names, window_size, step)
+
+    total = 0
+    try:
+        for record, first_start, piece in iter_window_chunks(source, window_size, step, chunk_size,
+                                                             join_records):
+            values = chunk_columns(piece, window_size, step, columns, tm_method, **conditions)
+            starts = first_start + np.arange(len(values)) * step
+            writer.write(record, starts, values)
+            total += len(values)
+    finally:
+        writer.close()
+    return total
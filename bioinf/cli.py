@@ -0,0 +1,364 @@
+"""
+Single headless entry point for the lab analyses.
+
+    python -m bioinf composition sample.fasta
+    python -m bioinf tm ATGCGATCGATC
+    python -m bioinf codons covid19.fasta --plot codons.png
+
+Lab scripts are loaded only for the sub-command that runs, and matplotlib is
+imported only when a plot is requested, so a pure-compute call starts quickly.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+
+from bioinf.fasta import iter_fasta
+from bioinf.labs import load_lab
+
+
+def read_input(value, upper=True):
+    """
+    Sequence given on the command line: a FASTA/text file path, '-' for a FASTA
+    file on stdin, or the sequence itself.
+    """
+    from bioinf.fasta import read_sequence
+
+    if value == '-' or os.path.isfile(value):
+        return read_sequence(value, upper)
+    return value.strip().upper() if upper else value.strip()
+
+
+def cmd_composition(args):
+    ex1_2 = load_lab('lab1/ex1_2.py')
+    ex1_2.stream_fasta_results(args.fasta, sys.stdout, args.format)
+
+
+def cmd_kmers(args):
+    if args.k is None:
+        ex2 = load_lab('lab2/ex2.py')
+        dinucleotides, trinucleotides = ex2.find_nucleotides(read_input(args.input))
+        print(f"Dinucleotides: {' '.join(sorted(dinucleotides))}")
+        print(f"Trinucleotides: {' '.join(sorted(trinucleotides))}")
+        return
+
+    from bioinf.kmers import kmer_spectrum
+    spectrum = kmer_spectrum(read_input(args.input), args.k, args.canonical)
+    print(f"# k={args.k} windows={spectrum.total} distinct={len(spectrum)}", file=sys.stderr)
+    rows = spectrum.most_common(args.top or None) if args.sort == 'count' else spectrum.items()
+    for kmer, count in rows:
+        print(f"{kmer}\t{count}")
+
+
+def cmd_tm(args):
+    sequence = read_input(args.input)
+
+    if args.window is None and not os.path.isfile(args.input) and args.input != '-':
+        ex1 = load_lab('LAB3/ex1.py')
+        if not ex1.validate_dna_sequence(sequence):
+            print("Error: Invalid DNA sequence. Only A, T, G, C nucleotides are allowed.", file=sys.stderr)
+            return 1
+        for method in [args.method] if args.method else ['simple', 'salt_adjusted', 'nearest_neighbor']:
+            tm = ex1.calculate_tm(sequence, method, args.na, args.oligo_nm)
+            print(f"{method}\t{tm:.2f}")
+        return 0
+
+    ex2 = load_lab('LAB3/ex2.py')
+    window_size = args.window or 8
+    results = ex2.sliding_window_tm(sequence, window_size, vectorized=True,
+                                     method=args.method or 'basic', na=args.na,
+                                     oligo_concentration=args.oligo_nm)
+    print("position\twindow\ttm")
+    for pos, window, tm in results:
+        print(f"{pos}\t{window}\t{tm:.2f}")
+    if args.plot:
+        with contextlib.redirect_stdout(sys.stderr):
+            ex2.plot_melting_temperatures(args.input, results, window_size, args.plot)
+    return 0
+
+
+def cmd_tm_batch(args):
+    ex1 = load_lab('LAB3/ex1.py')
+    total, invalid = ex1.run_batch(args.input, sys.stdout, args.methods, args.na, args.oligo_nm, args.format)
+    print(f"{total} oligos, {invalid} invalid", file=sys.stderr)
+
+
+def cmd_windows(args):
+    from bioinf.chunked import run_pipeline
+    total = run_pipeline(args.fasta, args.output, args.window, args.step, args.columns, args.format,
+                         args.chunk_size, args.join_records, args.tm_method,
+                         'float64' if args.float64 else 'float32', na=args.na)
+    print(f"{total} windows written", file=sys.stderr)
+
+
+def cmd_pyramid_build(args):
+    from bioinf.pyramid import build_pyramid
+    path = build_pyramid(args.fasta, args.output, args.window, args.columns, args.tm_method,
+                         join_records=args.join_records, na=args.na)
+    print(f"Pyramid written to {path}", file=sys.stderr)
+
+
+def cmd_pyramid_query(args):
+    from bioinf.faidx import parse_region
+    from bioinf.pyramid import WindowPyramid
+
+    record, start, end = parse_region(args.region)
+    with WindowPyramid(args.pyramid) as pyramid:
+        bin_size, starts, mean, minimum, maximum = pyramid.profile(record, start, end, args.resolution,
+                                                                   args.column)
+        print(f"# bin={bin_size} window={pyramid.window_size}", file=sys.stderr)
+        print("start\tend\tmean\tmin\tmax")
+        for bin_start, values in zip(starts.tolist(), zip(mean.tolist(), minimum.tolist(), maximum.tolist())):
+            print(f"{bin_start}\t{bin_start + bin_size}\t" + '\t'.join(f"{value:.4f}" for value in values))
+
+
+def cmd_translate(args):
+    ex1 = load_lab('lab4/ex1.py')
+    protein, _ = ex1.translate_coding_region(read_input(args.input), find_first_start=not args.no_start)
+    print(protein)
+
+
+def cmd_orfs(args):
+    ex1 = load_lab('lab4/ex1.py')
+    records = [(header.split(None, 1)[0] if header.strip() else f"record_{i + 1}", sequence)
+               for i, (header, sequence) in enumerate(iter_fasta(args.input))]
+    start_codons = ex1.ALTERNATIVE_START_CODONS if args.alt_starts else ('AUG',)
+    orfs = ex1.find_orfs(records, args.min_length, start_codons, args.partial, args.processes)
+    ex1.write_orfs(orfs, sys.stdout)
+    print(f"{len(orfs)} ORFs", file=sys.stderr)
+
+
+def cmd_codons(args):
+    ex2 = load_lab('lab4/ex2.py')
+    codon_count = ex2.count_codons(read_input(args.input))
+    ranked = sorted(codon_count.items(), key=lambda x: x[1], reverse=True)
+    for codon, count in ranked[:args.top] if args.top else ranked:
+        print(f"{codon}\t{count}")
+    if args.plot:
+        ex2.plot_top_codons(codon_count, f'Top 10 Codons {os.path.basename(args.input)}', args.plot)
+
+
+def cmd_fetch(args):
+    from bioinf import fetch
+
+    if args.offline:
+        fetch.configure(offline=True)
+    urls = [item if '://' in item else fetch.efetch_url(item) for item in args.accessions]
+    filenames = None
+    if args.directory:
+        os.makedirs(args.directory, exist_ok=True)
+        filenames = [os.path.join(args.directory, item + '.fasta')
+                     if '://' not in item else None for item in args.accessions]
+    results = fetch.fetch_many(urls, filenames, workers=args.workers, refresh=args.refresh,
+                               raise_errors=False)
+    failed = 0
+    for item, url in zip(args.accessions, urls):
+        if isinstance(results[url], fetch.FetchError):
+            print(f"Error: {results[url]}", file=sys.stderr)
+            failed += 1
+        else:
+            print(f"{item}\t{results[url]}")
+    return 1 if failed else 0
+
+
+def cmd_assemble(args):
+    ex1 = load_lab('lab5/ex1.py')
+    original = read_input(args.input) if args.input else ex1.get_dna_sequence()
+    samples = ex1.take_random_samples(original, args.samples, args.min_length, args.max_length)
+    reconstructed = ex1.reconstruct_sequence(samples, args.min_overlap)
+    stats = ex1.calculate_accuracy(original, reconstructed)
+    for key, value in stats.items():
+        print(f"{key}\t{value}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(f">reconstructed length={len(reconstructed)}\n")
+            for i in range(0, len(reconstructed), 70):
+                f.write(reconstructed[i:i + 70] + '\n')
+
+
+def cmd_gel(args):
+    gel = load_lab('lab6/gel_electrophoresis.py')
+    with gel.open_indexed_sequence(args.fasta) as sequence:
+        max_length = args.max_length or len(sequence)
+        samples = gel.extract_random_samples(sequence, args.samples, args.min_length, max_length)
+        samples = gel.simulate_gel_electrophoresis(samples)
+        gel.print_results(sequence, samples)
+    if args.plot:
+        gel.visualize_gel(samples, output_file=args.plot)
+
+
+def cmd_repeats(args):
+    detector = load_lab('lab7/dna_repetition_detector.py')
+    sequence = read_input(args.input)
+    repetitions = detector.detect_repetitions(sequence, args.min_length, args.max_length)
+    repetitions = detector.filter_repetitions(repetitions, args.min_occurrences)
+    detector.display_results(repetitions, sequence, args.top)
+    if args.plot:
+        detector.plot_repetition_frequencies(repetitions, args.plot)
+
+
+def cmd_transposons(args):
+    sequence = read_input(args.input, upper=False)
+    # progress messages go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.markers:
+            real = load_lab('lab8/find_transposons_real.py')
+            found = real.find_inverted_repeats(sequence)
+        else:
+            detector = load_lab('lab8/detect_transposons.py')
+            found = detector.detect_transposons(sequence)
+    json.dump({'sequence_length': len(sequence), 'num_detected': len(found), 'results': found},
+              sys.stdout, indent=2)
+    print()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='bioinf', description="Headless entry point for the lab analyses")
+    parser.add_argument('--seed', type=int, help="random seed for the sampling commands")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('composition', help="alphabet and composition per FASTA record (lab1)")
+    p.add_argument('fasta', help="FASTA file ('-' for stdin)")
+    p.add_argument('--format', choices=['tsv', 'jsonl'], default='tsv')
+    p.set_defaults(func=cmd_composition)
+
+    p = commands.add_parser('kmers', help="dinucleotides/trinucleotides present, or a k-mer spectrum (lab2)")
+    p.add_argument('input', help="sequence, FASTA file or '-'")
+    p.add_argument('-k', type=int, help="count k-mers of this length (1-31) instead of listing 2/3-mers")
+    p.add_argument('--canonical', action='store_true', help="merge k-mers with their reverse complements")
+    p.add_argument('--sort', choices=['count', 'kmer'], default='count')
+    p.add_argument('--top', type=int, default=0, help="only print the N most frequent k-mers")
+    p.set_defaults(func=cmd_kmers)
+
+    p = commands.add_parser('tm', help="melting temperature of an oligo or sliding-window profile (LAB3)")
+    p.add_argument('input', help="sequence, FASTA file or '-'")
+    p.add_argument('--window', type=int, help="sliding window size (default 8 for files)")
+    p.add_argument('--method', choices=['simple', 'salt_adjusted', 'basic', 'nearest_neighbor'],
+                   help="Tm method (default: simple, salt_adjusted and nearest_neighbor for an oligo, "
+                        "basic for a profile)")
+    p.add_argument('--na', type=float, default=50, help="Na+ concentration in mM")
+    p.add_argument('--oligo-nm', type=float, default=50, help="oligo concentration in nM (nearest_neighbor)")
+    p.add_argument('--plot', metavar='PNG', help="save the Tm profile chart")
+    p.set_defaults(func=cmd_tm)
+
+    p = commands.add_parser('tm-batch', help="Tm of every oligo in a FASTA/TSV file as CSV or JSON Lines (LAB3)")
+    p.add_argument('input', help="FASTA or TSV (name, sequence[, Na+ mM]) file, '-' for stdin")
+    p.add_argument('--methods', nargs='+', choices=['simple', 'salt_adjusted', 'basic', 'nearest_neighbor'],
+                   default=['simple', 'salt_adjusted', 'nearest_neighbor'])
+    p.add_argument('--na', type=float, default=50, help="Na+ concentration in mM for rows without one")
+    p.add_argument('--oligo-nm', type=float, default=50, help="oligo concentration in nM")
+    p.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    p.set_defaults(func=cmd_tm_batch)
+
+    p = commands.add_parser('windows', help="out-of-core sliding-window frequencies/GC/Tm to bedGraph or binary")
+    p.add_argument('fasta', help="FASTA file ('-' for stdin)")
+    p.add_argument('-o', '--output', required=True,
+                   help="output path (bedGraph: one file per column, named PATH.COLUMN.EXT)")
+    p.add_argument('--window', type=int, default=30)
+    p.add_argument('--step', type=int, default=1)
+    p.add_argument('--columns', nargs='+', choices=['A', 'C', 'G', 'T', 'GC', 'tm'], default=['GC'])
+    p.add_argument('--format', choices=['bedgraph', 'binary'], default='bedgraph')
+    p.add_argument('--float64', action='store_true', help="store float64 instead of float32 in binary files")
+    p.add_argument('--tm-method', choices=['simple', 'salt_adjusted', 'basic', 'nearest_neighbor'],
+                   default='basic')
+    p.add_argument('--na', type=float, default=50, help="Na+ concentration in mM for the Tm column")
+    p.add_argument('--chunk-size', type=int, default=1 << 20, help="bases held in memory at a time")
+    p.add_argument('--join-records', action='store_true',
+                   help="treat all records as one sequence, like the lab scripts")
+    p.set_defaults(func=cmd_windows)
+
+    p = commands.add_parser('pyramid-build', help="precompute a multi-resolution window pyramid")
+    p.add_argument('fasta', help="FASTA file")
+    p.add_argument('-o', '--output', help="output path (default: FASTA.pyr)")
+    p.add_argument('--window', type=int, default=30, help="window size of the finest level")
+    p.add_argument('--columns', nargs='+', choices=['A', 'C', 'G', 'T', 'GC', 'tm'], default=['GC'])
+    p.add_argument('--tm-method', choices=['simple', 'salt_adjusted', 'basic', 'nearest_neighbor'],
+                   default='basic')
+    p.add_argument('--na', type=float, default=50, help="Na+ concentration in mM for the Tm column")
+    p.add_argument('--join-records', action='store_true',
+                   help="treat all records as one sequence, like the lab scripts")
+    p.set_defaults(func=cmd_pyramid_build)
+
+    p = commands.add_parser('pyramid-query', help="profile of a region at a given resolution")
+    p.add_argument('pyramid', help="pyramid file")
+    p.add_argument('region', help="NAME[:START-END], 1-based window start positions")
+    p.add_argument('--resolution', type=int, default=1000, help="minimum number of bins")
+    p.add_argument('--column', help="column, e.g. GC or tm (default: the first one)")
+    p.set_defaults(func=cmd_pyramid_query)
+
+    p = commands.add_parser('translate', help="translate a coding region (lab4)")
+    p.add_argument('input', help="sequence, FASTA file or '-'")
+    p.add_argument('--no-start', action='store_true', help="translate from position 0, not the first AUG")
+    p.set_defaults(func=cmd_translate)
+
+    p = commands.add_parser('orfs', help="six-frame ORF finder (lab4)")
+    p.add_argument('input', help="FASTA file or '-'")
+    p.add_argument('--min-length', type=int, default=100, help="minimum protein length in amino acids")
+    p.add_argument('--alt-starts', action='store_true', help="also start ORFs at GUG and UUG")
+    p.add_argument('--partial', action='store_true', help="include ORFs that run off the sequence end")
+    p.add_argument('--processes', type=int, help="worker processes (default: one per CPU)")
+    p.set_defaults(func=cmd_orfs)
+
+    p = commands.add_parser('codons', help="codon counts (lab4)")
+    p.add_argument('input', help="sequence, FASTA file or '-'")
+    p.add_argument('--top', type=int, default=0, help="only print the N most frequent codons")
+    p.add_argument('--plot', metavar='PNG', help="save a top-10 codon chart")
+    p.set_defaults(func=cmd_codons)
+
+    p = commands.add_parser('fetch', help="download genomes from NCBI into the download cache")
+    p.add_argument('accessions', nargs='+', help="nuccore accessions (e.g. NC_045512.1) or URLs")
+    p.add_argument('-d', '--directory', help="also copy each accession to DIRECTORY/<accession>.fasta")
+    p.add_argument('--workers', type=int, help="concurrent downloads (default: 8)")
+    p.add_argument('--refresh', action='store_true', help="revalidate cached downloads with the server")
+    p.add_argument('--offline', action='store_true', help="never download; fail for uncached genomes")
+    p.set_defaults(func=cmd_fetch)
+
+    p = commands.add_parser('assemble', help="sample and reassemble a sequence (lab5)")
+    p.add_argument('input', nargs='?', help="sequence or FASTA file (default: the lab5 sequence)")
+    p.add_argument('--samples', type=int, default=2000)
+    p.add_argument('--min-length', type=int, default=100)
+    p.add_argument('--max-length', type=int, default=150)
+    p.add_argument('--min-overlap', type=int, default=20)
+    p.add_argument('-o', '--output', help="write the reconstructed sequence as FASTA")
+    p.set_defaults(func=cmd_assemble)
+
+    p = commands.add_parser('gel', help="gel electrophoresis simulation (lab6)")
+    p.add_argument('fasta', help="FASTA file")
+    p.add_argument('--samples', type=int, default=10)
+    p.add_argument('--min-length', type=int, default=100)
+    p.add_argument('--max-length', type=int, help="default: the sequence length")
+    p.add_argument('--plot', metavar='PNG', help="save the gel image")
+    p.set_defaults(func=cmd_gel)
+
+    p = commands.add_parser('repeats', help="repeated 6-10 bp patterns (lab7)")
+    p.add_argument('input', help="sequence, FASTA file or '-'")
+    p.add_argument('--min-length', type=int, default=6)
+    p.add_argument('--max-length', type=int, default=10)
+    p.add_argument('--min-occurrences', type=int, default=2)
+    p.add_argument('--top', type=int, default=50)
+    p.add_argument('--plot', metavar='PNG', help="save the frequency plots")
+    p.set_defaults(func=cmd_repeats)
+
+    p = commands.add_parser('transposons', help="transposable element detection as JSON (lab8)")
+    p.add_argument('input', help="sequence, FASTA file or '-'")
+    p.add_argument('--markers', action='store_true',
+                   help="only list 4-6 bp inverted repeat markers (find_transposons_real)")
+    p.set_defaults(func=cmd_transposons)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+    try:
+        return args.func(args) or 0
+    except BrokenPipeError:
+        return 0
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,79 @@
+"""
+Sequence composition (alphabet, symbol counts, percentages) in a single pass.
+The sequence is viewed as bytes and histogrammed with numpy.bincount, so the
+cost does not grow with the number of distinct symbols.
+"""
+
+import os
+from collections import Counter
+from multiprocessing import Pool
+
+import numpy as np
+
+# below this many records a process pool costs more than it saves
+MIN_RECORDS_FOR_POOL = 8
+
+
+def symbol_counts(sequence):
+    """
+    Count every symbol of a sequence in one pass.
+
+    Args:
+        sequence: Input string (or bytes)
+
+    Returns:
+        dict: symbol -> count, only for symbols that occur
+    """
+    if isinstance(sequence, str):
+        try:
+            sequence = sequence.encode('latin-1')
+        except UnicodeEncodeError:
+            return dict(Counter(sequence))
+    histogram = np.bincount(np.frombuffer(sequence, dtype=np.uint8), minlength=256)
+    return {chr(byte): int(histogram[byte]) for byte in np.flatnonzero(histogram)}
+
+
+def composition(sequence):
+    """
+    Alphabet, counts and percentages of a sequence from a single histogram.
+
+    Args:
+        sequence: Input string
+
+    Returns:
+        tuple: (alphabet set, dict of counts, dict of percentages)
+    """
+    counts = symbol_counts(sequence)
+    length = len(sequence)
+    percentages = {symbol: (count / length) * 100 for symbol, count in counts.items()}
+    return set(counts), counts, percentages
+
+
+def _record_composition(record):
+    header, sequence = record
+    return (header,) + composition(sequence)
+
+
+def iter_compositions(records, processes=None):
+    """
+    Composition of every (header, sequence) record, in input order.
+
+    Records are spread over a process pool when there are enough of them;
+    processes=1 keeps everything in the current process.
+
+    Yields:
+        tuple: (header, alphabet, counts, percentages)
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if not isinstance(records, (list, tuple)):
+        records = list(records)
+
+    if processes <= 1 or len(records) < MIN_RECORDS_FOR_POOL:
+        for record in records:
+            yield _record_composition(record)
+        return
+
+    chunksize = max(1, len(records) // (processes * 4))
+    with Pool(processes) as pool:
+        yield from pool.imap(_record_composition, records, chunksize)
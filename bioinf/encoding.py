@@ -0,0 +1,37 @@
+"""
+Integer encoding of nucleotide sequences.
+A, C, G, T (and U) become 0, 1, 2, 3; every other character becomes N_CODE.
+"""
+
+import numpy as np
+
+BASES = 'ACGT'
+N_CODE = 4
+
+_ENCODE_TABLE = np.full(256, N_CODE, dtype=np.uint8)
+for _code, _bases in enumerate(['Aa', 'Cc', 'Gg', 'TtUu']):
+    for _base in _bases:
+        _ENCODE_TABLE[ord(_base)] = _code
+
+_DECODE_TABLE = np.frombuffer(b'ACGTN', dtype=np.uint8)
+
+
+def encode(sequence):
+    """
+    Encode a DNA/RNA string (or bytes) as a uint8 numpy array of base codes.
+
+    Args:
+        sequence: Input sequence
+
+    Returns:
+        numpy.ndarray: codes 0-3 for A/C/G/T(U), N_CODE for anything else
+    """
+    if isinstance(sequence, str):
+        sequence = sequence.encode('ascii', 'replace')
+    return _ENCODE_TABLE[np.frombuffer(sequence, dtype=np.uint8)]
+
+
+def decode(codes):
+    """Turn an array of base codes back into an upper case string."""
+    codes = np.minimum(np.asarray(codes, dtype=np.uint8), N_CODE)
+    return _DECODE_TABLE[codes].tobytes().decode('ascii')
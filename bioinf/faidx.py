@@ -0,0 +1,206 @@
+"""
+FASTA index compatible with samtools faidx (.fai files).
+
+Each index line is: name, length, offset, line bases, line width.
+With the index a region is fetched with a single seek and read, so the cost
+depends on the size of the region, not on the size of the file.
+"""
+
+import os
+import re
+
+FAI_SUFFIX = '.fai'
+
+_REGION = re.compile(r'^(.+?)(?::([\d,]+)?(?:-([\d,]+))?)?$')
+
+
+def build_index(fasta_path, fai_path=None):
+    """
+    Scan a FASTA file once and write its .fai index.
+
+    Args:
+        fasta_path: Path to the FASTA file
+        fai_path: Output path (default: fasta_path + '.fai')
+
+    Returns:
+        list: index entries as (name, length, offset, line_bases, line_width)
+    """
+    if fai_path is None:
+        fai_path = fasta_path + FAI_SUFFIX
+
+    entries = []
+    record = None
+
+    def finish(record):
+        name, length, offset, line_bases, line_width, _ = record
+        entries.append((name, length, offset, line_bases, line_width))
+
+    with open(fasta_path, 'rb') as f:
+        position = 0
+        for line in f:
+            line_start = position
+            position += len(line)
+
+            if line.startswith(b'>'):
+                if record is not None:
+                    finish(record)
+                name = line[1:].split(None, 1)[0].decode() if line[1:].strip() else ''
+                # [name, length, offset, line_bases, line_width, last_line_was_short]
+                record = [name, 0, position, 0, 0, False]
+                continue
+            if record is None:
+                raise ValueError(f"'{fasta_path}' does not start with a FASTA header")
+
+            bases = len(line.rstrip(b'\r\n'))
+            if bases == 0:
+                record[5] = True
+                continue
+            if record[5]:
+                raise ValueError(f"Different line length in sequence '{record[0]}'")
+            if record[3] == 0:
+                record[3] = bases
+                record[4] = len(line)
+            elif bases > record[3] or (bases == record[3] and line.endswith(b'\n')
+                                       and len(line) != record[4]):
+                # an unterminated last line is shorter in bytes, like samtools accepts
+                raise ValueError(f"Different line length in sequence '{record[0]}'")
+            record[5] = bases < record[3]
+            record[1] += bases
+
+        if record is not None:
+            finish(record)
+
+    with open(fai_path, 'w') as f:
+        for entry in entries:
+            f.write('\t'.join(map(str, entry)) + '\n')
+
+    return entries
+
+
+def read_index(fai_path):
+    """Read the entries of an existing .fai file."""
+    entries = []
+    with open(fai_path, 'r') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) >= 5:
+                entries.append((fields[0],) + tuple(int(value) for value in fields[1:5]))
+    return entries
+
+
+def parse_region(region):
+    """
+    Parse a samtools style region 'name:start-end' (1-based, inclusive).
+
+    Returns:
+        tuple: (name, start, end) with 0-based half-open coordinates;
+               end is None when the region runs to the end of the record
+    """
+    match = _REGION.match(region.strip())
+    if not match:
+        raise ValueError(f"Invalid region '{region}'")
+    name, start, end = match.groups()
+    start = int(start.replace(',', '')) - 1 if start else 0
+    end = int(end.replace(',', '')) if end else None
+    return name, max(start, 0), end
+
+
+class FastaIndex:
+    def __init__(self, fasta_path, fai_path=None):
+        self.fasta_path = fasta_path
+        self.fai_path = fai_path or fasta_path + FAI_SUFFIX
+
+        if (os.path.exists(self.fai_path)
+                and os.path.getmtime(self.fai_path) >= os.path.getmtime(fasta_path)):
+            entries = read_index(self.fai_path)
+        else:
+            entries = build_index(fasta_path, self.fai_path)
+
+        self.entries = {entry[0]: entry for entry in entries}
+        self.names = [entry[0] for entry in entries]
+        self._file = open(fasta_path, 'rb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __len__(self):
+        return len(self.names)
+
+    def length(self, name):
+        return self.entries[name][1]
+
+    def fetch(self, name, start=0, end=None):
+        """
+        Return bases [start, end) of a record (0-based, half-open).
+
+        Args:
+            name: Record name (first word of the header)
+            start: First base
+            end: One past the last base (default: end of the record)
+
+        Returns:
+            str: the requested bases
+        """
+        if name not in self.entries:
+            raise KeyError(f"Sequence '{name}' not found in '{self.fasta_path}'")
+        _, length, offset, line_bases, line_width = self.entries[name]
+
+        start, end, _ = slice(start, end).indices(length)
+        if end <= start:
+            return ''
+
+        first = offset + (start // line_bases) * line_width + start % line_bases
+        last = offset + ((end - 1) // line_bases) * line_width + (end - 1) % line_bases
+
+        self._file.seek(first)
+        data = self._file.read(last - first + 1)
+        return data.replace(b'\n', b'').replace(b'\r', b'').decode('ascii')
+
+    def fetch_region(self, region):
+        """Fetch a samtools style region such as 'chr1:1000-2000' (1-based, inclusive)."""
+        name, start, end = parse_region(region)
+        return self.fetch(name, start, end)
+
+    def record(self, name):
+        """Lazy view of one record that supports len() and slicing."""
+        if name not in self.entries:
+            raise KeyError(f"Sequence '{name}' not found in '{self.fasta_path}'")
+        return IndexedRecord(self, name)
+
+
+class IndexedRecord:
+    """
+    A record of an indexed FASTA file that behaves like a read-only string
+    for len() and slicing; only the requested slice is read from disk.
+    """
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+
+    def __len__(self):
+        return self.index.length(self.name)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return str(self)[key]
+            return self.index.fetch(self.name, key.start, key.stop)
+        length = len(self)
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError('record index out of range')
+        return self.index.fetch(self.name, key, key + 1)
+
+    def __str__(self):
+        return self.index.fetch(self.name)
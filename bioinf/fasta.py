@@ -0,0 +1,148 @@
+"""
+Streaming FASTA reader shared by all labs.
+Records are produced one at a time and every sequence is joined once,
+so reading is linear in the size of the file.
+"""
+
+import io
+import os
+import sys
+from contextlib import contextmanager
+
+
+@contextmanager
+def open_source(source):
+    """
+    Open a path for reading, or pass an already open file object (or any
+    iterable of lines) through. '-' means standard input.
+    """
+    if source == '-':
+        yield sys.stdin
+    elif hasattr(source, 'read') or not isinstance(source, (str, bytes, os.PathLike)):
+        yield source
+    else:
+        with open(source, 'r') as handle:
+            yield handle
+
+
+class ProgressFile:
+    """
+    A FASTA file opened for reading (pass it as the source of the readers)
+    that knows how many bytes have been consumed, so progress is measured in
+    the same unit as the file size: headers and line breaks included.
+    """
+
+    def __init__(self, path):
+        self._binary = open(path, 'rb')
+        self.size = os.fstat(self._binary.fileno()).st_size
+        self._text = io.TextIOWrapper(self._binary)
+
+    def __iter__(self):
+        return iter(self._text)
+
+    def read(self, size=-1):
+        return self._text.read(size)
+
+    @property
+    def position(self):
+        """Bytes read so far (at most one read buffer ahead of the lines returned)."""
+        return self._binary.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._text.close()
+
+
+def iter_fasta(source, upper=False):
+    """
+    Yield every record of a FASTA file without loading the whole file.
+
+    Args:
+        source: Path to the FASTA file, '-' for stdin, or an open text file
+                (any iterable of lines)
+        upper: Convert the sequences to upper case
+
+    Yields:
+        tuple: (header without '>', sequence)
+    """
+    with open_source(source) as handle:
+        header = None
+        chunks = []
+
+        for line in handle:
+            line = line.strip()
+            if line.startswith('>'):
+                if header is not None or chunks:
+                    yield header or '', _join(chunks, upper)
+                header = line[1:]
+                chunks = []
+            elif line:
+                chunks.append(line)
+
+        if header is not None or chunks:
+            yield header or '', _join(chunks, upper)
+
+
+def read_records(source, upper=False):
+    """Return all (header, sequence) records of a FASTA file as a list."""
+    return list(iter_fasta(source, upper))
+
+
+def read_sequence(source, upper=False):
+    """Return the sequences of all records concatenated into one string."""
+    return ''.join(sequence for _, sequence in iter_fasta(source, upper))
+
+
+def _join(chunks, upper):
+    sequence = ''.join(chunks)
+    return sequence.upper() if upper else sequence
+
+
+def iter_fasta_pieces(source, piece_size=1 << 22, upper=False, keep_empty=False):
+    """
+    Yield the sequence of every record in pieces of about piece_size bases,
+    so records of any size can be processed in constant memory.
+
+    Args:
+        keep_empty: Also yield (record, header, '') for a record without sequence
+
+    Yields:
+        tuple: (record number from 0, header without '>', piece)
+    """
+    with open_source(source) as handle:
+        record = 0
+        started = False
+        header = ''
+        chunks = []
+        size = 0
+        emitted = False
+
+        for line in handle:
+            line = line.strip()
+            if line.startswith('>'):
+                if chunks or (keep_empty and started and not emitted):
+                    yield record, header, _join(chunks, upper)
+                if started:
+                    record += 1
+                started = True
+                header = line[1:]
+                chunks = []
+                size = 0
+                emitted = False
+            elif line:
+                started = True
+                chunks.append(line)
+                size += len(line)
+                if size >= piece_size:
+                    yield record, header, _join(chunks, upper)
+                    chunks = []
+                    size = 0
+                    emitted = True
+
+        if chunks or (keep_empty and started and not emitted):
+            yield record, header, _join(chunks, upper)
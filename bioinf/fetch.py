@@ -0,0 +1,334 @@
+"""
+Concurrent, cached downloads of genome FASTA files.
+
+Every downloaded body is stored once under its BLAKE2b hash
+(<cache dir>/fetch/objects/<hash>.fasta) and a JSON index maps each URL to
+its object and to the ETag / Last-Modified the server sent. A URL that is
+already in the index is served from disk without any request; refresh=True
+asks the server with If-None-Match / If-Modified-Since and only downloads
+the body again when it changed. fetch_many() runs the downloads on a bounded
+thread pool; each request is retried with exponential backoff on connection
+errors, truncated bodies, HTTP 429 and 5xx. A destination file that already
+exists for a URL missing from the index is imported into the cache instead of
+being downloaded again. In offline mode nothing is requested and a URL
+missing from the cache is an error.
+
+Settings can come from the environment:
+    BIOINF_OFFLINE          set to 1 to never use the network
+    BIOINF_FETCH_WORKERS    concurrent downloads (default: 8)
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from bioinf.cache import cache_dir, file_digest
+
+EFETCH_URL = ("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+              "?db={db}&id={accession}&rettype=fasta&retmode=text")
+RETRY_STATUS = (429, 500, 502, 503, 504)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds before the first retry, doubled every time
+DEFAULT_TIMEOUT = 60
+
+_settings = {
+    'offline': os.environ.get('BIOINF_OFFLINE', '') not in ('', '0'),
+    'workers': int(os.environ.get('BIOINF_FETCH_WORKERS', 8)),
+}
+
+
+class FetchError(OSError):
+    """
+    A URL could not be fetched (or is not cached in offline mode). When
+    several downloads failed, url is None and errors lists them.
+    """
+
+    def __init__(self, url, message, errors=()):
+        super().__init__(f"{url}: {message}" if url else message)
+        self.url = url
+        self.errors = list(errors)
+
+
+def configure(offline=None, workers=None):
+    """Change the fetch settings for the current process."""
+    if offline is not None:
+        _settings['offline'] = offline
+    if workers is not None:
+        _settings['workers'] = workers
+
+
+def is_offline():
+    return _settings['offline']
+
+
+def fetch_dir():
+    return os.path.join(cache_dir(), 'fetch')
+
+
+def efetch_url(accession, db='nuccore'):
+    """NCBI Entrez efetch URL of the FASTA record of an accession."""
+    return EFETCH_URL.format(db=db, accession=quote(accession))
+
+
+class _Index:
+    """URL -> {digest, etag, last_modified} (index.json), shared by the worker threads."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, 'index.json')
+        self.lock = threading.Lock()
+        self.changed = False
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest + '.fasta')
+
+    def cached(self, url):
+        """Object path of a URL, or None if it is not cached (or its object is gone)."""
+        with self.lock:
+            entry = self.entries.get(url)
+        if entry is None:
+            return None
+        path = self.object_path(entry['digest'])
+        return path if os.path.exists(path) else None
+
+    def get(self, url):
+        with self.lock:
+            return self.entries.get(url)
+
+    def put(self, url, entry):
+        with self.lock:
+            self.entries[url] = entry
+            self.changed = True
+
+    def store_object(self, data):
+        """Write a body under its hash (once) and return the hash."""
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        return digest
+
+    def save(self):
+        with self.lock:
+            if not self.changed:
+                return
+            _write_atomic(self.path, json.dumps(self.entries, indent=1, sort_keys=True).encode('utf-8'))
+            self.changed = False
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _request(url, headers, retries, backoff, timeout):
+    """
+    GET with retries. Returns (status, headers, body); a 304 answer to a
+    conditional request is returned, not raised.
+    """
+    for attempt in range(retries + 1):
+        delay = backoff * 2 ** attempt
+        try:
+            with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+                return response.status, response.headers, response.read()
+        except HTTPError as e:
+            if e.code == 304:
+                return 304, e.headers, b''
+            if e.code not in RETRY_STATUS or attempt == retries:
+                raise FetchError(url, f"HTTP {e.code} {e.reason}") from e
+            retry_after = e.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+        except (URLError, OSError, http.client.HTTPException) as e:
+            # HTTPException covers IncompleteRead, a body cut short by the server
+            if attempt == retries:
+                reason = getattr(e, 'reason', e)
+                raise FetchError(url, f"{reason} (after {retries + 1} attempts)") from e
+        time.sleep(delay)
+
+
+def _fetch(url, index, refresh, retries, backoff, timeout, check_fasta):
+    cached = index.cached(url)
+    if cached is not None and not refresh:
+        return cached
+    if is_offline():
+        if cached is not None:
+            return cached
+        raise FetchError(url, "not in the download cache and offline mode is on")
+
+    headers = {}
+    entry = index.get(url) if cached is not None else None
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    status, response_headers, data = _request(url, headers, retries, backoff, timeout)
+    if status == 304 and cached is not None:
+        return cached
+    if check_fasta and not data.lstrip().startswith(b'>'):
+        # Entrez answers unknown accessions with an error text and status 200
+        raise FetchError(url, f"response is not FASTA: {data[:80].decode('utf-8', 'replace')!r}")
+
+    digest = index.store_object(data)
+    index.put(url, {'digest': digest,
+                    'etag': response_headers.get('ETag'),
+                    'last_modified': response_headers.get('Last-Modified'),
+                    'fetched': time.strftime('%Y-%m-%dT%H:%M:%S')})
+    return index.object_path(digest)
+
+
+def _import_file(url, filename, index, check_fasta):
+    """
+    Add an existing destination file to the cache as the content of url
+    (without validators, so refresh=True downloads it again). Returns the
+    object path, or None if the file is missing or not FASTA.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if check_fasta and not data.lstrip().startswith(b'>'):
+        return None
+    digest = index.store_object(data)
+    index.put(url, {'digest': digest, 'etag': None, 'last_modified': None,
+                    'imported': os.path.abspath(filename)})
+    return index.object_path(digest)
+
+
+def _copy_to(path, filename):
+    """Copy a cached object to filename unless it already has that content."""
+    if os.path.exists(filename) and file_digest(filename) == file_digest(path):
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    _write_atomic(os.path.abspath(filename), data)
+
+
+def fetch(url, filename=None, refresh=False, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+          timeout=DEFAULT_TIMEOUT, check_fasta=True):
+    """
+    Path of the cached copy of a URL, downloading it if needed.
+
+    Args:
+        url: URL to fetch
+        filename: Also copy the content to this file
+        refresh: Revalidate a cached copy with a conditional request
+        retries: Extra attempts after a connection error, 429 or 5xx
+        backoff: Seconds before the first retry (doubled for every next one)
+        timeout: Seconds per request
+        check_fasta: Reject bodies that do not start with '>'
+
+    Returns:
+        str: path of the cached object
+
+    Raises:
+        FetchError: download failed, or offline mode and not cached
+    """
+    return fetch_many([url], None if filename is None else [filename], refresh=refresh,
+                      retries=retries, backoff=backoff, timeout=timeout, check_fasta=check_fasta)[url]
+
+
+def fetch_many(urls, filenames=None, workers=None, refresh=False, raise_errors=True,
+               retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT,
+               check_fasta=True):
+    """
+    Fetch many URLs at once: cached ones are answered from the index without
+    any request, the rest are downloaded by up to `workers` threads. A URL
+    that is not cached but whose destination file already exists is served
+    from that file (see _import_file).
+
+    Args:
+        urls: URLs to fetch (duplicates are fetched once)
+        filenames: Optional destination file for every URL (None entries are skipped)
+        workers: Concurrent downloads (default: BIOINF_FETCH_WORKERS or 8)
+        raise_errors: Raise a FetchError naming every failed URL once all
+                      downloads have finished; otherwise the failures are
+                      returned as FetchError values
+        refresh, retries, backoff, timeout, check_fasta: see fetch()
+
+    Returns:
+        dict: URL -> path of the cached object (or FetchError)
+    """
+    urls = list(urls)
+    filenames = None if filenames is None else list(filenames)
+    index = _Index(fetch_dir())
+    results = {}
+    pending = []
+    seen = set()
+    for i, url in enumerate(urls):
+        if url in seen:
+            continue
+        seen.add(url)
+        cached = index.cached(url)
+        if cached is None and filenames is not None and filenames[i] is not None:
+            cached = _import_file(url, filenames[i], index, check_fasta)
+        if cached is not None and not refresh:
+            results[url] = cached
+        else:
+            pending.append(url)
+
+    def task(url):
+        try:
+            return _fetch(url, index, refresh, retries, backoff, timeout, check_fasta)
+        except FetchError as e:
+            return e
+
+    try:
+        if len(pending) == 1:
+            results[pending[0]] = task(pending[0])
+        elif pending:
+            workers = min(workers or _settings['workers'], len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results.update(zip(pending, pool.map(task, pending)))
+    finally:
+        index.save()
+
+    failed = [e for e in results.values() if isinstance(e, FetchError)]
+    if failed and raise_errors:
+        if len(failed) == 1:
+            raise failed[0]
+        raise FetchError(None, f"{len(failed)} of {len(results)} downloads failed:\n"
+                         + '\n'.join(str(e) for e in failed), failed)
+
+    if filenames is not None:
+        for url, filename in zip(urls, filenames):
+            if filename is not None and not isinstance(results[url], FetchError):
+                _copy_to(results[url], filename)
+    return results
+
+
+def add_fetch_arguments(parser):
+    """Add the --offline / --refresh options to an argparse parser."""
+    parser.add_argument('--offline', action='store_true',
+                        help="never download; fail if a genome is not in the download cache")
+    parser.add_argument('--refresh', action='store_true',
+                        help="revalidate cached downloads with the server (conditional requests)")
+
+
+def apply_fetch_arguments(args):
+    if args.offline:
+        configure(offline=True)
@@ -0,0 +1,150 @@
+"""
+Lightweight per-stage instrumentation: wall time, call counts, item counters
+and (optionally) peak traced memory.
+
+Everything is off by default. While disabled, a decorated function costs one
+extra call and a flag check, and add_counts() returns immediately.
+
+    from bioinf import instrument
+
+    @instrument.stage()
+    def find_overlap(...): ...
+
+    instrument.enable(memory=True)
+    ...
+    instrument.add_counts('find_overlap', comparisons=n)
+    instrument.dump('metrics.json')
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_enabled = False
+_track_memory = False
+_metrics = {}
+# one entry per active stage: highest traced memory seen while it was running
+_memory_stack = []
+
+
+def enable(memory=False):
+    """Start collecting metrics; memory=True also tracks peak memory via tracemalloc."""
+    global _enabled, _track_memory
+    _enabled = True
+    _track_memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled, _track_memory
+    if _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _enabled = False
+    _track_memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget all collected metrics."""
+    _metrics.clear()
+
+
+def _entry(name):
+    if name not in _metrics:
+        _metrics[name] = {'calls': 0, 'seconds': 0.0, 'peak_bytes': None, 'counters': {}}
+    return _metrics[name]
+
+
+@contextmanager
+def timed(name):
+    """Context manager that records one call of a stage."""
+    if not _enabled:
+        yield
+        return
+
+    entry = _entry(name)
+    memory = _track_memory and tracemalloc.is_tracing()
+    if memory:
+        start_bytes, peak_before = tracemalloc.get_traced_memory()
+        if _memory_stack:
+            _memory_stack[-1] = max(_memory_stack[-1], peak_before)
+        tracemalloc.reset_peak()
+        _memory_stack.append(0)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry['seconds'] += time.perf_counter() - start
+        entry['calls'] += 1
+        if memory:
+            peak = max(_memory_stack.pop(), tracemalloc.get_traced_memory()[1])
+            if _memory_stack:
+                _memory_stack[-1] = max(_memory_stack[-1], peak)
+            used = peak - start_bytes
+            entry['peak_bytes'] = max(entry['peak_bytes'] or 0, used)
+
+
+def stage(name=None):
+    """Decorator that records every call of a function as a stage."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with timed(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_counts(name, **counts):
+    """Add to the item counters of a stage (windows scanned, comparisons made, ...)."""
+    if not _enabled:
+        return
+    counters = _entry(name)['counters']
+    for key, value in counts.items():
+        counters[key] = counters.get(key, 0) + value
+
+
+def report():
+    """Copy of the collected metrics, keyed by stage name."""
+    return {name: dict(entry, counters=dict(entry['counters'])) for name, entry in _metrics.items()}
+
+
+def dump(path, extra=None):
+    """Write the metrics (and any extra fields) to a JSON file."""
+    data = dict(extra or {})
+    data['stages'] = report()
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def print_summary():
+    print(f"\n{'Stage':<24} {'Calls':>8} {'Seconds':>10} {'Peak MB':>9}  Counters")
+    print("-" * 80)
+    for name, entry in _metrics.items():
+        peak = f"{entry['peak_bytes'] / 1e6:>9.2f}" if entry['peak_bytes'] is not None else f"{'-':>9}"
+        counters = ', '.join(f"{key}={value:,}" for key, value in entry['counters'].items())
+        print(f"{name:<24} {entry['calls']:>8} {entry['seconds']:>10.4f} {peak}  {counters}")
+
+
+def add_profile_arguments(parser):
+    """Add the --profile / --profile-memory options to an argparse parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help="record per-stage timings and counters")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="like --profile, and also track peak memory per stage (slower)")
+
+
+def apply_profile_arguments(args):
+    if args.profile or args.profile_memory:
+        enable(memory=args.profile_memory)
@@ -0,0 +1,268 @@
+"""
+k-mer counting in one pass over the sequence.
+Every window is turned into an integer index (2 bits per base, A=0 ... T=3)
+with a rolling shift, so k can go up to 31 in a uint64. Small k are counted
+into a dense 4^k table with numpy.bincount; larger k are sorted and counted
+with numpy.unique, which never allocates more than one entry per window.
+"""
+
+from itertools import product
+
+import numpy as np
+
+from bioinf.encoding import BASES, N_CODE, decode, encode
+
+MAX_K = 31
+# 4^12 int64 counters are 128 MiB; larger k only have a sparse spectrum
+MAX_DENSE_K = 12
+# the dense table is used while it is no bigger than this or the number of windows
+MIN_DENSE_SIZE = 4 ** 8
+
+
+def as_codes(sequence):
+    """
+    Base codes of a string, bytes, PackedGenome or an existing code array.
+    """
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    if hasattr(sequence, 'codes'):
+        return sequence.codes()
+    return encode(sequence)
+
+
+def kmer_indices(codes, k):
+    """
+    Integer index of every k-mer window of an encoded sequence.
+
+    Args:
+        codes: Array of base codes (see bioinf.encoding)
+        k: k-mer length, 1 to MAX_K
+
+    Returns:
+        tuple: (uint64 array of indices, boolean array that is False for
+                windows containing a non-ACGT base)
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+
+    index = np.zeros(n, dtype=np.uint64)
+    bits = (codes & 3).astype(np.uint64)
+    for offset in range(k):
+        index <<= np.uint64(2)
+        index |= bits[offset:offset + n]
+
+    ambiguous = np.concatenate(([0], np.cumsum(codes == N_CODE)))
+    valid = ambiguous[k:] == ambiguous[:n]
+    return index, valid
+
+
+def reverse_complement_indices(index, k):
+    """
+    Index of the reverse complement of every k-mer index: the 2-bit groups
+    are complemented (3 - base) and put in reverse order.
+    """
+    index = np.asarray(index, dtype=np.uint64)
+    complement = ~index
+    reverse = np.zeros_like(index)
+    for _ in range(k):
+        reverse <<= np.uint64(2)
+        reverse |= complement & np.uint64(3)
+        complement >>= np.uint64(2)
+    return reverse
+
+
+def _window_indices(sequence, k, canonical, reverse_complement):
+    index, valid = kmer_indices(as_codes(sequence), k)
+    if not valid.all():
+        index = index[valid]
+    if canonical:
+        index = np.minimum(index, reverse_complement_indices(index, k))
+    elif reverse_complement:
+        index = reverse_complement_indices(index, k)
+    return index
+
+
+def kmer_counts(sequence, k, canonical=False, reverse_complement=False):
+    """
+    Count all 4^k k-mers of a sequence in one pass. Windows containing
+    anything other than A/C/G/T(U) are skipped.
+
+    Args:
+        sequence: String, bytes, PackedGenome or array of base codes
+        k: k-mer length, 1 to MAX_DENSE_K
+        canonical: Count each k-mer together with its reverse complement,
+                   under the smaller of the two indices
+        reverse_complement: Count the k-mers of the reverse complement strand
+
+    Returns:
+        numpy.ndarray: counts indexed like kmer_names(k)
+    """
+    if k > MAX_DENSE_K:
+        raise ValueError(f"k must be at most {MAX_DENSE_K} for a dense table")
+    index = _window_indices(sequence, k, canonical, reverse_complement)
+    return np.bincount(index.astype(np.intp), minlength=4 ** k)
+
+
+def kmer_spectrum(sequence, k, canonical=False, reverse_complement=False):
+    """
+    k-mer spectrum of a sequence for any k from 1 to MAX_K.
+
+    Args:
+        sequence: String, bytes, PackedGenome or array of base codes
+        k: k-mer length
+        canonical: Merge every k-mer with its reverse complement
+        reverse_complement: Count the k-mers of the reverse complement strand
+
+    Returns:
+        KmerSpectrum: the distinct k-mers (sorted indices) and their counts
+    """
+    index = _window_indices(sequence, k, canonical, reverse_complement)
+
+    if k <= MAX_DENSE_K and 4 ** k <= max(len(index), MIN_DENSE_SIZE):
+        counts = np.bincount(index.astype(np.intp), minlength=4 ** k)
+        kmers = np.flatnonzero(counts).astype(np.uint64)
+        return KmerSpectrum(k, kmers, counts[kmers.astype(np.intp)], canonical)
+
+    kmers, counts = np.unique(index, return_counts=True)
+    return KmerSpectrum(k, kmers, counts, canonical)
+
+
+class KmerSpectrum:
+    """
+    Distinct k-mers of a sequence as a sorted uint64 index array with a
+    parallel count array. Look-ups by string use a binary search.
+    """
+
+    def __init__(self, k, kmers, counts, canonical=False):
+        self.k = k
+        self.kmers = kmers
+        self.counts = counts
+        self.canonical = canonical
+
+    def __len__(self):
+        return len(self.kmers)
+
+    def __contains__(self, kmer):
+        return self[kmer] > 0
+
+    def __getitem__(self, kmer):
+        index, valid = kmer_indices(encode(kmer), self.k)
+        if len(index) != 1 or not valid[0]:
+            raise KeyError(kmer)
+        if self.canonical:
+            index = np.minimum(index, reverse_complement_indices(index, self.k))
+        position = np.searchsorted(self.kmers, index[0])
+        if position < len(self.kmers) and self.kmers[position] == index[0]:
+            return int(self.counts[position])
+        return 0
+
+    @property
+    def total(self):
+        """Number of k-mer windows counted."""
+        return int(self.counts.sum())
+
+    def dense(self):
+        """All 4^k counts indexed like kmer_names(k)."""
+        if self.k > MAX_DENSE_K:
+            raise ValueError(f"k must be at most {MAX_DENSE_K} for a dense table")
+        counts = np.zeros(4 ** self.k, dtype=np.int64)
+        counts[self.kmers.astype(np.intp)] = self.counts
+        return counts
+
+    def items(self):
+        """(kmer, count) pairs in index order."""
+        for index, count in zip(self.kmers.tolist(), self.counts.tolist()):
+            yield kmer_name(index, self.k), count
+
+    def most_common(self, n=None):
+        """(kmer, count) pairs, most frequent first."""
+        order = np.argsort(-self.counts, kind='stable')[:n]
+        return [(kmer_name(self.kmers[i], self.k), int(self.counts[i])) for i in order]
+
+
+def repeated_kmers(sequence, k):
+    """
+    Every length-k pattern that occurs at least twice, with its start positions.
+
+    A/C/G/T windows are grouped by their 2-bit index with one stable sort.
+    The few windows holding anything else are grouped by their text; for a
+    string that includes lower case and IUPAC letters, so the result is the
+    same as comparing every substring with every other one.
+
+    Args:
+        sequence: String, bytes, PackedGenome or array of base codes
+        k: Pattern length, 1 to MAX_K
+
+    Returns:
+        list: (pattern, ascending list of positions), in order of first occurrence
+    """
+    text = None
+    codes = as_codes(sequence)
+    if isinstance(sequence, str):
+        text = sequence
+        raw = np.frombuffer(sequence.encode('ascii', 'replace'), dtype=np.uint8)
+        codes[~np.isin(raw, np.frombuffer(b'ACGT', dtype=np.uint8))] = N_CODE
+    index, valid = kmer_indices(codes, k)
+
+    groups = []
+    positions = np.flatnonzero(valid)
+    if len(positions):
+        order = np.argsort(index[positions], kind='stable')
+        keys = index[positions][order]
+        positions = positions[order]
+        bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(keys)]))
+        repeated = ends - starts > 1
+        for start, end in zip(starts[repeated].tolist(), ends[repeated].tolist()):
+            found = positions[start:end].tolist()
+            groups.append((found[0], kmer_name(keys[start], k), found))
+
+    other = {}
+    for i in np.flatnonzero(~valid).tolist():
+        pattern = text[i:i + k] if text is not None else decode(codes[i:i + k])
+        other.setdefault(pattern, []).append(i)
+    groups.extend((found[0], pattern, found) for pattern, found in other.items() if len(found) > 1)
+
+    groups.sort(key=lambda group: group[0])
+    return [(pattern, found) for _, pattern, found in groups]
+
+
+def kmer_names(k):
+    """All 4^k k-mers in index order (AA..A, AA..C, ..., TT..T)."""
+    return [''.join(bases) for bases in product(BASES, repeat=k)]
+
+
+def kmer_name(index, k):
+    """The k-mer string for a single index."""
+    index = int(index)
+    return ''.join(BASES[(index >> (2 * (k - 1 - i))) & 3] for i in range(k))
+
+
+def distinct_substrings(sequence, k):
+    """
+    Set of the distinct length-k substrings of any string (not only DNA).
+    Up to 8 one-byte characters are packed into a uint64 per window and
+    deduplicated with numpy.unique instead of slicing every position.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if len(sequence) < k:
+        return set()
+    try:
+        data = np.frombuffer(sequence.encode('latin-1'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        data = None
+    if data is None or k > 8:
+        return {sequence[i:i + k] for i in range(len(sequence) - k + 1)}
+
+    n = len(data) - k + 1
+    packed = np.zeros(n, dtype=np.uint64)
+    for offset in range(k):
+        packed <<= np.uint64(8)
+        packed |= data[offset:offset + n].astype(np.uint64)
+    return {value.to_bytes(8, 'big')[8 - k:].decode('latin-1')
+            for value in np.unique(packed).tolist()}
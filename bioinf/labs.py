@@ -0,0 +1,47 @@
+"""
+Import the lab scripts by path.
+
+The labs are plain script folders rather than packages, and several of them
+use the same file names (ex1.py, ex2.py), so each one is loaded under a
+unique module name.
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_loaded = {}
+
+
+def load_lab(relative_path):
+    """
+    Import a lab script such as 'lab4/ex2.py' and return the module.
+
+    The lab directory is on sys.path while the script loads, because some
+    scripts import their neighbours (lab4/ex2.py does 'from ex1 import ...').
+    """
+    if relative_path in _loaded:
+        return _loaded[relative_path]
+
+    path = os.path.join(ROOT, relative_path)
+    lab_dir = os.path.dirname(path)
+    name = 'bioinf_lab_' + os.path.splitext(relative_path)[0].replace('/', '_').replace('\\', '_')
+
+    sys.path.insert(0, lab_dir)
+    sys.modules.pop('ex1', None)
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+    finally:
+        sys.path.remove(lab_dir)
+        sys.modules.pop('ex1', None)
+
+    _loaded[relative_path] = module
+    return module
@@ -0,0 +1,370 @@
+"""
+Melting temperature (Tm) for many oligos at once or for every window of a genome.
+
+All methods work from prefix sums over the encoded sequence: base counts for
+the composition formulas and nearest-neighbor dH/dS of every dinucleotide for
+the thermodynamic model. After one O(n) pass the Tm of any segment costs O(1),
+whether the segments are sliding windows or the oligos of a panel.
+
+Methods:
+    simple            4(G+C) + 2(A+T)                        (LAB3/ex1.py)
+    salt_adjusted     81.5 + 16.6 log10[Na+] + 0.41 %GC - 600/N (LAB3/ex1.py)
+    basic             Wallace rule up to 14 bp, else 64.9 + 41(GC-16.4)/N (LAB3/ex2.py)
+    nearest_neighbor  SantaLucia (1998) unified dH/dS with salt and
+                      oligo concentration corrections
+
+Like the LAB3 formulas, only A, C, G and T (either case) are counted: U and
+IUPAC letters add to the length but to neither base count, and make the
+nearest-neighbor Tm undefined.
+"""
+
+import math
+
+import numpy as np
+
+from bioinf.encoding import N_CODE
+from bioinf.kmers import as_codes
+
+R = 1.987  # cal/(K*mol)
+
+# SantaLucia (1998) unified nearest-neighbor parameters, 5'->3' on the top
+# strand: dH in kcal/mol, dS in cal/(K*mol)
+NN_PARAMS = {
+    'AA': (-7.9, -22.2), 'TT': (-7.9, -22.2),
+    'AT': (-7.2, -20.4),
+    'TA': (-7.2, -21.3),
+    'CA': (-8.5, -22.7), 'TG': (-8.5, -22.7),
+    'GT': (-8.4, -22.4), 'AC': (-8.4, -22.4),
+    'CT': (-7.8, -21.0), 'AG': (-7.8, -21.0),
+    'GA': (-8.2, -22.2), 'TC': (-8.2, -22.2),
+    'CG': (-10.6, -27.2),
+    'GC': (-9.8, -24.4),
+    'GG': (-8.0, -19.9), 'CC': (-8.0, -19.9),
+}
+# initiation, counted once for each terminal base pair
+INIT_GC = (0.1, -2.8)
+INIT_AT = (2.3, 4.1)
+SYMMETRY_DS = -1.4
+
+DEFAULT_NA = 50             # mM
+DEFAULT_OLIGO_CONCENTRATION = 50  # nM
+
+METHODS = ('simple', 'salt_adjusted', 'basic', 'nearest_neighbor')
+
+# A/C/G/T codes as in bioinf.encoding, but U is not folded into T
+_TM_TABLE = np.full(256, N_CODE, dtype=np.uint8)
+for _code, _bases in enumerate(['Aa', 'Cc', 'Gg', 'Tt']):
+    for _base in _bases:
+        _TM_TABLE[ord(_base)] = _code
+
+
+def tm_codes(sequence):
+    """
+    Base codes for the Tm methods: code arrays and PackedGenome pass through
+    as_codes, text keeps only literal A/C/G/T (everything else is N_CODE).
+    """
+    if isinstance(sequence, str):
+        sequence = sequence.encode('ascii', 'replace')
+    if isinstance(sequence, (bytes, bytearray, memoryview)):
+        return _TM_TABLE[np.frombuffer(sequence, dtype=np.uint8)]
+    return as_codes(sequence)
+
+
+# dH/dS of a base-code pair in tenths, indexed by 5 * first + second (N pairs
+# are 0); the parameters have one decimal, so integer prefix sums stay exact
+# however long the genome is
+_PAIR_DH = np.zeros(25, dtype=np.int64)
+_PAIR_DS = np.zeros(25, dtype=np.int64)
+for _pair, (_dh, _ds) in NN_PARAMS.items():
+    _first, _second = tm_codes(_pair)
+    _PAIR_DH[5 * _first + _second] = round(_dh * 10)
+    _PAIR_DS[5 * _first + _second] = round(_ds * 10)
+
+
+def _cumulative(values, dtype):
+    prefix = np.zeros(len(values) + 1, dtype=dtype)
+    np.cumsum(values, dtype=dtype, out=prefix[1:])
+    return prefix
+
+
+class SegmentStats:
+    """
+    Prefix sums of one encoded sequence, from which the base counts and
+    nearest-neighbor sums of any [start, start + length) segment are read.
+    """
+
+    def __init__(self, codes):
+        self.codes = codes
+        gc = (codes == 1) | (codes == 2)
+        at = (codes == 0) | (codes == 3)
+        self.gc_prefix = _cumulative(gc, np.int64)
+        self.at_prefix = _cumulative(at, np.int64)
+        self._dh_prefix = None
+        self._ds_prefix = None
+
+    def _nn_prefix(self):
+        if self._dh_prefix is None:
+            pair = self.codes[:-1].astype(np.intp) * 5 + self.codes[1:]
+            self._dh_prefix = _cumulative(_PAIR_DH[pair], np.int64)
+            self._ds_prefix = _cumulative(_PAIR_DS[pair], np.int64)
+        return self._dh_prefix, self._ds_prefix
+
+    def counts(self, starts, lengths):
+        """(GC count, AT count) of every segment."""
+        ends = starts + lengths
+        return (self.gc_prefix[ends] - self.gc_prefix[starts],
+                self.at_prefix[ends] - self.at_prefix[starts])
+
+    def nn_sums(self, starts, lengths):
+        """Summed dinucleotide (dH, dS) of every segment of at least 2 bases."""
+        dh_prefix, ds_prefix = self._nn_prefix()
+        last_pair = np.maximum(starts + lengths - 1, starts)
+        return ((dh_prefix[last_pair] - dh_prefix[starts]) / 10,
+                (ds_prefix[last_pair] - ds_prefix[starts]) / 10)
+
+    def self_complementary(self, starts, lengths):
+        """
+        True for segments equal to their own reverse complement. Base pairs
+        are compared from the ends inwards, keeping only the segments that
+        still match, so the work shrinks quickly after the first pairs.
+        """
+        result = (lengths > 0) & (lengths % 2 == 0)
+        candidates = np.flatnonzero(result)
+        offset = 0
+        while len(candidates):
+            unfinished = offset < lengths[candidates] // 2
+            candidates = candidates[unfinished]
+            left = self.codes[starts[candidates] + offset].astype(np.int16)
+            right = self.codes[starts[candidates] + lengths[candidates] - 1 - offset]
+            paired = left + right == 3
+            result[candidates[~paired]] = False
+            candidates = candidates[paired]
+            offset += 1
+        return result
+
+
+class WindowStats:
+    """
+    SegmentStats of equally spaced windows of one size, starting at 0,
+    step, 2 * step, ... The prefix differences are strided slices instead
+    of per-window gathers; pass the matching starts/lengths to segment_tm.
+    """
+
+    def __init__(self, stats, window_size, step, count):
+        self.stats = stats
+        self.codes = stats.codes
+        self.window_size = window_size
+        self.step = step
+        self.count = count
+
+    def _difference(self, prefix, span):
+        return prefix[span::self.step][:self.count] - prefix[::self.step][:self.count]
+
+    def counts(self, starts, lengths):
+        return (self._difference(self.stats.gc_prefix, self.window_size),
+                self._difference(self.stats.at_prefix, self.window_size))
+
+    def nn_sums(self, starts, lengths):
+        dh_prefix, ds_prefix = self.stats._nn_prefix()
+        span = max(self.window_size - 1, 0)
+        return self._difference(dh_prefix, span) / 10, self._difference(ds_prefix, span) / 10
+
+    def self_complementary(self, starts, lengths):
+        # the outer base pair of every window is compared with slices; only
+        # the windows it pairs go through the general check
+        result = np.zeros(self.count, dtype=bool)
+        if self.window_size % 2:
+            return result
+        left = self.codes[::self.step][:self.count].astype(np.int16)
+        right = self.codes[self.window_size - 1::self.step][:self.count]
+        candidates = np.flatnonzero(left + right == 3)
+        result[candidates] = self.stats.self_complementary(starts[candidates], lengths[candidates])
+        return result
+
+
+def _tm_simple(stats, starts, lengths, na, oligo_concentration):
+    gc, at = stats.counts(starts, lengths)
+    return (4 * gc + 2 * at).astype(float)
+
+
+def _tm_salt_adjusted(stats, starts, lengths, na, oligo_concentration):
+    gc, _ = stats.counts(starts, lengths)
+    if np.ndim(na) == 0:
+        salt = 16.6 * math.log10(na / 1000)
+    else:
+        salt = 16.6 * np.log10(np.asarray(na, dtype=float) / 1000)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gc_content = (gc / lengths) * 100
+        tm = 81.5 + salt + 0.41 * gc_content - (600 / lengths)
+    return np.where(lengths == 0, 0.0, tm)
+
+
+def _tm_basic(stats, starts, lengths, na, oligo_concentration):
+    gc, at = stats.counts(starts, lengths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        long_oligo = 64.9 + 41 * (gc - 16.4) / lengths
+    tm = np.where(lengths <= 14, (2 * at + 4 * gc).astype(float), long_oligo)
+    return np.where(lengths == 0, 0.0, tm)
+
+
+def _tm_nearest_neighbor(stats, starts, lengths, na, oligo_concentration):
+    gc, at = stats.counts(starts, lengths)
+    dh, ds = stats.nn_sums(starts, lengths)
+
+    ends = starts + np.maximum(lengths, 1) - 1
+    for terminal in (stats.codes[starts], stats.codes[ends]):
+        terminal_gc = (terminal == 1) | (terminal == 2)
+        dh = dh + np.where(terminal_gc, INIT_GC[0], INIT_AT[0])
+        ds = ds + np.where(terminal_gc, INIT_GC[1], INIT_AT[1])
+
+    symmetric = stats.self_complementary(starts, lengths)
+    ds = ds + np.where(symmetric, SYMMETRY_DS, 0.0)
+    ds = ds + 0.368 * (lengths - 1) * np.log(np.asarray(na, dtype=float) / 1000)
+
+    strands = np.asarray(oligo_concentration, dtype=float) * 1e-9 / np.where(symmetric, 1, 4)
+    tm = 1000 * dh / (ds + R * np.log(strands)) - 273.15
+    # undefined for single bases and for segments with non-ACGT bases
+    return np.where((lengths >= 2) & (gc + at == lengths), tm, np.nan)
+
+
+_METHODS = {
+    'simple': _tm_simple,
+    'salt_adjusted': _tm_salt_adjusted,
+    'basic': _tm_basic,
+    'nearest_neighbor': _tm_nearest_neighbor,
+}
+
+
+def segment_tm(stats, starts, lengths, method='nearest_neighbor',
+               na=DEFAULT_NA, oligo_concentration=DEFAULT_OLIGO_CONCENTRATION):
+    """
+    Tm of segments of a sequence whose prefix sums are already built.
+
+    Args:
+        stats: SegmentStats of the sequence
+        starts, lengths: Integer arrays describing the segments
+        method: One of METHODS
+        na: Na+ in mM (scalar or one value per segment)
+        oligo_concentration: Total strand concentration in nM (scalar or per segment)
+
+    Returns:
+        numpy.ndarray: Tm in C per segment (NaN where the method is undefined)
+
+    Raises:
+        ValueError: unknown method, or a concentration that is not positive
+    """
+    if method not in _METHODS:
+        raise ValueError(f"Unknown Tm method '{method}', expected one of {', '.join(METHODS)}")
+    for value, name in ((na, 'Na+'), (oligo_concentration, 'Oligo')):
+        # log10/log of the concentrations: 0 or less would give -inf/NaN
+        if not np.all(np.asarray(value, dtype=float) > 0):
+            raise ValueError(f"{name} concentration must be positive")
+    starts = np.asarray(starts, dtype=np.intp)
+    lengths = np.asarray(lengths, dtype=np.intp)
+    return _METHODS[method](stats, starts, lengths, na, oligo_concentration)
+
+
+def tm_windows(sequence, window_size, method='nearest_neighbor', step=1,
+               na=DEFAULT_NA, oligo_concentration=DEFAULT_OLIGO_CONCENTRATION):
+    """
+    Tm of every window along a sequence in O(n) total.
+
+    Args:
+        sequence: String, bytes, PackedGenome or array of base codes
+        window_size: Window length
+        method: One of METHODS
+        step: Distance between window starts
+        na: Na+ in mM
+        oligo_concentration: Total strand concentration in nM
+
+    Returns:
+        tuple: numpy arrays (positions, tm_values)
+    """
+    if window_size < 1 or step < 1:
+        raise ValueError("window size and step must be at least 1")
+    codes = tm_codes(sequence)
+    positions = np.arange(0, max(len(codes) - window_size + 1, 0), step)
+    lengths = np.full(len(positions), window_size, dtype=np.intp)
+    stats = WindowStats(SegmentStats(codes), window_size, step, len(positions))
+    return positions, segment_tm(stats, positions, lengths, method, na, oligo_concentration)
+
+
+def window_sweep(sequence, window_sizes, method='nearest_neighbor', step=1, na=DEFAULT_NA,
+                 oligo_concentration=DEFAULT_OLIGO_CONCENTRATION, dtype=np.float32):
+    """
+    Tm and GC profiles for many window sizes from one set of prefix sums.
+    The sequence is encoded and summed once; every window size then costs
+    one O(n) profile, with no re-scan of the sequence.
+
+    Args:
+        sequence: String, bytes, PackedGenome or array of base codes
+        window_sizes: Window lengths (one output row each)
+        method: One of METHODS
+        step: Distance between window starts
+        na: Na+ in mM
+        oligo_concentration: Total strand concentration in nM
+        dtype: Value type of the output arrays (float32 halves the memory
+               of the window size x position grid)
+
+    Returns:
+        tuple: (positions, tm, gc); positions are the window starts of the
+               smallest window, tm and gc have shape (len(window_sizes),
+               len(positions)) and are NaN where a window runs past the end
+    """
+    window_sizes = [int(size) for size in window_sizes]
+    if not window_sizes or min(window_sizes) < 1 or step < 1:
+        raise ValueError("window sizes and step must be at least 1")
+    codes = tm_codes(sequence)
+    stats = SegmentStats(codes)
+    positions = np.arange(0, max(len(codes) - min(window_sizes) + 1, 0), step)
+    tm = np.full((len(window_sizes), len(positions)), np.nan, dtype=dtype)
+    gc = np.full((len(window_sizes), len(positions)), np.nan, dtype=dtype)
+
+    for row, window_size in enumerate(window_sizes):
+        count = np.searchsorted(positions, len(codes) - window_size, side='right')
+        starts = positions[:count]
+        lengths = np.full(count, window_size, dtype=np.intp)
+        windows = WindowStats(stats, window_size, step, count)
+        tm[row, :count] = segment_tm(windows, starts, lengths, method, na, oligo_concentration)
+        gc[row, :count] = windows.counts(starts, lengths)[0] / window_size
+    return positions, tm, gc
+
+
+def oligo_segments(oligos):
+    """
+    Concatenate and encode a list of oligos once.
+
+    Returns:
+        tuple: (SegmentStats, starts, lengths) to pass to segment_tm
+    """
+    lengths = np.fromiter(map(len, oligos), dtype=np.intp, count=len(oligos))
+    starts = np.zeros(len(lengths), dtype=np.intp)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    # one spare base so that empty oligos at the end still index a valid position
+    codes = np.append(tm_codes(''.join(oligos)), np.uint8(N_CODE))
+    return SegmentStats(codes), starts, lengths
+
+
+def tm_batch(oligos, method='nearest_neighbor', na=DEFAULT_NA,
+             oligo_concentration=DEFAULT_OLIGO_CONCENTRATION):
+    """
+    Tm of many oligos: they are concatenated and encoded once, and every
+    oligo is a segment of the combined prefix sums.
+
+    Args:
+        oligos: List of sequences
+        method: One of METHODS
+        na: Na+ in mM (scalar or one value per oligo)
+        oligo_concentration: Total strand concentration in nM
+
+    Returns:
+        numpy.ndarray: Tm in C per oligo
+    """
+    stats, starts, lengths = oligo_segments(oligos)
+    return segment_tm(stats, starts, lengths, method, na, oligo_concentration)
+
+
+def melting_temperature(sequence, method='nearest_neighbor', na=DEFAULT_NA,
+                        oligo_concentration=DEFAULT_OLIGO_CONCENTRATION):
+    """Tm of a single oligo."""
+    return float(tm_batch([sequence], method, na, oligo_concentration)[0])
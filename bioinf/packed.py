@@ -0,0 +1,185 @@
+"""
+2-bit packed genome store.
+
+File layout (little endian):
+    magic     8 bytes  b'BIOPK2\\x00\\x01'
+    length    uint64   number of bases
+    packed    ceil(length / 4) bytes, 4 bases per byte, first base in the high bits
+    mask      ceil(length / 8) bytes, one bit per base, set for N/ambiguous bases
+
+The file is opened with mmap, so reopening a genome does not parse anything
+and only the pages that are actually touched are read from disk.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from bioinf import cache
+from bioinf.encoding import N_CODE, decode, encode
+from bioinf.fasta import read_sequence
+
+MAGIC = b'BIOPK2\x00\x01'
+PACKED_SUFFIX = '.packed'
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+_HEADER = struct.Struct('<8sQ')
+_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+
+
+def pack_sequence(sequence, path):
+    """
+    Write a sequence to a packed genome file.
+
+    Args:
+        sequence: DNA string (case insensitive); non-ACGT characters are stored as N
+        path: Output file path
+    """
+    codes = encode(sequence)
+    length = len(codes)
+    ambiguous = codes == N_CODE
+
+    padded = np.zeros(-(-length // 4) * 4, dtype=np.uint8)
+    padded[:length] = np.where(ambiguous, 0, codes)
+    quads = padded.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    mask = np.packbits(ambiguous, bitorder='little')
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, length))
+        f.write(packed.astype(np.uint8).tobytes())
+        f.write(mask.tobytes())
+
+
+def pack_fasta(fasta_path, path=None):
+    """Pack all records of a FASTA file (concatenated) and return the output path."""
+    if path is None:
+        path = fasta_path + PACKED_SUFFIX
+    pack_sequence(read_sequence(fasta_path, upper=True), path)
+    return path
+
+
+def iter_code_blocks(sequence, block_size=DEFAULT_BLOCK_SIZE, overlap=0):
+    """
+    Base codes of a string, bytes, PackedGenome or code array, one block at a
+    time, so a packed genome is never expanded to one byte per base as a whole.
+
+    Args:
+        sequence: Input sequence
+        block_size: Bases per block
+        overlap: Extra bases read past the end of every block, so that windows
+                 of up to overlap + 1 bases starting in the block are complete
+
+    Yields:
+        tuple: (start of the block, codes of [start, start + block_size + overlap))
+    """
+    length = len(sequence)
+    for start in range(0, length, block_size):
+        end = min(start + block_size + overlap, length)
+        if isinstance(sequence, np.ndarray):
+            codes = sequence[start:end]
+        elif hasattr(sequence, 'codes'):
+            codes = sequence.codes(start, end)
+        else:
+            codes = encode(sequence[start:end])
+        yield start, codes
+
+
+def load_genome(fasta_path):
+    """
+    Open the packed copy of a FASTA file, creating it on first use.
+
+    With the genome cache enabled the packed file lives in the cache directory;
+    otherwise it is kept next to the FASTA file and refreshed when the FASTA
+    file is newer.
+    """
+    if cache.is_enabled():
+        entry = cache.cache_file(fasta_path, 'packed', PACKED_SUFFIX)
+        if not cache.lookup(entry):
+            cache.store(entry, lambda tmp_path: pack_fasta(fasta_path, tmp_path))
+        return PackedGenome(entry)
+
+    path = fasta_path + PACKED_SUFFIX
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(fasta_path):
+        pack_fasta(fasta_path, path)
+    return PackedGenome(path)
+
+
+class PackedGenome:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a packed genome file")
+
+        packed_size = -(-self.length // 4)
+        mask_size = -(-self.length // 8)
+        offset = _HEADER.size
+        self.packed = np.frombuffer(self._mmap, dtype=np.uint8, count=packed_size, offset=offset)
+        self.mask = np.frombuffer(self._mmap, dtype=np.uint8, count=mask_size,
+                                  offset=offset + packed_size)
+
+    def __len__(self):
+        return self.length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # numpy views keep the mmap exported, drop them before closing it
+        self.packed = self.mask = None
+        self._mmap.close()
+        self._file.close()
+
+    def _bounds(self, start, end):
+        start, end, _ = slice(start, end).indices(self.length)
+        return start, max(start, end)
+
+    def packed_region(self, start=0, end=None):
+        """
+        Zero-copy view of the packed bytes covering [start, end).
+        The first base of the region is base (start % 4) of the first byte.
+        """
+        start, end = self._bounds(start, end)
+        return self.packed[start // 4:-(-end // 4)]
+
+    def ambiguous(self, start=0, end=None):
+        """Boolean array, True where the base in [start, end) is N/ambiguous."""
+        start, end = self._bounds(start, end)
+        bits = np.unpackbits(self.mask[start // 8:-(-end // 8)], bitorder='little')
+        return bits[start % 8:start % 8 + end - start].astype(bool)
+
+    def codes(self, start=0, end=None):
+        """
+        Base codes of [start, end) as a uint8 array (0-3 for ACGT, N_CODE for N).
+        """
+        start, end = self._bounds(start, end)
+        quads = self.packed_region(start, end)
+        codes = ((quads[:, None] >> _SHIFTS) & 3).reshape(-1)
+        codes = codes[start % 4:start % 4 + end - start]
+        codes[self.ambiguous(start, end)] = N_CODE
+        return codes
+
+    def sequence(self, start=0, end=None):
+        """Bases of [start, end) as an upper case string."""
+        return decode(self.codes(start, end))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return self.sequence()[key]
+            return self.sequence(key.start, key.stop)
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError('genome index out of range')
+        return self.sequence(key, key + 1)
@@ -0,0 +1,126 @@
+"""
+Deferred matplotlib import.
+
+matplotlib.pyplot takes most of a second to import, so the lab scripts only
+import it through get_pyplot() when a plot is actually drawn. Without a
+display (e.g. on a server) the non-interactive Agg backend is selected.
+"""
+
+import os
+import sys
+
+
+def has_display():
+    if sys.platform.startswith(('win', 'darwin')):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def get_pyplot(backend=None):
+    """
+    Import and return matplotlib.pyplot.
+
+    Args:
+        backend: Backend to force (e.g. 'Agg' for scripts that only save files);
+                 by default Agg is used only when there is no display and
+                 MPLBACKEND is not set
+    """
+    import matplotlib
+    if backend:
+        matplotlib.use(backend)
+    elif not has_display() and not os.environ.get('MPLBACKEND'):
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def minmax_decimate(x, y, bins):
+    """
+    Reduce a series to the minimum and maximum of each of `bins` consecutive
+    slices (in x order), which is what a line drawn one pixel column per
+    slice shows anyway. The first and last points are always kept.
+
+    Args:
+        x: Increasing x values
+        y: y values (NaN marks gaps)
+        bins: Number of slices, normally the plot width in pixels
+
+    Returns:
+        tuple: numpy arrays (x, y) with at most 2 * bins + 2 points
+    """
+    import numpy as np
+
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * bins + 2:
+        return x, y
+
+    size = -(-n // bins)
+    bins = -(-n // size)
+    padded = np.full(bins * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(bins, size)
+    missing = np.isnan(padded)
+    offsets = np.arange(bins) * size
+    # NaN never wins; an all-NaN slice returns its first point, keeping the gap
+    low = np.where(missing, np.inf, padded).argmin(axis=1) + offsets
+    high = np.where(missing, -np.inf, padded).argmax(axis=1) + offsets
+    low = np.minimum(low, n - 1)
+    high = np.minimum(high, n - 1)
+
+    index = np.concatenate(([0], np.column_stack((np.minimum(low, high), np.maximum(low, high))).ravel(), [n - 1]))
+    return x[index], y[index]
+
+
+class DecimatedLine:
+    """
+    A line plot of a long series that only hands matplotlib about two points
+    per pixel column of the visible x range. The full series is kept; when the
+    view is zoomed or panned the visible part is decimated again, so detail
+    appears as the user zooms in.
+    """
+
+    def __init__(self, ax, x, y, *args, **kwargs):
+        import numpy as np
+
+        self.ax = ax
+        self.x = np.asarray(x)
+        self.y = np.asarray(y, dtype=float)
+        self.line, = ax.plot([], [], *args, **kwargs)
+        self.update()
+        ax.relim()
+        ax.autoscale_view()
+        # a plain function keeps this object alive (bound methods are weakly referenced)
+        ax.callbacks.connect('xlim_changed', lambda ax: self._on_xlim_changed())
+
+    def _bins(self):
+        # twice the on-screen width leaves enough points for saving at a higher dpi
+        return max(1, int(self.ax.bbox.width) * 2)
+
+    def update(self, xlim=None):
+        """Decimate the points inside xlim (default: all of them) and redraw."""
+        import numpy as np
+
+        start, end = 0, len(self.x)
+        if xlim is not None:
+            # one extra point each side so the line runs to the plot edges
+            start = max(int(np.searchsorted(self.x, min(xlim), 'left')) - 1, 0)
+            end = min(int(np.searchsorted(self.x, max(xlim), 'right')) + 1, len(self.x))
+        self.line.set_data(*minmax_decimate(self.x[start:end], self.y[start:end], self._bins()))
+
+    def _on_xlim_changed(self):
+        self.update(self.ax.get_xlim())
+        self.ax.figure.canvas.draw_idle()
+
+
+def plot_decimated(x, y, *args, ax=None, **kwargs):
+    """
+    Drop-in for plt.plot(x, y, ...) with a DecimatedLine.
+
+    Returns:
+        matplotlib.lines.Line2D: the drawn line (for legends etc.)
+    """
+    if ax is None:
+        ax = get_pyplot().gca()
+    return DecimatedLine(ax, x, y, *args, **kwargs).line
@@ -0,0 +1,269 @@
+"""
+Multi-resolution window pyramid.
+
+Level 0 holds the sliding-window value (base frequency, GC fraction or Tm,
+computed like compute_frequencies / sliding_window_tm) at every window start.
+Level k summarises 2^k consecutive level-0 values with their mean, minimum and
+maximum. A query for a region at a given resolution picks the coarsest level
+that still gives enough bins and reads only those bins from the memory-mapped
+file, so its cost is proportional to the size of the answer, not the region.
+
+File layout (little endian):
+    magic         8 bytes  b'BIOPYR\\x00\\x01'
+    index offset  uint64
+    index size    uint64
+    data          float32 arrays: per record, column and level the means,
+                  then (levels >= 1) the minima and maxima
+    index         JSON: window size, columns and the offset of every array
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from bioinf.chunked import DEFAULT_CHUNK_SIZE, chunk_columns, column_names, iter_window_chunks
+
+MAGIC = b'BIOPYR\x00\x01'
+PYRAMID_SUFFIX = '.pyr'
+BLOCK_LEVELS = 20  # level-0 values are reduced in blocks of 2^20
+
+_HEADER = struct.Struct('<8sQQ')
+
+
+def _merge_pairs(sums, counts, minimum, maximum):
+    """
+    One level up: merge neighbouring bins, padding an odd tail with an empty
+    bin (sums and counts are carried so that means skip NaN).
+    """
+    if len(sums) % 2:
+        sums = np.append(sums, 0.0)
+        counts = np.append(counts, 0)
+        minimum = np.append(minimum, np.float32(np.nan))
+        maximum = np.append(maximum, np.float32(np.nan))
+    # fmin/fmax ignore NaN unless both halves are NaN
+    return (sums[0::2] + sums[1::2], counts[0::2] + counts[1::2],
+            np.fmin(minimum[0::2], minimum[1::2]), np.fmax(maximum[0::2], maximum[1::2]))
+
+
+def _level0_bins(values):
+    present = ~np.isnan(values)
+    return np.where(present, values, 0.0).astype(np.float64), present.astype(np.int32), values, values
+
+
+def _mean(sums, counts):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums / counts).astype(np.float32)
+
+
+def _level_sizes(windows):
+    sizes = [windows]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def _write_levels(f, source, windows):
+    """
+    Write every level of one column at the current position of f: level 0,
+    then for every level k >= 1 the mean, minimum and maximum of each 2^k
+    consecutive level-0 values (the tail bin may be shorter). Reads
+    the level-0 values from the binary float32 file `source` in blocks of
+    2^BLOCK_LEVELS values. A block is aligned to the bins of the levels up
+    to BLOCK_LEVELS, so those are reduced block by block; only the
+    ceil(windows / 2^BLOCK_LEVELS) bins above are reduced in memory.
+
+    Returns:
+        list: {'bins', 'offset'} of every level
+    """
+    levels = []
+    position = f.tell()
+    for level, bins in enumerate(_level_sizes(windows)):
+        levels.append({'bins': bins, 'offset': position})
+        position += bins * 4 * (1 if level == 0 else 3)
+
+    def write(level, first, arrays):
+        entry = levels[level]
+        for which, array in enumerate(arrays):
+            f.seek(entry['offset'] + (which * entry['bins'] + first) * 4)
+            f.write(array.astype('<f4').tobytes())
+
+    top = min(BLOCK_LEVELS, len(levels) - 1)
+    block_size = 1 << BLOCK_LEVELS
+    tops = []
+    source.seek(0)
+    for start in range(0, windows, block_size):
+        values = np.frombuffer(source.read(min(block_size, windows - start) * 4), dtype='<f4')
+        write(0, start, [values])
+        bins = _level0_bins(values.astype(np.float32))
+        for level in range(1, top + 1):
+            bins = _merge_pairs(*bins)
+            write(level, start >> level, [_mean(bins[0], bins[1]), bins[2], bins[3]])
+        tops.append(bins)
+
+    if top + 1 < len(levels):
+        bins = tuple(np.concatenate(parts) for parts in zip(*tops))
+        for level in range(top + 1, len(levels)):
+            bins = _merge_pairs(*bins)
+            write(level, 0, [_mean(bins[0], bins[1]), bins[2], bins[3]])
+
+    f.seek(position)
+    return levels
+
+
+def build_pyramid(fasta_path, path=None, window_size=30, columns=('GC',), tm_method='basic',
+                  chunk_size=DEFAULT_CHUNK_SIZE, join_records=False, **conditions):
+    """
+    Compute the level-0 window values of every record (in chunks, see
+    bioinf.chunked) and write the full pyramid to one file. Level 0 is
+    spooled to a temporary file next to the output, so memory use does not
+    depend on the record length. A record shorter than the window gets an
+    entry with 0 windows.
+
+    Args:
+        fasta_path: FASTA file
+        path: Output path (default: fasta_path + '.pyr')
+        window_size: Sliding window length of level 0
+        columns: Names from bioinf.chunked.COLUMNS
+        tm_method: Method for the 'tm' column
+        join_records: Concatenate all records, like the lab scripts
+        conditions: na (mM) and oligo_concentration (nM) for the Tm column
+
+    Returns:
+        str: output path
+
+    Raises:
+        ValueError: two records have the same name
+    """
+    if path is None:
+        path = fasta_path + PYRAMID_SUFFIX
+    names = column_names(columns, tm_method)
+    index = {'window': window_size, 'columns': names, 'records': {}}
+    spool_dir = os.path.dirname(os.path.abspath(path))
+
+    with open(path, 'wb') as f, contextlib.ExitStack() as stack:
+        spools = [stack.enter_context(tempfile.TemporaryFile(dir=spool_dir)) for _ in names]
+        f.write(_HEADER.pack(MAGIC, 0, 0))
+
+        def write_record(record, windows):
+            entry = {'windows': windows, 'columns': {}}
+            for name, spool in zip(names, spools):
+                entry['columns'][name] = _write_levels(f, spool, windows)
+            index['records'][record] = entry
+
+        record, windows = None, 0
+        for name, first, piece in iter_window_chunks(fasta_path, window_size, 1, chunk_size, join_records,
+                                                     keep_empty=True):
+            if first == 0:  # every record starts with the piece of its first window
+                if record is not None:
+                    write_record(record, windows)
+                if name in index['records'] or name == record:
+                    raise ValueError(f"Duplicate record name '{name}' in '{fasta_path}'")
+                record, windows = name, 0
+                for spool in spools:
+                    spool.seek(0)
+                    spool.truncate()
+            if len(piece) < window_size:
+                continue
+            values = chunk_columns(piece, window_size, 1, columns, tm_method, **conditions)
+            for column, spool in enumerate(spools):
+                spool.write(values[:, column].astype('<f4').tobytes())
+            windows += len(values)
+        if record is not None:
+            write_record(record, windows)
+
+        encoded = json.dumps(index).encode('utf-8')
+        index_offset = f.tell()
+        f.write(encoded)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, index_offset, len(encoded)))
+
+    return path
+
+
+class WindowPyramid:
+    """Read-only access to a pyramid file through mmap."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_offset, index_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a window pyramid file")
+        index = json.loads(self._mmap[index_offset:index_offset + index_size].decode('utf-8'))
+        self.window_size = index['window']
+        self.columns = index['columns']
+        self.records = index['records']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def windows(self, record):
+        """Number of level-0 values (window starts) of a record."""
+        return self.records[record]['windows']
+
+    def _array(self, level_entry, which, start, end):
+        offset = level_entry['offset'] + which * level_entry['bins'] * 4
+        # copied so that the results outlive the mapping
+        return np.frombuffer(self._mmap, dtype='<f4', count=end - start, offset=offset + start * 4).copy()
+
+    def _column(self, column):
+        if column is None:
+            return self.columns[0]
+        if column == 'tm':
+            column = next((name for name in self.columns if name.startswith('tm_')), column)
+        if column not in self.columns:
+            raise KeyError(f"Column '{column}' not in pyramid ({', '.join(self.columns)})")
+        return column
+
+    def profile(self, record, start=0, end=None, resolution=1000, column=None):
+        """
+        Bins covering the windows that start in [start, end), from the
+        coarsest level that still gives at least `resolution` bins (level 0
+        when the region is smaller than that). Edge bins may extend past the
+        region.
+
+        Args:
+            record: Record name
+            start, end: 0-based window start positions (end exclusive)
+            resolution: Minimum number of bins wanted
+            column: Column name, 'tm' for the Tm column (default: the first column)
+
+        Returns:
+            tuple: (bin size, bin start positions, mean, minimum, maximum)
+        """
+        entry = self.records[record]
+        levels = entry['columns'][self._column(column)]
+        total = entry['windows']
+        end = total if end is None else min(end, total)
+        start = max(start, 0)
+        if start >= end:
+            empty = np.zeros(0, dtype=np.float32)
+            return 1, np.zeros(0, dtype=np.int64), empty, empty, empty
+
+        level = 0
+        while level + 1 < len(levels) and (end - start) >> (level + 1) >= resolution:
+            level += 1
+        first, last = start >> level, ((end - 1) >> level) + 1
+
+        mean = self._array(levels[level], 0, first, last)
+        if level == 0:
+            minimum = maximum = mean
+        else:
+            minimum = self._array(levels[level], 1, first, last)
+            maximum = self._array(levels[level], 2, first, last)
+        return 1 << level, np.arange(first, last, dtype=np.int64) << level, mean, minimum, maximum
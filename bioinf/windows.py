@@ -0,0 +1,75 @@
+"""
+Sliding-window symbol counts from prefix sums.
+One cumulative sum per symbol group is built in a single pass; the count in
+any window is then the difference of two prefix entries, so the cost is O(n)
+whatever the window size, and windows can be taken at any step.
+"""
+
+import numpy as np
+
+
+def as_bytes(sequence):
+    """Raw bytes of a string, bytes or PackedGenome (one byte per base)."""
+    if isinstance(sequence, (bytes, bytearray, memoryview)):
+        return bytes(sequence)
+    if hasattr(sequence, 'sequence'):
+        sequence = sequence.sequence()
+    return sequence.encode('latin-1', 'replace')
+
+
+def prefix_counts(sequence, symbols):
+    """
+    Cumulative count of a group of symbols.
+
+    Args:
+        sequence: String, bytes or PackedGenome
+        symbols: Characters counted together (e.g. 'A', or 'GC')
+
+    Returns:
+        numpy.ndarray: length len(sequence) + 1, entry i = matches in sequence[:i]
+    """
+    data = np.frombuffer(as_bytes(sequence), dtype=np.uint8)
+    matches = np.zeros(len(data), dtype=bool)
+    for symbol in set(symbols.encode('latin-1')):
+        matches |= data == symbol
+    dtype = np.int32 if len(data) < 2 ** 31 else np.int64
+    prefix = np.zeros(len(data) + 1, dtype=dtype)
+    np.cumsum(matches, dtype=dtype, out=prefix[1:])
+    return prefix
+
+
+def window_starts(length, window_size, step=1):
+    """Start position of every complete window."""
+    if window_size < 1 or step < 1:
+        raise ValueError("window size and step must be at least 1")
+    return np.arange(0, max(length - window_size + 1, 0), step)
+
+
+def window_counts(sequence, window_size, symbols=('A', 'C', 'G', 'T'), step=1):
+    """
+    Count symbol groups in every window.
+
+    Args:
+        sequence: String, bytes or PackedGenome
+        window_size: Window length
+        symbols: Symbol groups; each group is counted as one row
+        step: Distance between window starts
+
+    Returns:
+        tuple: (window start positions, int array of shape (len(symbols), windows))
+    """
+    data = as_bytes(sequence)
+    starts = window_starts(len(data), window_size, step)
+    n = len(starts)
+    counts = np.empty((len(symbols), n), dtype=np.int64)
+    for row, group in enumerate(symbols):
+        prefix = prefix_counts(data, group)
+        # slices rather than prefix[starts + window_size] avoid a gather per window
+        counts[row] = prefix[window_size::step][:n] - prefix[::step][:n]
+    return starts, counts
+
+
+def window_frequencies(sequence, window_size, symbols=('A', 'C', 'G', 'T'), step=1):
+    """Like window_counts, with counts divided by the window size."""
+    starts, counts = window_counts(sequence, window_size, symbols, step)
+    return starts, counts / window_size
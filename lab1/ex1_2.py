@@ -1,44 +1,36 @@
 import sys
 import os
+import json
+import argparse
 from collections import Counter
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.composition import composition, iter_compositions
+from bioinf.fasta import iter_fasta
+
 # Problem 1: Find alphabet of a sequence
 def find_alphabet(sequence: str) -> set:
     return set(sequence)
 
 # Problem 2: DNA sequence analysis
-seq = "ACGGGCATATGCGC"
-alphabet = find_alphabet(seq)
-print("Problem 1 - Alphabet of sequence:", alphabet)
-
-print("\nProblem 2 - DNA Sequence Analysis:")
-print(f"Sequence: {seq}")
-percentages = {base: (seq.count(base) / len(seq)) * 100 for base in alphabet}
-for base in sorted(percentages):
-    print(f"{base}: {percentages[base]:.2f}%")
+# (run from __main__ only, so process-pool workers that re-import this file do not rerun it)
+def show_problems_1_and_2():
+    seq = "ACGGGCATATGCGC"
+    alphabet = find_alphabet(seq)
+    print("Problem 1 - Alphabet of sequence:", alphabet)
+
+    print("\nProblem 2 - DNA Sequence Analysis:")
+    print(f"Sequence: {seq}")
+    _, _, percentages = composition(seq)
+    for base in sorted(percentages):
+        print(f"{base}: {percentages[base]:.2f}%")
 
 # Problem 3: FASTA file reader
 def read_fasta_file(file_path):
     
-    sequences = []
-    current_sequence = ""
-    current_header = ""
-
     try:
-        with open(file_path, 'r') as file:
-            for line in file:
-                line = line.strip()
-                if line.startswith('>'):
-                    if current_sequence:
-                        sequences.append((current_header, current_sequence))
-                    current_header = line[1:]
-                    current_sequence = ""
-                else:
-                    current_sequence += line.upper()
-
-            if current_sequence:
-                sequences.append((current_header, current_sequence))
-
+        sequences = [(header, sequence) for header, sequence in iter_fasta(file_path, upper=True)
+                     if sequence]
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         return None
@@ -53,49 +45,101 @@ def analyze_sequence_composition(sequence):
     if not sequence:
         return {}
 
-    alphabet = find_alphabet(sequence)
-    percentages = {base: (sequence.count(base) / len(sequence)) * 100 for base in alphabet}
+    _, _, percentages = composition(sequence)
     return percentages
 
 def display_fasta_results(sequences_data):
     
-    for i, (header, sequence) in enumerate(sequences_data, 1):
+    # alphabet and composition of all records come from one histogram each,
+    # computed on a process pool when the file has many records
+    results = iter_compositions(sequences_data)
+    for i, ((header, sequence), (_, alphabet, _, percentages)) in enumerate(zip(sequences_data, results), 1):
         print(f"\n{'='*60}")
         print(f"Sequence {i}: {header}")
         print(f"{'='*60}")
         print(f"Length: {len(sequence)} characters")
-        print(f"Alphabet: {find_alphabet(sequence)}")
-
-        composition = analyze_sequence_composition(sequence)
+        print(f"Alphabet: {alphabet}")
 
-        if composition:
+        if percentages:
             print("\nComposition Analysis:")
             print("-" * 40)
-            for base in sorted(composition):
-                print(f"{base}: {composition[base]:.2f}%")
+            for base in sorted(percentages):
+                print(f"{base}: {percentages[base]:.2f}%")
 
         print(f"\nSequence preview: {sequence[:50]}{'...' if len(sequence) > 50 else ''}")
 
-print("\n" + "="*60)
-print("Problem 3 - FASTA File Analysis")
-print("="*60)
-
-if len(sys.argv) > 1:
-    file_path = sys.argv[1]
-    if os.path.exists(file_path):
-        print(f"\nReading FASTA file: {file_path}")
-        sequences = read_fasta_file(file_path)
+STREAM_COLUMNS = ['index', 'header', 'length', 'alphabet', 'composition', 'preview']
 
-        if sequences and len(sequences) > 0:
-            print(f"\nFound {len(sequences)} sequence(s)")
-            display_fasta_results(sequences)
+def stream_fasta_results(file_path, out, output_format='tsv'):
+    
+    # One row per record, written as soon as the record is read; no record is
+    # kept after its row, so memory depends on the largest record, not the file.
+    if output_format == 'tsv':
+        out.write('\t'.join(STREAM_COLUMNS) + '\n')
+
+    count = 0
+    for count, (header, sequence) in enumerate(iter_fasta(file_path, upper=True), 1):
+        alphabet, counts, percentages = composition(sequence)
+        preview = sequence[:50] + ('...' if len(sequence) > 50 else '')
+
+        if output_format == 'jsonl':
+            row = {
+                'index': count,
+                'header': header,
+                'length': len(sequence),
+                'alphabet': sorted(alphabet),
+                'counts': counts,
+                'composition': {base: round(percentages[base], 2) for base in sorted(percentages)},
+                'preview': preview
+            }
+            out.write(json.dumps(row) + '\n')
+        else:
+            composition_str = ';'.join(f"{base}:{percentages[base]:.2f}" for base in sorted(percentages))
+            row = [str(count), header.replace('\t', ' '), str(len(sequence)),
+                   ''.join(sorted(alphabet)), composition_str, preview]
+            out.write('\t'.join(row) + '\n')
+
+    return count
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Sequence alphabet and composition analysis")
+    parser.add_argument('fasta', nargs='?', help="FASTA file to analyze ('-' for stdin)")
+    parser.add_argument('--stream', choices=['tsv', 'jsonl'],
+                        help="constant-memory mode: write one row per record instead of the report")
+    parser.add_argument('-o', '--output', help="output file for --stream (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.stream:
+        if not args.fasta:
+            parser.error("--stream needs a FASTA file")
+        if args.output:
+            with open(args.output, 'w') as out:
+                stream_fasta_results(args.fasta, out, args.stream)
+        else:
+            stream_fasta_results(args.fasta, sys.stdout, args.stream)
+        return
+
+    show_problems_1_and_2()
+
+    print("\n" + "="*60)
+    print("Problem 3 - FASTA File Analysis")
+    print("="*60)
+
+    if args.fasta:
+        file_path = args.fasta
+        if os.path.exists(file_path):
+            print(f"\nReading FASTA file: {file_path}")
+            sequences = read_fasta_file(file_path)
+
+            if sequences and len(sequences) > 0:
+                print(f"\nFound {len(sequences)} sequence(s)")
+                display_fasta_results(sequences)
+            else:
+                print("No sequences found in the file.")
         else:
-            print("No sequences found in the file.")
+            print(f"Error: File '{file_path}' does not exist.")
     else:
-        print(f"Error: File '{file_path}' does not exist.")
-else:
-    print("To analyze a FASTA file, run: python ex1_2py filename.fasta")
-    
-
-    
+        print("To analyze a FASTA file, run: python ex1_2py filename.fasta")
 
+if __name__ == "__main__":
+    main(sys.argv[1:])
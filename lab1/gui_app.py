@@ -1,6 +1,40 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
 from collections import Counter
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.background import CHUNK_SIZE, TaskPanel
+from bioinf.composition import composition, symbol_counts
+from bioinf.fasta import ProgressFile, iter_fasta_pieces
+
+PREVIEW_LENGTH = 50
+
+def fasta_composition_job(file_path, piece_size=CHUNK_SIZE):
+    """
+    Background job for the FASTA tab: composition of every record, counted
+    piece by piece so that it can report progress and be cancelled.
+
+    Yields:
+        tuple: (bytes of the file read, file size) after every piece
+
+    Returns:
+        list: (header, length, counts dict, first PREVIEW_LENGTH + 1 bases)
+              for every non-empty record
+    """
+    records = []
+    with ProgressFile(file_path) as handle:
+        for record, header, piece in iter_fasta_pieces(handle, piece_size, upper=True):
+            if not records or records[-1][0] != record:
+                records.append([record, header, 0, Counter(), ''])
+            entry = records[-1]
+            entry[2] += len(piece)
+            entry[3].update(symbol_counts(piece))
+            if len(entry[4]) <= PREVIEW_LENGTH:
+                entry[4] += piece[:PREVIEW_LENGTH + 1 - len(entry[4])]
+            yield handle.position, handle.size
+    return [(header, length, dict(counts), preview) for _, header, length, counts, preview in records]
 
 class SequenceAnalyzerGUI:
     def __init__(self, root):
@@ -69,8 +103,12 @@ class SequenceAnalyzerGUI:
         browse_btn = ttk.Button(file_frame, text="Browse", command=self.browse_file)
         browse_btn.pack(side='left', padx=5)
 
-        analyze_file_btn = ttk.Button(file_frame, text="Analyze", command=self.analyze_fasta)
-        analyze_file_btn.pack(side='left', padx=5)
+        self.analyze_file_btn = ttk.Button(file_frame, text="Analyze", command=self.analyze_fasta)
+        self.analyze_file_btn.pack(side='left', padx=5)
+
+        # large files are analyzed on a worker thread
+        self.fasta_task = TaskPanel(frame)
+        self.fasta_task.frame.pack(fill='x', padx=20)
 
         
         results_frame = ttk.LabelFrame(frame, text="Results", padding=10)
@@ -85,8 +123,7 @@ class SequenceAnalyzerGUI:
     def analyze_composition(self, sequence):
         if not sequence:
             return {}
-        alphabet = self.find_alphabet(sequence)
-        percentages = {base: (sequence.count(base) / len(sequence)) * 100 for base in alphabet}
+        _, _, percentages = composition(sequence)
         return percentages
 
     def analyze_sequence(self):
@@ -105,12 +142,12 @@ class SequenceAnalyzerGUI:
         alphabet = self.find_alphabet(sequence)
         self.seq_results.insert(tk.END, f"Alphabet: {sorted(alphabet)}\n\n")
 
-        composition = self.analyze_composition(sequence)
+        percentages = self.analyze_composition(sequence)
         self.seq_results.insert(tk.END, "Composition Analysis:\n")
         self.seq_results.insert(tk.END, "=" * 40 + "\n")
 
-        for base in sorted(composition):
-            self.seq_results.insert(tk.END, f"{base}: {composition[base]:.2f}%\n")
+        for base in sorted(percentages):
+            self.seq_results.insert(tk.END, f"{base}: {percentages[base]:.2f}%\n")
 
     def clear_sequence(self):
         self.seq_input.delete('1.0', tk.END)
@@ -124,34 +161,6 @@ class SequenceAnalyzerGUI:
         if filename:
             self.file_path_var.set(filename)
 
-    def read_fasta_file(self, file_path):
-        sequences = []
-        current_sequence = ""
-        current_header = ""
-
-        try:
-            with open(file_path, 'r') as file:
-                for line in file:
-                    line = line.strip()
-                    if line.startswith('>'):
-                        if current_sequence:
-                            sequences.append((current_header, current_sequence))
-                        current_header = line[1:]
-                        current_sequence = ""
-                    else:
-                        current_sequence += line.upper()
-
-                if current_sequence:
-                    sequences.append((current_header, current_sequence))
-        except FileNotFoundError:
-            messagebox.showerror("Error", f"File '{file_path}' not found.")
-            return None
-        except Exception as e:
-            messagebox.showerror("Error", f"Error reading file: {e}")
-            return None
-
-        return sequences
-
     def analyze_fasta(self):
         file_path = self.file_path_var.get()
 
@@ -160,32 +169,44 @@ class SequenceAnalyzerGUI:
             return
 
         self.fasta_results.delete('1.0', tk.END)
+        self.fasta_results.insert(tk.END, f"Analyzing {file_path}...\n")
+        self.analyze_file_btn.config(state='disabled')
+        self.fasta_task.start(fasta_composition_job, file_path,
+                              on_done=self.show_fasta_results, on_error=self.show_fasta_error,
+                              on_finish=lambda: self.analyze_file_btn.config(state='normal'))
 
-        sequences = self.read_fasta_file(file_path)
+    def show_fasta_error(self, error):
+        self.fasta_results.delete('1.0', tk.END)
+        if isinstance(error, FileNotFoundError):
+            messagebox.showerror("Error", f"File '{self.file_path_var.get()}' not found.")
+        else:
+            messagebox.showerror("Error", f"Error reading file: {error}")
+
+    def show_fasta_results(self, records):
+        self.fasta_results.delete('1.0', tk.END)
 
-        if not sequences:
+        if not records:
             self.fasta_results.insert(tk.END, "No sequences found in the file.\n")
             return
 
-        self.fasta_results.insert(tk.END, f"Found {len(sequences)} sequence(s)\n\n")
+        self.fasta_results.insert(tk.END, f"Found {len(records)} sequence(s)\n\n")
 
-        for i, (header, sequence) in enumerate(sequences, 1):
+        for i, (header, length, counts, preview) in enumerate(records, 1):
+            percentages = {symbol: (count / length) * 100 for symbol, count in counts.items()}
             self.fasta_results.insert(tk.END, "=" * 60 + "\n")
             self.fasta_results.insert(tk.END, f"Sequence {i}: {header}\n")
             self.fasta_results.insert(tk.END, "=" * 60 + "\n")
-            self.fasta_results.insert(tk.END, f"Length: {len(sequence)} characters\n")
+            self.fasta_results.insert(tk.END, f"Length: {length} characters\n")
 
-            alphabet = self.find_alphabet(sequence)
-            self.fasta_results.insert(tk.END, f"Alphabet: {sorted(alphabet)}\n\n")
+            self.fasta_results.insert(tk.END, f"Alphabet: {sorted(counts)}\n\n")
 
-            composition = self.analyze_composition(sequence)
             self.fasta_results.insert(tk.END, "Composition Analysis:\n")
             self.fasta_results.insert(tk.END, "-" * 40 + "\n")
 
-            for base in sorted(composition):
-                self.fasta_results.insert(tk.END, f"{base}: {composition[base]:.2f}%\n")
+            for base in sorted(percentages):
+                self.fasta_results.insert(tk.END, f"{base}: {percentages[base]:.2f}%\n")
 
-            preview = sequence[:50] + ('...' if len(sequence) > 50 else '')
+            preview = preview[:PREVIEW_LENGTH] + ('...' if length > PREVIEW_LENGTH else '')
             self.fasta_results.insert(tk.END, f"\nSequence preview: {preview}\n\n")
 
 if __name__ == "__main__":
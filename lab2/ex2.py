@@ -1,3 +1,10 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.kmers import distinct_substrings, kmer_spectrum
+
+
 def find_nucleotides(sequence):
     """
     Find all dinucleotides and trinucleotides that exist in the sequence.
@@ -9,20 +16,22 @@ def find_nucleotides(sequence):
     Returns:
         tuple: (set of dinucleotides, set of trinucleotides)
     """
-    dinucleotides = set()
-    trinucleotides = set()
+    return distinct_substrings(sequence, 2), distinct_substrings(sequence, 3)
+
 
-   
-    for i in range(len(sequence)):
-        
-        if i + 2 <= len(sequence):
-            dinucleotides.add(sequence[i:i+2])
+def count_kmers(sequence, k, canonical=False):
+    """
+    Count every k-mer (k from 1 to 31) of a DNA sequence.
 
-        
-        if i + 3 <= len(sequence):
-            trinucleotides.add(sequence[i:i+3])
+    Args:
+        sequence: Input DNA sequence
+        k: k-mer length
+        canonical: Count a k-mer and its reverse complement together
 
-    return dinucleotides, trinucleotides
+    Returns:
+        dict: k-mer -> count, only for k-mers that occur
+    """
+    return dict(kmer_spectrum(sequence, k, canonical).items())
 
 
 
@@ -1,37 +1,67 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import matplotlib.pyplot as plt
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.background import CHUNK_SIZE, TaskPanel
+from bioinf.chunked import iter_window_chunks
+from bioinf.fasta import ProgressFile, read_sequence
+from bioinf.plotting import get_pyplot, plot_decimated
+from bioinf.windows import window_frequencies
 
 def parse_fasta(file_path):
     
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-    sequence = ''
-    for line in lines:
-        if not line.startswith('>'):
-            sequence += line.strip()
-    return sequence.upper()
-
-def compute_frequencies(sequence, window_size=30):
-    
-    freq_A = []
-    freq_C = []
-    freq_G = []
-    freq_T = []
-    for i in range(len(sequence) - window_size + 1):
-        window = sequence[i:i + window_size]
-        a = window.count('A') / window_size
-        c = window.count('C') / window_size
-        g = window.count('G') / window_size
-        t = window.count('T') / window_size
-        freq_A.append(a)
-        freq_C.append(c)
-        freq_G.append(g)
-        freq_T.append(t)
-    return freq_A, freq_C, freq_G, freq_T
+    return read_sequence(file_path, upper=True)
+
+def compute_frequencies(sequence, window_size=30, step=1):
+    """
+    Relative frequency of A, C, G and T in sliding windows, from one prefix
+    sum per base (O(n) for any window size).
+
+    Args:
+        sequence: DNA sequence
+        window_size: Window length
+        step: Distance between window starts
+
+    Returns:
+        tuple: numpy arrays (freq_A, freq_C, freq_G, freq_T), one value per window
+    """
+    _, freqs = window_frequencies(sequence, window_size, step=step)
+    return freqs[0], freqs[1], freqs[2], freqs[3]
+
+def frequency_job(file_path, window_size=30, chunk_size=CHUNK_SIZE):
+    """
+    Background job for the GUI: window frequencies of the concatenated
+    records of a FASTA file, one chunk at a time (see bioinf.chunked).
+
+    Yields:
+        tuple: (bytes of the file read, file size) after every chunk
+
+    Returns:
+        tuple: (window positions, 4 x windows frequency array), or None if
+               the file holds no sequence
+    """
+    positions, freqs = [], []
+    with ProgressFile(file_path) as handle:
+        for _, first_start, piece in iter_window_chunks(handle, window_size, 1, chunk_size, join_records=True):
+            starts, values = window_frequencies(piece, window_size)
+            positions.append(first_start + starts)
+            freqs.append(values)
+            yield handle.position, handle.size
+    if not positions:
+        # no sequence at all, or shorter than one window
+        if not parse_fasta(file_path):
+            return None
+        return np.zeros(0, dtype=np.int64), np.zeros((4, 0))
+    return np.concatenate(positions), np.concatenate(freqs, axis=1)
 
+# tkinter and matplotlib are imported inside the GUI so that compute_frequencies
+# can be used without them
 class FrequencyGUI:
     def __init__(self, root):
+        import tkinter as tk
+
         self.root = root
         self.root.title("Nucleotide Frequency Analysis")
         self.file_path = None
@@ -44,31 +74,49 @@ class FrequencyGUI:
         self.analyze_btn = tk.Button(root, text="Analyze and Plot", command=self.analyze)
         self.analyze_btn.pack(pady=10)
 
+        # the file is read and analyzed on a worker thread
+        self.task = TaskPanel(root)
+        self.task.frame.pack(fill='x', padx=10, pady=10)
+        self.window_size = 30
+
     def select_file(self):
+        from tkinter import filedialog
         self.file_path = filedialog.askopenfilename(filetypes=[("FASTA files", "*.fasta"), ("All files", "*.*")])
 
     def analyze(self):
+        from tkinter import messagebox
+
         if not self.file_path:
             messagebox.showerror("Error", "Please select a FASTA file first.")
             return
 
-        try:
-            sequence = parse_fasta(self.file_path)
-            if not sequence:
-                messagebox.showerror("Error", "No sequence found in the file.")
-                return
+        self.analyze_btn.config(state='disabled')
+        self.task.start(frequency_job, self.file_path, self.window_size,
+                        on_done=self.plot, on_error=self.show_error,
+                        on_finish=lambda: self.analyze_btn.config(state='normal'))
+
+    def show_error(self, error):
+        from tkinter import messagebox
+        messagebox.showerror("Error", f"An error occurred: {str(error)}")
 
-            freq_A, freq_C, freq_G, freq_T = compute_frequencies(sequence)
+    def plot(self, result):
+        from tkinter import messagebox
 
-            
+        if result is None:
+            messagebox.showerror("Error", "No sequence found in the file.")
+            return
+
+        window_size = self.window_size
+        positions, freqs = result
+        try:
+            plt = get_pyplot()
             plt.figure(figsize=(10, 6))
-            plt.plot(freq_A, label='A', color='red')
-            plt.plot(freq_C, label='C', color='blue')
-            plt.plot(freq_G, label='G', color='green')
-            plt.plot(freq_T, label='T', color='orange')
+            for freq, base, color in zip(freqs, 'ACGT', ['red', 'blue', 'green', 'orange']):
+                # every window is kept; only ~2 points per pixel column are drawn
+                plot_decimated(positions, freq, label=base, color=color)
             plt.xlabel('Window Position')
             plt.ylabel('Relative Frequency')
-            plt.title('Nucleotide Frequencies in Sliding Windows (Size 30)')
+            plt.title(f'Nucleotide Frequencies in Sliding Windows (Size {window_size})')
             plt.legend()
             plt.grid(True)
             plt.show()
@@ -77,6 +125,8 @@ class FrequencyGUI:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
 if __name__ == "__main__":
+    import tkinter as tk
+
     root = tk.Tk()
     app = FrequencyGUI(root)
     root.mainloop()
@@ -3,9 +3,19 @@ Dinucleotide and Trinucleotide Analysis - generates all possible dinucleotide an
 and calculates their percentage occurrence in a given DNA sequence.
 """
 
+import os
+import sys
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.background import CHUNK_SIZE, TaskPanel
+from bioinf.encoding import encode
+from bioinf.kmers import kmer_counts, kmer_names
+
+# longer sequences are abbreviated in the result tabs
+MAX_DISPLAYED_SEQUENCE = 200
+
 def generate_dinucleotides():
     
     nucleotides = ['A', 'C', 'G', 'T']
@@ -50,6 +60,58 @@ def calculate_percentage(sequence, pattern):
 
     return percentage
 
+def kmer_frequencies(sequence, k, counts=None):
+    """
+    Count and percentage of every one of the 4^k k-mers, from a single pass
+    over the sequence (see bioinf.kmers).
+
+    Args:
+        sequence: DNA sequence
+        k: k-mer length (2 for dinucleotides, 3 for trinucleotides, ...)
+        counts: Already computed kmer_counts(sequence, k), if any
+
+    Returns:
+        list: (kmer, count, percentage) tuples, sorted by percentage (descending)
+    """
+    total_possible = len(sequence) - k + 1
+    if counts is None:
+        counts = kmer_counts(sequence, k)
+
+    results = []
+    for kmer, count in zip(kmer_names(k), counts.tolist()):
+        percentage = (count / total_possible) * 100 if total_possible > 0 else 0.0
+        results.append((kmer, count, percentage))
+
+    results.sort(key=lambda x: x[2], reverse=True)
+    return results
+
+def kmer_count_job(sequence, ks=(1, 2, 3), chunk_size=CHUNK_SIZE):
+    """
+    Background job: k-mer counts for every k in ks, chunk by chunk. Each
+    chunk is extended by k - 1 bases so that the windows crossing into the
+    next chunk are counted exactly once.
+
+    Yields:
+        tuple: (bases counted, sequence length) after every chunk
+
+    Returns:
+        dict: k -> counts array indexed like kmer_names(k)
+    """
+    counts = {k: 0 for k in ks}
+    overlap = max(ks) - 1
+    for start in range(0, len(sequence), chunk_size):
+        codes = encode(sequence[start:start + chunk_size + overlap])
+        for k in ks:
+            counts[k] = counts[k] + kmer_counts(codes[:chunk_size + k - 1], k)
+        yield min(start + chunk_size, len(sequence)), len(sequence)
+    return counts
+
+def shorten(sequence):
+    """Sequence as shown in the result tabs."""
+    if len(sequence) <= MAX_DISPLAYED_SEQUENCE:
+        return sequence
+    return f"{sequence[:MAX_DISPLAYED_SEQUENCE]}... ({len(sequence) - MAX_DISPLAYED_SEQUENCE} more)"
+
 class NucleotideAnalyzerGUI:
     def __init__(self, root):
         self.root = root
@@ -98,6 +160,10 @@ class NucleotideAnalyzerGUI:
                                    padx=20, pady=5, cursor="hand2")
         self.clear_btn.pack(side=tk.LEFT, padx=5)
 
+        # long sequences are counted on a worker thread
+        self.task = TaskPanel(input_frame)
+        self.task.frame.pack(fill=tk.X)
+
        
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -152,49 +218,56 @@ class NucleotideAnalyzerGUI:
 
        
         valid_nucleotides = set('ACGT')
-        if not all(c in valid_nucleotides for c in sequence):
+        if not set(sequence) <= valid_nucleotides:
             messagebox.showerror("Invalid Sequence",
                                "Sequence must contain only A, C, G, T nucleotides!")
             return
 
         self.status_bar.config(text="Analyzing sequence...")
-        self.root.update()
-
+        self.analyze_btn.config(state=tk.DISABLED)
+        self.task.start(kmer_count_job, sequence,
+                        on_done=lambda counts: self.show_results(sequence, counts),
+                        on_error=self.show_error,
+                        on_finish=self.analysis_finished)
+
+    def analysis_finished(self):
+        self.analyze_btn.config(state=tk.NORMAL)
+        if self.task.task.cancelled:
+            self.status_bar.config(text="Analysis cancelled")
+
+    def show_error(self, error):
+        self.status_bar.config(text="Analysis failed")
+        messagebox.showerror("Error", f"An error occurred: {error}")
+
+    def show_results(self, sequence, counts):
         
         self.clear_results()
 
         
-        self.analyze_dinucleotides(sequence)
+        self.analyze_dinucleotides(sequence, counts[2])
 
        
-        self.analyze_trinucleotides(sequence)
+        self.analyze_trinucleotides(sequence, counts[3])
 
         
-        self.generate_summary(sequence)
+        self.generate_summary(sequence, counts[1])
 
         self.status_bar.config(text=f"Analysis complete! Sequence length: {len(sequence)} nucleotides")
 
-    def analyze_dinucleotides(self, sequence):
+    def analyze_dinucleotides(self, sequence, counts=None):
        
         dinucleotides = generate_dinucleotides()
 
         output = "=" * 70 + "\n"
         output += "DINUCLEOTIDE ANALYSIS\n"
         output += "=" * 70 + "\n\n"
-        output += f"Sequence: {sequence}\n"
+        output += f"Sequence: {shorten(sequence)}\n"
         output += f"Sequence Length: {len(sequence)} nucleotides\n\n"
         output += f"Total possible dinucleotides: {len(dinucleotides)}\n"
         output += f"Total possible dinucleotide positions: {len(sequence) - 1}\n\n"
 
-        # Calculate percentages
-        dinuc_results = []
-        for dinuc in dinucleotides:
-            count = count_occurrences(sequence, dinuc)
-            percentage = calculate_percentage(sequence, dinuc)
-            dinuc_results.append((dinuc, count, percentage))
-
-        # Sort by percentage (descending)
-        dinuc_results.sort(key=lambda x: x[2], reverse=True)
+        # Counts and percentages of all 16 patterns in one pass, sorted by percentage
+        dinuc_results = kmer_frequencies(sequence, 2, counts)
 
         output += f"{'Dinucleotide':<15}{'Count':<10}{'Percentage':<15}\n"
         output += "-" * 40 + "\n"
@@ -205,27 +278,20 @@ class NucleotideAnalyzerGUI:
         self.dinuc_text.insert(1.0, output)
         self.dinuc_results = dinuc_results
 
-    def analyze_trinucleotides(self, sequence):
+    def analyze_trinucleotides(self, sequence, counts=None):
        
         trinucleotides = generate_trinucleotides()
 
         output = "=" * 70 + "\n"
         output += "TRINUCLEOTIDE ANALYSIS\n"
         output += "=" * 70 + "\n\n"
-        output += f"Sequence: {sequence}\n"
+        output += f"Sequence: {shorten(sequence)}\n"
         output += f"Sequence Length: {len(sequence)} nucleotides\n\n"
         output += f"Total possible trinucleotides: {len(trinucleotides)}\n"
         output += f"Total possible trinucleotide positions: {len(sequence) - 2}\n\n"
 
-        # Calculate percentages
-        trinuc_results = []
-        for trinuc in trinucleotides:
-            count = count_occurrences(sequence, trinuc)
-            percentage = calculate_percentage(sequence, trinuc)
-            trinuc_results.append((trinuc, count, percentage))
-
-        # Sort by percentage (descending)
-        trinuc_results.sort(key=lambda x: x[2], reverse=True)
+        # Counts and percentages of all 64 patterns in one pass, sorted by percentage
+        trinuc_results = kmer_frequencies(sequence, 3, counts)
 
         output += f"{'Trinucleotide':<15}{'Count':<10}{'Percentage':<15}\n"
         output += "-" * 40 + "\n"
@@ -236,20 +302,20 @@ class NucleotideAnalyzerGUI:
         self.trinuc_text.insert(1.0, output)
         self.trinuc_results = trinuc_results
 
-    def generate_summary(self, sequence):
+    def generate_summary(self, sequence, base_counts=None):
         
         output = "=" * 70 + "\n"
         output += "SUMMARY STATISTICS\n"
         output += "=" * 70 + "\n\n"
 
-        output += f"Sequence Analyzed: {sequence}\n"
+        output += f"Sequence Analyzed: {shorten(sequence)}\n"
         output += f"Sequence Length: {len(sequence)} nucleotides\n\n"
 
         
         output += "Nucleotide Composition:\n"
         output += "-" * 40 + "\n"
-        for nuc in ['A', 'C', 'G', 'T']:
-            count = sequence.count(nuc)
+        for i, nuc in enumerate(['A', 'C', 'G', 'T']):
+            count = sequence.count(nuc) if base_counts is None else int(base_counts[i])
             percentage = (count / len(sequence)) * 100
             output += f"  {nuc}: {count} ({percentage:.2f}%)\n"
 
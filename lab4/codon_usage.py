@@ -0,0 +1,188 @@
+"""
+Codon usage metrics over codon count matrices.
+
+Counts are an N x 64 matrix (one row per genome, columns in ex1.CODONS
+order, e.g. from ex2.codon_count_matrix) or a single 64-vector. Amino acid
+totals come from one matrix product with a 64 x 21 codon -> amino acid
+mapping (20 amino acids and stop) built from CODON_TABLE and STOP_CODONS,
+so every metric is computed for all genomes at once.
+
+    rscu      relative synonymous codon usage (Sharp & Li 1986)
+    cai       codon adaptation index against a reference set (Sharp & Li 1987)
+    enc       effective number of codons (Wright 1990)
+    gc3       GC content at third codon positions
+"""
+import numpy as np
+
+from ex1 import CODON_TABLE, CODONS, STOP_CODONS, STOP_SYMBOL
+
+AMINO_ACIDS = sorted(set(CODON_TABLE.values())) + [STOP_SYMBOL]
+
+# MAPPING[c, a] = 1 when codon c codes for amino acid a
+MAPPING = np.zeros((64, len(AMINO_ACIDS)))
+for _codon_index, _codon in enumerate(CODONS):
+    _amino_acid = STOP_SYMBOL if _codon in STOP_CODONS else CODON_TABLE[_codon]
+    MAPPING[_codon_index, AMINO_ACIDS.index(_amino_acid)] = 1
+
+# synonymous codons of every amino acid, and of the amino acid of every codon
+DEGENERACY = MAPPING.sum(axis=0)
+CODON_DEGENERACY = MAPPING @ DEGENERACY
+
+SENSE = MAPPING[:, AMINO_ACIDS.index(STOP_SYMBOL)] == 0
+# codons whose amino acid has a choice (no Met, Trp or stops)
+SYNONYMOUS = SENSE & (CODON_DEGENERACY > 1)
+GC_THIRD = np.array([codon[2] in 'GC' for codon in CODONS])
+
+
+def _as_matrix(counts):
+    counts = np.asarray(counts, dtype=float)
+    return counts.reshape(-1, 64), counts.ndim == 1
+
+
+def _family_totals(counts):
+    """Count of each codon's amino acid (synonymous family), per codon."""
+    return (counts @ MAPPING) @ MAPPING.T
+
+
+def amino_acid_counts(counts):
+    """
+    Amino acid totals, columns in AMINO_ACIDS order.
+
+    Args:
+        counts: N x 64 codon count matrix (or one 64-vector)
+
+    Returns:
+        numpy.ndarray: N x 21 (or 21) counts
+    """
+    matrix, single = _as_matrix(counts)
+    totals = matrix @ MAPPING
+    return totals[0] if single else totals
+
+
+def rscu(counts):
+    """
+    Relative synonymous codon usage: observed count divided by the count
+    expected if all synonymous codons were used equally. NaN for amino
+    acids that do not occur.
+
+    Returns:
+        numpy.ndarray: same shape as counts
+    """
+    matrix, single = _as_matrix(counts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = matrix * CODON_DEGENERACY / _family_totals(matrix)
+    return values[0] if single else values
+
+
+def relative_adaptiveness(reference, pseudocount=0.5):
+    """
+    Weight w of every codon: its RSCU in the pooled reference set divided by
+    the largest RSCU of its family. Codons absent from the reference get the
+    pseudocount instead of 0, so one rare codon does not zero a whole CAI.
+
+    Args:
+        reference: Codon counts of the reference genes/genomes (rows are summed)
+        pseudocount: Added to every reference count
+
+    Returns:
+        numpy.ndarray: 64 weights in (0, 1]
+    """
+    matrix, _ = _as_matrix(reference)
+    pooled = matrix.sum(axis=0) + pseudocount
+    values = rscu(pooled)
+    family_max = (values[:, None] * MAPPING).max(axis=0) @ MAPPING.T
+    return values / family_max
+
+
+def cai(counts, reference, pseudocount=0.5):
+    """
+    Codon adaptation index: geometric mean of the reference weights over all
+    codons of a genome, leaving out Met, Trp and stop codons.
+
+    Args:
+        counts: N x 64 codon count matrix (or one 64-vector)
+        reference: Codon counts of the reference set (see relative_adaptiveness)
+
+    Returns:
+        numpy.ndarray: N values (or a float for one vector)
+    """
+    matrix, single = _as_matrix(counts)
+    used = matrix[:, SYNONYMOUS]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_w = np.log(relative_adaptiveness(reference, pseudocount))
+        values = np.exp(used @ log_w[SYNONYMOUS] / used.sum(axis=1))
+    return float(values[0]) if single else values
+
+
+def enc(counts):
+    """
+    Effective number of codons (Wright 1990), from 20 (one codon per amino
+    acid) to 61 (all sense codons used equally).
+
+    The homozygosity F = (n * sum(p^2) - 1) / (n - 1) of every amino acid
+    seen at least twice is averaged within each degeneracy class (2, 3, 4
+    and 6 codons); ENC = (amino acids with one codon) + sum of (amino acids
+    in class) / (class average). A missing 3-fold class (Ile) takes the mean
+    of the 2- and 4-fold averages; other missing classes give NaN.
+
+    Returns:
+        numpy.ndarray: N values (or a float for one vector)
+    """
+    matrix, single = _as_matrix(counts)
+    n = matrix @ MAPPING
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = matrix / _family_totals(matrix)
+        homozygosity = ((n * (np.nan_to_num(p) ** 2 @ MAPPING)) - 1) / (n - 1)
+    homozygosity[n < 2] = np.nan
+
+    sense = np.array([amino_acid != STOP_SYMBOL for amino_acid in AMINO_ACIDS])
+    values = np.full(len(matrix), float(np.count_nonzero(sense & (DEGENERACY == 1))))
+    classes = sorted(set(DEGENERACY[sense & (DEGENERACY > 1)].tolist()))
+    averages = {}
+    for size in classes:
+        members = sense & (DEGENERACY == size)
+        observed = ~np.isnan(homozygosity[:, members])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            averages[size] = (np.nansum(homozygosity[:, members], axis=1)
+                              / observed.sum(axis=1))
+    if 3 in averages and 2 in averages and 4 in averages:
+        averages[3] = np.where(np.isnan(averages[3]), (averages[2] + averages[4]) / 2, averages[3])
+    for size in classes:
+        members = np.count_nonzero(sense & (DEGENERACY == size))
+        values = values + members / averages[size]
+
+    values = np.minimum(values, np.count_nonzero(SENSE))
+    return float(values[0]) if single else values
+
+
+def gc3(counts, synonymous=True):
+    """
+    Fraction of codons with G or C at the third position.
+
+    Args:
+        counts: N x 64 codon count matrix (or one 64-vector)
+        synonymous: Only codons of amino acids with a choice (GC3s: no Met,
+                    Trp or stops); otherwise all sense codons
+
+    Returns:
+        numpy.ndarray: N values (or a float for one vector)
+    """
+    matrix, single = _as_matrix(counts)
+    columns = SYNONYMOUS if synonymous else SENSE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = matrix[:, columns & GC_THIRD].sum(axis=1) / matrix[:, columns].sum(axis=1)
+    return float(values[0]) if single else values
+
+
+def usage_table(counts, reference=None):
+    """
+    ENC, GC3s and (with a reference) CAI of every row, in one call each.
+
+    Returns:
+        dict: metric name -> array of N values
+    """
+    matrix, _ = _as_matrix(counts)
+    table = {'enc': enc(matrix), 'gc3s': gc3(matrix)}
+    if reference is not None:
+        table['cai'] = cai(matrix, reference)
+    return table
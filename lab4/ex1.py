@@ -1,9 +1,22 @@
 """
 Translate a coding-region DNA/RNA sequence into an amino acid sequence
+
+Translation is table driven: the sequence is normalized with bytes.translate,
+every codon becomes an index 0-63 (A=0, C=1, G=2, U=3, first base most
+significant) and all codons are looked up at once in a 64-entry array built
+from CODON_TABLE and STOP_CODONS.
 """
-from typing import Tuple
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
+import argparse
+import os
 import sys
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.fasta import iter_fasta
+
 
 
 CODON_TABLE = {
@@ -51,44 +64,268 @@ CODON_TABLE = {
 
 STOP_CODONS = {'UAA', 'UAG', 'UGA'}
 
+RNA_BASES = 'ACGU'
+# all 64 codons in index order (AAA, AAC, ..., UUU)
+CODONS = [a + b + c for a in RNA_BASES for b in RNA_BASES for c in RNA_BASES]
+STOP_SYMBOL = '*'
+
+# amino acid letter of every codon index; '*' for stops, 'X' if in neither table
+CODON_LOOKUP = np.frombuffer(''.join(
+	STOP_SYMBOL if codon in STOP_CODONS else CODON_TABLE.get(codon, 'X') for codon in CODONS
+).encode('ascii'), dtype=np.uint8)
+IS_STOP = CODON_LOOKUP == ord(STOP_SYMBOL)
+
+# upper case RNA; everything except A/C/G/T/U is deleted
+_NORMALIZE_TABLE = bytes.maketrans(b'acgtuT', b'ACGUUU')
+_NORMALIZE_DELETE = bytes(c for c in range(256) if c not in b'ACGTUacgtu')
+_BASE_CODES = bytes.maketrans(b'ACGU', bytes(range(4)))
+
+
+def _normalize_bytes(seq) -> bytes:
+	if isinstance(seq, str):
+		seq = seq.encode('ascii', 'ignore')
+	return bytes(seq).translate(_NORMALIZE_TABLE, _NORMALIZE_DELETE)
+
 
 def _normalize_seq(seq: str) -> str:
 	
-	s = seq.strip().upper()
-	
-	s = s.replace('T', 'U')
-	
-	s = ''.join([c for c in s if c in 'AUCG'])
-	return s
+	return _normalize_bytes(seq).decode('ascii')
+
+
+def codon_indices(rna: bytes, start: int = 0) -> np.ndarray:
+	"""
+	Index 0-63 of every complete codon of normalized RNA from `start` on.
+
+	Args:
+		rna: Output of _normalize_bytes / _normalize_seq (bytes or str), or
+		     an array of base codes 0-3 (bioinf.encoding uses the same order)
+		start: Offset of the first codon
+
+	Returns:
+		numpy.ndarray: uint8 codon indices (see CODONS)
+	"""
+	if isinstance(rna, str):
+		rna = rna.encode('ascii')
+	n = max(len(rna) - start, 0) // 3
+	if isinstance(rna, np.ndarray):
+		bases = rna[start:start + 3 * n]
+	else:
+		bases = np.frombuffer(rna[start:start + 3 * n].translate(_BASE_CODES), dtype=np.uint8)
+	bases = bases.reshape(n, 3)
+	return (bases[:, 0] << 4) | (bases[:, 1] << 2) | bases[:, 2]
+
+
+def translate_codons(indices: np.ndarray, to_stop: bool = True) -> str:
+	"""
+	Protein of an array of codon indices, up to the first stop codon
+	(to_stop=False keeps going and writes stops as '*').
+	"""
+	if to_stop:
+		stops = np.flatnonzero(IS_STOP[indices])
+		if len(stops):
+			indices = indices[:stops[0]]
+	return CODON_LOOKUP[indices].tobytes().decode('ascii')
 
 
 def translate_coding_region(seq: str, find_first_start: bool = True) -> Tuple[str, int]:
 	
-	rna = _normalize_seq(seq)
+	rna = _normalize_bytes(seq)
 	if find_first_start:
-		start = rna.find('AUG')
+		start = rna.find(b'AUG')
 		if start == -1:
 			
 			start = 0
 	else:
 		start = 0
 
-	protein_chars = []
-	i = start
-	while i + 3 <= len(rna):
-		codon = rna[i:i+3]
-		if codon in STOP_CODONS:
-			break
-		aa = CODON_TABLE.get(codon, 'X') 
-		protein_chars.append(aa)
-		i += 3
+	return translate_codons(codon_indices(rna, start)), start
+
+
+# --- six-frame ORF finder ---------------------------------------------------
+
+# NCBI translation table 11 also starts bacterial genes at GUG and UUG
+ALTERNATIVE_START_CODONS = ('AUG', 'GUG', 'UUG')
+DEFAULT_MIN_PROTEIN_LENGTH = 100
+FRAMES = (1, 2, 3, -1, -2, -3)
+# below this many bases the six frames are scanned in the current process
+MIN_BASES_FOR_POOL = 1 << 20
+
+# genome bases: A/C/G/T/U in either case -> 0-3, anything else (N, ...) -> 4;
+# unlike _normalize_seq nothing is deleted, so coordinates stay those of the record
+_GENOME_BASES = {'A': 0, 'C': 1, 'G': 2, 'T': 3, 'U': 3}
+_GENOME_CODES = bytes(_GENOME_BASES.get(chr(c).upper(), 4) for c in range(256))
+_COMPLEMENT_CODES = bytes.maketrans(bytes(range(5)), bytes([3, 2, 1, 0, 4]))
+# codon index 64 stands for any codon with a non-ACGU base
+_GENOME_LOOKUP = np.append(CODON_LOOKUP, np.uint8(ord('X')))
+_GENOME_STOP = np.append(IS_STOP, False)
+
+
+def _genome_codes(seq) -> bytes:
+	if isinstance(seq, str):
+		seq = seq.encode('ascii', 'replace')
+	return bytes(seq).translate(_GENOME_CODES)
+
+
+def strand_codons(seq, reverse: bool = False) -> np.ndarray:
+	"""
+	Index (see CODONS) of the codon starting at every position of one strand
+	of a record, without deleting anything first; codons with a base other
+	than A/C/G/T/U are 64. Reading frame f (0-2) of the strand is result[f::3].
 
-	return ''.join(protein_chars), start
+	Args:
+		seq: DNA/RNA sequence
+		reverse: Read the reverse complement strand
+	"""
+	codes = _genome_codes(seq)
+	if reverse:
+		codes = codes.translate(_COMPLEMENT_CODES)[::-1]
+	bases = np.frombuffer(codes, dtype=np.uint8)
+	n = max(len(bases) - 2, 0)
+	first, second, third = bases[:n], bases[1:n + 1], bases[2:n + 2]
+	indices = ((first & 3) << 4) | ((second & 3) << 2) | (third & 3)
+	indices[(first == 4) | (second == 4) | (third == 4)] = 64
+	return indices
+
+
+def frame_codons(seq, frame: int) -> np.ndarray:
+	"""
+	Codon indices of one reading frame: 1, 2, 3 (forward, offset frame - 1)
+	or -1, -2, -3 (reverse complement).
+	"""
+	return strand_codons(seq, frame < 0)[abs(frame) - 1::3]
+
+
+def _start_mask(start_codons) -> np.ndarray:
+	mask = np.zeros(65, dtype=bool)
+	for codon in start_codons:
+		mask[CODONS.index(_normalize_seq(codon))] = True
+	return mask
+
+
+def orf_codon_ranges(codons: np.ndarray, min_length: int = DEFAULT_MIN_PROTEIN_LENGTH,
+					 start_codons=('AUG',), partial: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	ORFs of a frame_codons array: each runs from the first start codon after
+	a stop (or the frame start) to the next stop.
+
+	Returns:
+		tuple: arrays (first codon, stop codon or end of frame, has stop)
+	"""
+	stops = np.flatnonzero(_GENOME_STOP[codons])
+	starts = np.flatnonzero(_start_mask(start_codons)[codons])
+	# segment i runs from the codon after stop i - 1 up to stop i; the last
+	# one ends with the sequence
+	ends = np.append(stops, len(codons))
+	first = np.searchsorted(starts, np.concatenate(([0], stops + 1)))
+	has_start = first < len(starts)
+	begins = np.zeros(len(ends), dtype=np.intp)
+	begins[has_start] = starts[first[has_start]]
+	complete = np.arange(len(ends)) < len(stops)
+	keep = has_start & (begins < ends) & (ends - begins >= max(min_length, 1))
+	if not partial:
+		keep &= complete
+	return begins[keep], ends[keep], complete[keep]
+
+
+def frame_orfs(seq, frame: int, min_length: int = DEFAULT_MIN_PROTEIN_LENGTH,
+			   start_codons=('AUG',), partial: bool = False) -> List[Tuple[int, int, str]]:
+	"""
+	ORFs of one reading frame: from the first start codon after a stop (or
+	the sequence start) to the next stop, found with one pass over the
+	frame's codon indices.
+
+	Args:
+		seq: DNA/RNA sequence of one record
+		frame: 1, 2, 3 (forward, offset frame - 1) or -1, -2, -3 (reverse complement)
+		min_length: Minimum protein length in amino acids (stop not counted)
+		start_codons: Codons that open an ORF; the protein always begins with M
+		partial: Also report ORFs that run into the end of the sequence
+
+	Returns:
+		list: (start, end, protein) with 0-based, end-exclusive coordinates on
+			  the forward strand, stop codon included
+	"""
+	codons = frame_codons(seq, frame)
+	begins, ends, complete = orf_codon_ranges(codons, min_length, start_codons, partial)
+
+	proteins = _GENOME_LOOKUP[codons].tobytes().decode('ascii')
+	orfs = []
+	offset = abs(frame) - 1
+	length = len(seq)
+	for begin, end, closed in zip(begins.tolist(), ends.tolist(), complete.tolist()):
+		a = offset + 3 * begin
+		b = offset + 3 * end + (3 if closed else 0)
+		if frame < 0:
+			a, b = length - b, length - a
+		orfs.append((a, b, 'M' + proteins[begin + 1:end]))
+	return orfs
+
+
+def _frame_task(task):
+	record, name, seq, frame, min_length, start_codons, partial = task
+	return [(record, name, '+' if frame > 0 else '-', frame, start, end, protein)
+			for start, end, protein in frame_orfs(seq, frame, min_length, start_codons, partial)]
+
+
+def find_orfs(records, min_length: int = DEFAULT_MIN_PROTEIN_LENGTH, start_codons=('AUG',),
+			  partial: bool = False, processes: Optional[int] = None):
+	"""
+	Six-frame ORF search over (name, sequence) records. Every (record, frame)
+	pair is one task, spread over a process pool when there is enough sequence.
+
+	Args:
+		records: (name, sequence) pairs, e.g. from bioinf.fasta.iter_fasta
+		min_length: Minimum protein length in amino acids
+		start_codons: Codons that open an ORF (ALTERNATIVE_START_CODONS for bacteria)
+		partial: Also report ORFs without a stop codon at the sequence end
+		processes: Worker processes (default: one per CPU, 1 = no pool)
+
+	Returns:
+		list: (record, strand, frame, start, end, protein) sorted by record
+			  (input order), then start; coordinates are 0-based, end exclusive
+	"""
+	records = list(records)
+	tasks = [(record, name, seq, frame, min_length, tuple(start_codons), partial)
+			 for record, (name, seq) in enumerate(records) for frame in FRAMES]
+	if processes is None:
+		processes = os.cpu_count() or 1
+
+	if processes <= 1 or sum(len(seq) for _, seq in records) < MIN_BASES_FOR_POOL:
+		orfs = [orf for task in tasks for orf in _frame_task(task)]
+	else:
+		with Pool(min(processes, len(tasks))) as pool:
+			orfs = [orf for result in pool.imap(_frame_task, tasks) for orf in result]
+
+	orfs.sort(key=lambda orf: (orf[0], orf[4], orf[5]))
+	return [orf[1:] for orf in orfs]
+
+
+def write_orfs(orfs, out):
+	"""Write ORFs as TSV with 1-based, inclusive coordinates."""
+	out.write('record\tstrand\tframe\tstart\tend\tlength_aa\tprotein\n')
+	for name, strand, frame, start, end, protein in orfs:
+		out.write(f'{name}\t{strand}\t{frame}\t{start + 1}\t{end}\t{len(protein)}\t{protein}\n')
 
 
 def _main(argv):
-	if len(argv) >= 2:
-		seq = argv[1]
+	parser = argparse.ArgumentParser(description="Translate a coding region, or find ORFs in six frames")
+	parser.add_argument('sequence', nargs='?', help="DNA/RNA sequence (default: read from stdin)")
+	parser.add_argument('--orfs', metavar='FASTA', help="report every ORF of every record of a FASTA file")
+	parser.add_argument('--min-length', type=int, default=DEFAULT_MIN_PROTEIN_LENGTH,
+	                    help="minimum ORF protein length in amino acids")
+	parser.add_argument('--alt-starts', action='store_true', help="also start ORFs at GUG and UUG")
+	parser.add_argument('--partial', action='store_true', help="include ORFs that run off the sequence end")
+	args = parser.parse_args(argv[1:])
+
+	if args.orfs:
+		start_codons = ALTERNATIVE_START_CODONS if args.alt_starts else ('AUG',)
+		records = [(header.split(None, 1)[0] if header.strip() else f'record_{i + 1}', seq)
+		           for i, (header, seq) in enumerate(iter_fasta(args.orfs))]
+		write_orfs(find_orfs(records, args.min_length, start_codons, args.partial), sys.stdout)
+		return 0
+
+	if args.sequence:
+		seq = args.sequence
 	else:
 		
 		seq = sys.stdin.read().strip()
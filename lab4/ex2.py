@@ -2,39 +2,166 @@
  Download COVID-19 and Influenza genomes from NCBI,
 compare codon frequencies, create charts, and analyze amino acids.
 """
-from urllib.request import urlopen
+import argparse
 from collections import Counter
-import matplotlib.pyplot as plt
+from itertools import islice
+from multiprocessing import Pool
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.cache import add_cache_arguments, apply_cache_arguments, cached_sequence
+from bioinf.fasta import iter_fasta
+from bioinf.fetch import FetchError, add_fetch_arguments, apply_fetch_arguments, efetch_url, fetch, fetch_many
+from bioinf.plotting import get_pyplot
+from bioinf.encoding import N_CODE
+from bioinf.packed import iter_code_blocks
 from ex1 import _normalize_seq, translate_coding_region, STOP_CODONS, CODON_TABLE
+from ex1 import CODONS, DEFAULT_MIN_PROTEIN_LENGTH, codon_indices, orf_codon_ranges, strand_codons
+from codon_usage import usage_table
 
-def download_fasta(url, filename):
-    
-    try:
-        with urlopen(url) as response:
-            data = response.read().decode('utf-8')
-        with open(filename, 'w') as f:
-            f.write(data)
-        print(f"Downloaded {filename}")
-    except Exception as e:
-        print(f"Error downloading {filename}: {e}")
+# below this many records a process pool costs more than it saves
+MIN_RECORDS_FOR_POOL = 8
+
+def download_fasta(url, filename, refresh=False):
+    """
+    Copy a FASTA file from the download cache (bioinf.fetch) to filename,
+    downloading it first if it is not cached. Raises FetchError on failure.
+    """
+    fetch(url, filename, refresh=refresh)
+    print(f"Fetched {filename}")
 
 def parse_fasta(filename):
    
-    with open(filename) as f:
-        lines = f.readlines()
-    seq = ''.join(line.strip() for line in lines if not line.startswith('>'))
-    return seq
+    return cached_sequence(filename)
 
 def count_codons(seq):
-   
-    rna = _normalize_seq(seq)
-    codon_count = Counter()
-    for i in range(0, len(rna) - 2, 3):
-        codon = rna[i:i+3]
-        codon_count[codon] += 1
-    return codon_count
+    """
+    Codon counts of frame 0 of the normalized sequence (one bincount over
+    the codon indices), as a Counter in order of first occurrence.
+
+    The 2-bit base codes are read block by block (from the mmap for a
+    PackedGenome), so the genome is never expanded to a string.
+    """
+    counts = np.zeros(64, dtype=np.int64)
+    first = np.full(64, np.iinfo(np.int64).max)
+    carry = np.zeros(0, dtype=np.uint8)
+    done = 0
+    for _, codes in iter_code_blocks(seq):
+        # characters other than A/C/G/T/U are dropped, like _normalize_bytes does
+        bases = np.concatenate((carry, codes[codes != N_CODE]))
+        indices = codon_indices(bases)
+        carry = bases[3 * len(indices):]
+        counts += np.bincount(indices, minlength=64)
+        present, where = np.unique(indices, return_index=True)
+        first[present] = np.minimum(first[present], where + done)
+        done += len(indices)
+    present = np.flatnonzero(counts)
+    return Counter({CODONS[i]: int(counts[i]) for i in present[np.argsort(first[present])].tolist()})
+
+def record_codon_counts(seq, frames=(0,), orfs_only=False, min_length=DEFAULT_MIN_PROTEIN_LENGTH,
+                        start_codons=('AUG',)):
+    """
+    Codon counts of one record as a 64-bin array indexed like CODONS.
+    Codons with a base other than A/C/G/T/U are not counted.
+
+    Args:
+        seq: DNA/RNA sequence of one record
+        frames: Forward reading frames (offsets 0-2) to count
+        orfs_only: Count only the codons of the ORFs in all six frames
+                   (stop codons included) instead of whole frames
+        min_length, start_codons: ORF options (see ex1.find_orfs)
+
+    Returns:
+        numpy.ndarray: int64 counts
+    """
+    counts = np.zeros(65, dtype=np.int64)
+    if not orfs_only:
+        # the codons at every position are encoded once; frame f is every third from f
+        codons = strand_codons(seq)
+        for frame in frames:
+            counts += np.bincount(codons[frame::3], minlength=65)
+        return counts[:64]
+
+    for reverse in (False, True):
+        all_codons = strand_codons(seq, reverse)
+        for frame in range(3):
+            codons = all_codons[frame::3]
+            begins, ends, complete = orf_codon_ranges(codons, min_length, start_codons)
+            # +1 where an ORF starts, -1 after its last codon; ORFs of one frame never overlap
+            edges = (np.bincount(begins, minlength=len(codons) + 1)
+                     - np.bincount(ends + complete, minlength=len(codons) + 1))
+            inside = np.cumsum(edges[:len(codons)]) > 0
+            counts += np.bincount(codons[inside], minlength=65)
+    return counts[:64]
+
+def _record_codon_counts(task):
+    return record_codon_counts(*task)
+
+def codon_count_matrix(records, frames=(0,), orfs_only=False, min_length=DEFAULT_MIN_PROTEIN_LENGTH,
+                       start_codons=('AUG',), processes=None):
+    """
+    Codon counts of every (name, sequence) record, one row each, keeping
+    record boundaries. Records are taken from the iterable in batches and
+    counted by a process pool while the next batch is read, so only a few
+    genomes are held in memory at a time.
+
+    Returns:
+        tuple: (record names, int64 array of shape (records, 64), columns as CODONS)
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    records = iter(records)
+    batch_size = max(processes * 4, MIN_RECORDS_FOR_POOL)
+    names, rows = [], []
+    pool = None
+
+    def submit(batch):
+        tasks = [(seq, tuple(frames), orfs_only, min_length, tuple(start_codons)) for _, seq in batch]
+        if pool is None:
+            return list(map(_record_codon_counts, tasks))
+        return pool.map_async(_record_codon_counts, tasks)
+
+    try:
+        batch = list(islice(records, batch_size))
+        if processes > 1 and len(batch) >= MIN_RECORDS_FOR_POOL:
+            pool = Pool(processes)
+        while batch:
+            pending = submit(batch)
+            names.extend(name for name, _ in batch)
+            batch = list(islice(records, batch_size))
+            rows.extend(pending if pool is None else pending.get())
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return names, np.array(rows, dtype=np.int64).reshape(len(rows), 64)
+
+def iter_records(paths):
+    """(name, sequence) of every record of several FASTA files, read lazily."""
+    for path in paths:
+        for i, (header, sequence) in enumerate(iter_fasta(path)):
+            name = header.split(None, 1)[0] if header.strip() else f"{os.path.basename(path)}:{i + 1}"
+            yield name, sequence
+
+def write_codon_matrix(names, matrix, out):
+    """Write a codon count matrix as TSV: one row per record, one column per codon."""
+    out.write('record\t' + '\t'.join(CODONS) + '\n')
+    for name, row in zip(names, matrix.tolist()):
+        out.write(name + '\t' + '\t'.join(map(str, row)) + '\n')
+
+def write_usage_table(names, table, out):
+    """Write codon usage metrics (see codon_usage.usage_table) as TSV, one row per record."""
+    metrics = list(table)
+    out.write('record\t' + '\t'.join(metrics) + '\n')
+    for i, name in enumerate(names):
+        out.write(name + '\t' + '\t'.join(f"{table[m][i]:.4f}" for m in metrics) + '\n')
 
 def plot_top_codons(codon_count, title, filename):
+    plt = get_pyplot()
 
     top = sorted(codon_count.items(), key=lambda x: x[1], reverse=True)[:10]
     codons, counts = zip(*top)
@@ -47,6 +174,7 @@ def plot_top_codons(codon_count, title, filename):
     plt.close()
 
 def plot_comparison(covid_codons, flu_codons):
+    plt = get_pyplot()
     top_covid = dict(sorted(covid_codons.items(), key=lambda x: x[1], reverse=True)[:10])
     top_flu = dict(sorted(flu_codons.items(), key=lambda x: x[1], reverse=True)[:10])
     all_codons = set(top_covid.keys()) | set(top_flu.keys())
@@ -72,13 +200,62 @@ def print_top_aa(aa_count, name):
     top = sorted(aa_count.items(), key=lambda x: x[1], reverse=True)[:3]
     print(f"Top 3 Amino Acids in {name}: {top}")
 
+def print_codon_usage(seq, name):
+    metrics = usage_table(record_codon_counts(seq))
+    print(f"Codon usage of {name}: ENC {metrics['enc'][0]:.1f}, GC3s {metrics['gc3s'][0]:.3f}")
+
 def main():
-    
-    covid_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=nuccore&id=NC_045512.1&rettype=fasta&retmode=text"
-    flu_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=nuccore&id=NC_002023.1&rettype=fasta&retmode=text"
-    
-    download_fasta(covid_url, 'covid19.fasta')
-    download_fasta(flu_url, 'influenza.fasta')
+    parser = argparse.ArgumentParser(description="Codon usage of the COVID-19 and influenza genomes")
+    parser.add_argument('--count', nargs='+', metavar='FASTA',
+                        help="write a codon count table (one row per record) for these files instead")
+    parser.add_argument('--frames', nargs='+', type=int, choices=[0, 1, 2], default=[0],
+                        help="forward reading frames to count (default: 0)")
+    parser.add_argument('--orfs', action='store_true', help="count only codons inside six-frame ORFs")
+    parser.add_argument('--min-length', type=int, default=DEFAULT_MIN_PROTEIN_LENGTH,
+                        help="minimum ORF length in amino acids for --orfs")
+    parser.add_argument('--processes', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="with --count, write ENC, GC3s and CAI per record instead of the counts")
+    parser.add_argument('--reference', nargs='+', metavar='FASTA',
+                        help="reference genes for CAI (default: all counted records pooled)")
+    parser.add_argument('-o', '--output', help="output file for --count (default: stdout)")
+    add_cache_arguments(parser)
+    add_fetch_arguments(parser)
+    args = parser.parse_args()
+    apply_cache_arguments(args)
+    apply_fetch_arguments(args)
+
+    if args.count:
+        names, matrix = codon_count_matrix(iter_records(args.count), args.frames, args.orfs,
+                                           args.min_length, processes=args.processes)
+        if args.metrics:
+            reference = matrix
+            if args.reference:
+                _, reference = codon_count_matrix(iter_records(args.reference), args.frames, args.orfs,
+                                                  args.min_length, processes=args.processes)
+            table = usage_table(matrix, reference)
+
+            def write(out):
+                write_usage_table(names, table, out)
+        else:
+            def write(out):
+                write_codon_matrix(names, matrix, out)
+        if args.output:
+            with open(args.output, 'w') as out:
+                write(out)
+        else:
+            write(sys.stdout)
+        print(f"{len(names)} records counted", file=sys.stderr)
+        return
+
+    # both genomes in parallel; cached downloads are reused without a request
+    genomes = {'covid19.fasta': efetch_url('NC_045512.1'), 'influenza.fasta': efetch_url('NC_002023.1')}
+    try:
+        fetch_many(genomes.values(), genomes.keys(), refresh=args.refresh)
+    except FetchError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print("Without network access, put covid19.fasta and influenza.fasta in the current directory.", file=sys.stderr)
+        return 1
 
     covid_seq = parse_fasta('covid19.fasta')
     flu_seq = parse_fasta('influenza.fasta')
@@ -110,7 +287,9 @@ def main():
     plot_comparison(covid_codons, flu_codons)
     print_top_aa(covid_aa_from_codons, 'SARS-CoV')
     print_top_aa(flu_aa_from_codons, 'Influenza A')
+    print_codon_usage(covid_seq, 'SARS-CoV')
+    print_codon_usage(flu_seq, 'Influenza A')
 
     
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
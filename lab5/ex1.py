@@ -7,7 +7,13 @@ This program:
 3. Reconstructs the original sequence using overlap assembly
 """
 
+import argparse
+import os
 import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf import instrument
 
 
 def get_dna_sequence():
@@ -70,6 +76,7 @@ def take_random_samples(sequence, num_samples=2000, min_length=100, max_length=1
     return samples
 
 
+@instrument.stage()
 def find_overlap(s1, s2, min_overlap=20):
     max_overlap = min(len(s1), len(s2))
 
@@ -80,6 +87,7 @@ def find_overlap(s1, s2, min_overlap=20):
     return 0
 
 
+@instrument.stage()
 def reconstruct_sequence(samples, min_overlap=20):
     if not samples:
         return ""
@@ -94,11 +102,14 @@ def reconstruct_sequence(samples, min_overlap=20):
     max_iterations = len(remaining) * 2
     iteration = 0
 
+    overlap_checks = 0
+
     while remaining and iteration < max_iterations:
         iteration += 1
         best_overlap = 0
         best_idx = -1
         best_position = None
+        overlap_checks += 2 * len(remaining)
 
         for i, sample in enumerate(remaining):
             overlap_end = find_overlap(reconstructed, sample, min_overlap)
@@ -123,6 +134,8 @@ def reconstruct_sequence(samples, min_overlap=20):
             break
 
     print(f"Assembled using {len(unique_samples) - len(remaining)}/{len(unique_samples)} unique fragments")
+    instrument.add_counts('reconstruct_sequence', iterations=iteration, overlap_checks=overlap_checks,
+                          fragments_merged=len(unique_samples) - 1 - len(remaining))
 
     return reconstructed
 
@@ -152,6 +165,10 @@ def calculate_accuracy(original, reconstructed):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="DNA sequence reconstruction from random samples")
+    instrument.add_profile_arguments(parser)
+    instrument.apply_profile_arguments(parser.parse_args())
+
     print("=" * 70)
     print("DNA SEQUENCE RECONSTRUCTION FROM RANDOM SAMPLES")
     print("=" * 70)
@@ -170,6 +187,8 @@ def main():
     print("\n[Step 4] Reconstructing sequence using overlap assembly...")
     reconstructed_sequence = reconstruct_sequence(samples, min_overlap=20)
     print(f"Reconstructed sequence length: {len(reconstructed_sequence)} bp")
+    if instrument.is_enabled():
+        instrument.print_summary()
 
     print("\n" + "=" * 70)
     print("RECONSTRUCTION RESULTS")
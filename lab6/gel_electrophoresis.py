@@ -1,14 +1,22 @@
+import contextlib
 import random
-import matplotlib.pyplot as plt
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf.faidx import FastaIndex
+from bioinf.fasta import read_sequence
+from bioinf.plotting import get_pyplot
 
 def read_fasta_sequence(filename):
-    sequence = ""
-    with open(filename, 'r') as f:
-        for line in f:
-            if not line.startswith('>'):
-                sequence += line.strip()
-    return sequence
+    return read_sequence(filename)
+
+@contextlib.contextmanager
+def open_indexed_sequence(filename, name=None):
+    # Only the sampled fragments are read from disk; the .fai index is built once and reused.
+    # The file is closed when the with block ends.
+    with FastaIndex(filename) as index:
+        yield index.record(name if name is not None else index.names[0])
 
 def extract_random_samples(sequence, num_samples=10, min_length=100, max_length=3000):
     samples = []
@@ -43,7 +51,9 @@ def simulate_gel_electrophoresis(samples):
 
     return samples
 
-def visualize_gel(samples, ladder_sizes=[500, 1500, 3000]):
+def visualize_gel(samples, ladder_sizes=[500, 1500, 3000],
+                  output_file='c:/Users/alina/Desktop/AN4/bioinformatics/lab6/gel_electrophoresis.png'):
+    plt = get_pyplot()
     fig, ax = plt.subplots(figsize=(14, 8))
 
     ax.set_facecolor('black')
@@ -110,9 +120,9 @@ def visualize_gel(samples, ladder_sizes=[500, 1500, 3000]):
         ax.add_patch(well)
 
     plt.tight_layout()
-    plt.savefig('c:/Users/alina/Desktop/AN4/bioinformatics/lab6/gel_electrophoresis.png',
+    plt.savefig(output_file,
                 dpi=300, bbox_inches='tight', pad_inches=0.3, facecolor='white')
-    print("\n> Gel image saved as 'gel_electrophoresis.png'")
+    print(f"\n> Gel image saved as '{os.path.basename(output_file)}'")
     plt.close()
 
 def print_results(original_sequence, samples):
@@ -139,19 +149,19 @@ def main():
     print("="*75)
 
     print("\n[1] Reading DNA sequence from FASTA file...")
-    sequence = read_fasta_sequence('c:/Users/alina/Desktop/AN4/bioinformatics/lab6/sequence.fasta')
-    print(f"    > Sequence loaded: {len(sequence)} bp")
-    print(f"    First 60 bp: {sequence[:60]}...")
+    with open_indexed_sequence('c:/Users/alina/Desktop/AN4/bioinformatics/lab6/sequence.fasta') as sequence:
+        print(f"    > Sequence loaded: {len(sequence)} bp")
+        print(f"    First 60 bp: {sequence[:60]}...")
 
-    print("\n[2] Extracting 10 random samples from the sequence...")
-    samples = extract_random_samples(sequence, num_samples=10, min_length=100, max_length=len(sequence))
-    print(f"    > {len(samples)} samples extracted and stored in array")
+        print("\n[2] Extracting 10 random samples from the sequence...")
+        samples = extract_random_samples(sequence, num_samples=10, min_length=100, max_length=len(sequence))
+        print(f"    > {len(samples)} samples extracted and stored in array")
 
-    print("\n[3] Simulating gel electrophoresis migration...")
-    samples = simulate_gel_electrophoresis(samples)
-    print("    > Migration simulation complete")
+        print("\n[3] Simulating gel electrophoresis migration...")
+        samples = simulate_gel_electrophoresis(samples)
+        print("    > Migration simulation complete")
 
-    print_results(sequence, samples)
+        print_results(sequence, samples)
 
     print("\n[4] Creating visual representation of the gel...")
     visualize_gel(samples)
@@ -3,37 +3,34 @@ Influenza Genomes Repetition Analysis
 Analyzes 10 influenza virus genomes and plots repetition frequencies for each
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import argparse
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf import instrument
+from bioinf.cache import add_cache_arguments, apply_cache_arguments, cached_sequence
+from bioinf.kmers import repeated_kmers
+from bioinf.plotting import get_pyplot
 
 def read_dna_sequence(filename):
-    sequence = ""
-    with open(filename, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if not line.startswith('>'):
-                sequence += line.upper()
-    return sequence
+    return cached_sequence(filename, upper=True)
 
 
+@instrument.stage()
 def detect_repetitions(sequence, min_length=6, max_length=10):
     repetitions = {}
+    windows = 0
 
     for pattern_length in range(min_length, max_length + 1):
-        for i in range(len(sequence) - pattern_length + 1):
-            pattern = sequence[i:i + pattern_length]
-
-            positions = []
-            for j in range(len(sequence) - pattern_length + 1):
-                if sequence[j:j + pattern_length] == pattern:
-                    positions.append(j)
-
-            if len(positions) > 1:
-                if pattern not in repetitions:
-                    repetitions[pattern] = positions
-
+        windows += max(0, len(sequence) - pattern_length + 1)
+        # the windows of one length are grouped with one sort of their k-mer
+        # indices instead of comparing every window with every other one
+        for pattern, positions in repeated_kmers(sequence, pattern_length):
+            if pattern not in repetitions:
+                repetitions[pattern] = positions
+
+    instrument.add_counts('detect_repetitions', windows_scanned=windows, emitted=len(repetitions))
     return repetitions
 
 
@@ -43,6 +40,7 @@ def filter_repetitions(repetitions, min_occurrences=2):
 
 
 def plot_genome_frequencies(repetitions, genome_name, output_file):
+    plt = get_pyplot('Agg')
     sorted_repetitions = sorted(repetitions.items(), key=lambda x: len(x[1]), reverse=True)
 
     fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 5))
@@ -127,6 +125,7 @@ def analyze_genome(genome_file, genome_name, output_dir):
 
 
 def create_summary_comparison(results, output_file):
+    plt = get_pyplot('Agg')
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle('Influenza Genomes Comparison - Repetition Analysis', fontsize=16, fontweight='bold')
 
@@ -198,6 +197,10 @@ def create_summary_comparison(results, output_file):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Repetition analysis of the influenza genomes")
+    add_cache_arguments(parser)
+    apply_cache_arguments(parser.parse_args())
+
     genomes_dir = 'influenza_genomes'
     output_dir = 'influenza_analysis_results'
 
@@ -3,36 +3,33 @@ DNA Repetition Detector
 Detects repetitions of 6-10 base pairs in a DNA sequence
 """
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf import instrument
+from bioinf.fasta import read_sequence
+from bioinf.kmers import repeated_kmers
+from bioinf.plotting import get_pyplot
 
 def read_dna_sequence(filename):
-    sequence = ""
-    with open(filename, 'r') as file:
-        for line in file:
-            line = line.strip()
-            if not line.startswith('>'):
-                sequence += line.upper()
-    return sequence
+    return read_sequence(filename, upper=True)
 
 
+@instrument.stage()
 def detect_repetitions(sequence, min_length=6, max_length=10):
     repetitions = {}
+    windows = 0
 
     for pattern_length in range(min_length, max_length + 1):
-        for i in range(len(sequence) - pattern_length + 1):
-            pattern = sequence[i:i + pattern_length]
-
-            positions = []
-            for j in range(len(sequence) - pattern_length + 1):
-                if sequence[j:j + pattern_length] == pattern:
-                    positions.append(j)
-
-            if len(positions) > 1:
-                if pattern not in repetitions:
-                    repetitions[pattern] = positions
-
+        windows += max(0, len(sequence) - pattern_length + 1)
+        # the windows of one length are grouped with one sort of their k-mer
+        # indices instead of comparing every window with every other one
+        for pattern, positions in repeated_kmers(sequence, pattern_length):
+            if pattern not in repetitions:
+                repetitions[pattern] = positions
+
+    instrument.add_counts('detect_repetitions', windows_scanned=windows, emitted=len(repetitions))
     return repetitions
 
 
@@ -78,7 +75,8 @@ def display_results(repetitions, sequence, top_n=50):
         print(f"{length:<10} {len(patterns_of_length):<20} {total_occurrences}")
 
 
-def plot_repetition_frequencies(repetitions):
+def plot_repetition_frequencies(repetitions, output_file='repetition_frequency_plots.png'):
+    plt = get_pyplot('Agg')
     sorted_repetitions = sorted(repetitions.items(), key=lambda x: len(x[1]), reverse=True)
 
     fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 5))
@@ -128,8 +126,8 @@ def plot_repetition_frequencies(repetitions):
     ax3.grid(axis='y', alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig('repetition_frequency_plots.png', dpi=300, bbox_inches='tight')
-    print("Plots saved to 'repetition_frequency_plots.png'")
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    print(f"Plots saved to '{output_file}'")
     plt.close()
 
 
@@ -1,19 +1,32 @@
+import argparse
 import json
 import re
+import os
+import sys
 from collections import defaultdict
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf import instrument
+from bioinf.fasta import read_sequence
+
 def reverse_complement(seq):
     complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
     return ''.join(complement[base] for base in reversed(seq))
 
+@instrument.stage()
 def find_inverted_repeats(sequence, min_length=8, max_length=15, max_gap=20, max_distance=100):
     inverted_repeats = []
+    windows = 0
+    comparisons = 0
 
     for i in range(len(sequence) - min_length):
         for length in range(min_length, min(max_length + 1, len(sequence) - i + 1)):
             left_seq = sequence[i:i+length]
+            right_starts = range(i + length + max_gap, min(i + max_distance, len(sequence) - length + 1))
+            windows += 1
+            comparisons += len(right_starts)
 
-            for j in range(i + length + max_gap, min(i + max_distance, len(sequence) - length + 1)):
+            for j in right_starts:
                 right_seq = sequence[j:j+length]
 
                 if left_seq == reverse_complement(right_seq):
@@ -39,16 +52,24 @@ def find_inverted_repeats(sequence, min_length=8, max_length=15, max_gap=20, max
             filtered_repeats.append(ir)
             used_positions.update(positions)
 
+    instrument.add_counts('find_inverted_repeats', windows_scanned=windows, comparisons=comparisons,
+                          candidates=len(inverted_repeats), emitted=len(filtered_repeats))
     return filtered_repeats
 
+@instrument.stage()
 def find_direct_repeats(sequence, min_length=5, max_length=12, max_distance=100):
     direct_repeats = []
+    windows = 0
+    comparisons = 0
 
     for i in range(len(sequence) - min_length):
         for length in range(min_length, min(max_length + 1, len(sequence) - i + 1)):
             repeat = sequence[i:i+length]
+            second_starts = range(i + length, min(i + max_distance, len(sequence) - length + 1))
+            windows += 1
+            comparisons += len(second_starts)
 
-            for j in range(i + length, min(i + max_distance, len(sequence) - length + 1)):
+            for j in second_starts:
                 if sequence[j:j+length] == repeat:
                     distance = j - i
                     direct_repeats.append({
@@ -61,8 +82,11 @@ def find_direct_repeats(sequence, min_length=5, max_length=12, max_distance=100)
                         'distance': distance
                     })
 
+    instrument.add_counts('find_direct_repeats', windows_scanned=windows, comparisons=comparisons,
+                          emitted=len(direct_repeats))
     return direct_repeats
 
+@instrument.stage()
 def detect_transposons(sequence, min_te_length=30):
     print("Searching for inverted repeats (TIRs)...")
     inverted_repeats = find_inverted_repeats(sequence)
@@ -133,17 +157,18 @@ def detect_transposons(sequence, min_te_length=30):
         if not overlap:
             filtered_transposons.append(te)
 
+    instrument.add_counts('detect_transposons', candidates=len(transposons),
+                          emitted=len(filtered_transposons))
     return filtered_transposons
 
 def read_fasta(filename):
-    sequence = ""
-    with open(filename, 'r') as f:
-        for line in f:
-            if not line.startswith('>'):
-                sequence += line.strip()
-    return sequence
+    return read_sequence(filename)
 
 def main():
+    parser = argparse.ArgumentParser(description="Transposable element detection in artificial_dna.fasta")
+    instrument.add_profile_arguments(parser)
+    instrument.apply_profile_arguments(parser.parse_args())
+
     print("="*70)
     print("TRANSPOSABLE ELEMENT DETECTION")
     print("="*70)
@@ -190,6 +215,11 @@ def main():
 
     print(f"Results saved to detection_results.json")
 
+    if instrument.is_enabled():
+        instrument.print_summary()
+        instrument.dump('detection_metrics.json', {'sequence_length': len(sequence)})
+        print(f"Stage metrics saved to detection_metrics.json")
+
     try:
         with open('transposons_ground_truth.json', 'r') as f:
             ground_truth = json.load(f)
@@ -1,71 +1,151 @@
+import argparse
 import json
+import os
+import sys
 from collections import defaultdict
 
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bioinf import instrument
+from bioinf.cache import add_cache_arguments, apply_cache_arguments, cached_sequence
+from bioinf.packed import DEFAULT_BLOCK_SIZE, iter_code_blocks, load_genome
+
 def reverse_complement(seq):
     complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G', 'N': 'N'}
     return ''.join(complement.get(base, 'N') for base in reversed(seq))
 
+# Letter classes of the string comparison: A, C, G, T, N and any other
+# letter, whose complement (see reverse_complement) is N. A PackedGenome's
+# base codes 0-4 are the first five classes.
+_CLASSES = np.full(256, 5, dtype=np.uint8)
+for _code, _letters in enumerate(['Aa', 'Cc', 'Gg', 'Tt', 'Nn']):
+    for _letter in _letters:
+        _CLASSES[ord(_letter)] = _code
+_CLASS_COMPLEMENT = np.array([3, 2, 1, 0, 4, 4], dtype=np.uint64)
+
+
+def _class_blocks(sequence, overlap):
+    if not isinstance(sequence, str):
+        yield from iter_code_blocks(sequence, overlap=overlap)
+        return
+    for start in range(0, len(sequence), DEFAULT_BLOCK_SIZE):
+        text = sequence[start:start + DEFAULT_BLOCK_SIZE + overlap].encode('ascii', 'replace')
+        yield start, _CLASSES[np.frombuffer(text, dtype=np.uint8)]
+
+
+def _inverted_repeat_pairs(sequence, length, min_spacing, max_spacing):
+    """
+    (left start, right start) of every pair of windows where the right one
+    equals reverse_complement() of the left one, which has no N, block by
+    block on 3-bit letter classes (so U and IUPAC letters behave as in the
+    string comparison: they pair only with an N).
+
+    Returns:
+        tuple: (left starts, right starts, windows scanned, comparisons)
+    """
+    n = len(sequence)
+    last_left = n - length  # left windows start in range(n - length)
+    lefts, rights = [], []
+    windows = comparisons = 0
+
+    for start, classes in _class_blocks(sequence, length + max_spacing):
+        total = len(classes) - length + 1
+        count = min(DEFAULT_BLOCK_SIZE, last_left - start, total)
+        if count <= 0:
+            continue
+        windows += count
+        index = np.zeros(total, dtype=np.uint64)
+        reverse = np.zeros(count, dtype=np.uint64)
+        left_valid = np.ones(count, dtype=bool)
+        for offset in range(length):
+            window = classes[offset:offset + total]
+            index = (index << np.uint64(3)) | window
+            reverse |= _CLASS_COMPLEMENT[window[:count]] << np.uint64(3 * offset)
+            left_valid &= window[:count] != 4
+
+        # right starts run from i + length + min_spacing to before
+        # min(i + length + max_spacing, n - length + 1)
+        first = np.arange(start, start + count) + length + min_spacing
+        stop = np.minimum(first - min_spacing + max_spacing, n - length + 1)
+        comparisons += int(np.maximum(stop - first, 0)[left_valid].sum())
+
+        for distance in range(length + min_spacing, length + max_spacing):
+            k = min(count, total - distance)
+            if k <= 0:
+                break
+            match = (index[distance:distance + k] == reverse[:k]) & left_valid[:k]
+            found = np.flatnonzero(match)
+            lefts.append(found + start)
+            rights.append(found + start + distance)
+
+    if not lefts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, windows, comparisons
+    lefts = np.concatenate(lefts)
+    rights = np.concatenate(rights)
+    order = np.lexsort((rights, lefts))
+    return lefts[order], rights[order], windows, comparisons
+
+
+@instrument.stage()
 def find_inverted_repeats(sequence, min_length=4, max_length=6, min_spacing=10, max_spacing=100):
-    inverted_repeats = []
-    seq_upper = sequence.upper()
+    """
+    Inverted repeats of max_length down to min_length bases. Works on base
+    codes or letter classes, block by block (a PackedGenome is read from its
+    mmap), so the genome is never turned into a Python string.
+    """
+    candidates = []
+    total = 0
+    windows = 0
+    comparisons = 0
 
     for length in range(max_length, min_length - 1, -1):
         print(f"  Searching for {length} bp repeats...")
-        for i in range(len(seq_upper) - length):
-            left_seq = seq_upper[i:i+length]
-
-            if 'N' in left_seq:
-                continue
-
-            rc = reverse_complement(left_seq)
-
-            for j in range(i + length + min_spacing, min(i + length + max_spacing, len(seq_upper) - length + 1)):
-                right_seq = seq_upper[j:j+length]
-
-                if right_seq == rc:
-                    inverted_repeats.append({
-                        'left_start': i,
-                        'left_end': i + length - 1,
-                        'right_start': j,
-                        'right_end': j + length - 1,
-                        'sequence': left_seq,
-                        'length': length,
-                        'spacing': j - (i + length)
-                    })
+        lefts, rights, scanned, compared = _inverted_repeat_pairs(sequence, length, min_spacing, max_spacing)
+        windows += scanned
+        comparisons += compared
+        candidates.append((length, lefts, rights))
+        total += len(lefts)
 
+    # longest first, then by position; a repeat is kept when none of its bases is used yet
     filtered = []
-    used = set()
-    inverted_repeats.sort(key=lambda x: (-x['length'], x['left_start']))
-
-    for ir in inverted_repeats:
-        pos_range = set(range(ir['left_start'], ir['left_end'] + 1))
-        pos_range.update(range(ir['right_start'], ir['right_end'] + 1))
-
-        if not pos_range.intersection(used):
-            filtered.append(ir)
-            used.update(pos_range)
-
+    used = bytearray(len(sequence))
+    covered = b'\x01' * max_length
+    for length, lefts, rights in candidates:
+        for left, right in zip(lefts.tolist(), rights.tolist()):
+            if 1 in used[left:left + length] or 1 in used[right:right + length]:
+                continue
+            used[left:left + length] = covered[:length]
+            used[right:right + length] = covered[:length]
+            filtered.append({
+                'left_start': left,
+                'left_end': left + length - 1,
+                'right_start': right,
+                'right_end': right + length - 1,
+                'sequence': sequence[left:left + length].upper(),
+                'length': length,
+                'spacing': right - (left + length)
+            })
+
+    instrument.add_counts('find_inverted_repeats', windows_scanned=windows, comparisons=comparisons,
+                          candidates=total, emitted=len(filtered))
     return filtered
 
 def read_fasta(filename):
-    sequence = ""
-    with open(filename, 'r') as f:
-        for line in f:
-            if not line.startswith('>'):
-                sequence += line.strip()
-    return sequence
+    return cached_sequence(filename)
 
 def analyze_genome(filename, genome_name):
     print(f"\n{'='*70}")
     print(f"Analyzing {genome_name}")
     print(f"{'='*70}")
 
-    sequence = read_fasta(filename)
-    genome_length = len(sequence)
-    print(f"Genome length: {genome_length:,} bp")
+    with load_genome(filename) as genome:
+        genome_length = len(genome)
+        print(f"Genome length: {genome_length:,} bp")
 
-    print("\nSearching for inverted repeats (4-6 bp)...")
-    inverted_repeats = find_inverted_repeats(sequence)
+        print("\nSearching for inverted repeats (4-6 bp)...")
+        inverted_repeats = find_inverted_repeats(genome)
 
     print(f"Found {len(inverted_repeats)} potential transposon sites")
 
@@ -97,6 +177,13 @@ def analyze_genome(filename, genome_name):
     }
 
 def main():
+    parser = argparse.ArgumentParser(description="Inverted repeat search in bacterial genomes")
+    add_cache_arguments(parser)
+    instrument.add_profile_arguments(parser)
+    args = parser.parse_args()
+    apply_cache_arguments(args)
+    instrument.apply_profile_arguments(args)
+
     print("="*70)
     print("TRANSPOSON DETECTION IN BACTERIAL GENOMES")
     print("="*70)
@@ -109,11 +196,16 @@ def main():
     ]
 
     results = []
+    metrics = {}
 
     for filename, name in genomes:
         try:
+            instrument.reset()
             result = analyze_genome(filename, name)
             results.append(result)
+            if instrument.is_enabled():
+                instrument.print_summary()
+                metrics[name] = {'genome_length': result['genome_length'], 'stages': instrument.report()}
         except FileNotFoundError:
             print(f"\nError: {filename} not found. Run download_genomes.py first.")
 
@@ -132,6 +224,10 @@ def main():
             print(f"  Density: {density:.2f} per Mbp")
 
         print(f"\nResults saved to bacterial_transposon_analysis.json")
+        if metrics:
+            with open('bacterial_transposon_metrics.json', 'w') as f:
+                json.dump(metrics, f, indent=2)
+            print(f"Stage metrics saved to bacterial_transposon_metrics.json")
         print(f"{'='*70}\n")
 
 if __name__ == "__main__":
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the tests import bioinf and the lab scripts the same way the labs do
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
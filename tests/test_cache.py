@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from bioinf import cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / 'cache'
+    monkeypatch.setitem(cache._settings, 'directory', str(directory))
+    monkeypatch.setitem(cache._settings, 'enabled', True)
+    return directory
+
+
+def test_cached_sequence_round_trip(tmp_path, cache_dir):
+    fasta = tmp_path / 'a.fa'
+    fasta.write_text('>a\nacgt\nAC\n>b\nGG\n')
+    assert cache.cached_sequence(str(fasta)) == 'acgtACGG'
+    assert len(os.listdir(cache_dir)) == 1
+    assert cache.cached_sequence(str(fasta)) == 'acgtACGG'
+    assert cache.cached_sequence(str(fasta), upper=True) == 'ACGTACGG'
+
+
+def test_non_latin1_sequence_is_not_cached(tmp_path, cache_dir):
+    fasta = tmp_path / 'u.fa'
+    fasta.write_text('>u\nAC→GT\n', encoding='utf-8')
+    expected = cache.read_sequence(str(fasta))
+    assert cache.cached_sequence(str(fasta)) == expected
+    assert not cache_dir.exists() or not os.listdir(cache_dir)
@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+from bioinf.chunked import BedGraphWriter, chunk_columns, iter_window_chunks, read_window_file, run_pipeline
+from bioinf.fasta import read_records
+
+
+@pytest.fixture
+def fasta(tmp_path):
+    rng = random.Random(7)
+    path = tmp_path / 'g.fa'
+    with open(path, 'w') as f:
+        for i, length in enumerate([2500, 17, 1, 4000]):
+            sequence = ''.join(rng.choice('ACGTN' if i == 3 else 'acgt') for _ in range(length))
+            f.write(f'>r{i} record\n')
+            f.writelines(sequence[j:j + 70] + '\n' for j in range(0, len(sequence), 70))
+    return str(path)
+
+
+@pytest.mark.parametrize('window,step', [(30, 1), (25, 7), (1, 3)])
+def test_chunks_cover_every_window(fasta, window, step):
+    records = {header.split()[0]: sequence.upper() for header, sequence in read_records(fasta)}
+    seen = {}
+    for name, first, piece in iter_window_chunks(fasta, window, step, chunk_size=300):
+        assert first % step == 0
+        starts = list(range(first, first + len(piece) - window + 1, step))
+        assert piece == records[name][first:first + len(piece)]
+        seen.setdefault(name, []).extend(starts)
+    for name, sequence in records.items():
+        assert seen.get(name, []) == list(range(0, len(sequence) - window + 1, step))
+
+
+@pytest.mark.parametrize('window,step', [(20, 3), (10, 25)])
+def test_binary_matches_in_memory(tmp_path, fasta, window, step):
+    columns = ('A', 'GC', 'tm')
+    output = str(tmp_path / 'w.bin')
+    run_pipeline(fasta, output, window, step, columns, 'binary', chunk_size=256,
+                 tm_method='nearest_neighbor', dtype=np.float64)
+    info, records = read_window_file(output)
+    assert info['columns'] == ['A', 'GC', 'tm_nearest_neighbor']
+    assert (info['window'], info['step']) == (window, step)
+
+    for header, sequence in read_records(fasta, upper=True):
+        name = header.split()[0]
+        if len(sequence) < window:
+            assert name not in records
+            continue
+        expected = chunk_columns(sequence, window, step, columns, 'nearest_neighbor')
+        starts, values = records[name]
+        np.testing.assert_array_equal(starts, np.arange(len(expected)) * step)
+        np.testing.assert_allclose(values, expected, rtol=1e-12, equal_nan=True)
+
+
+def test_long_column_names_round_trip(tmp_path, fasta):
+    output = str(tmp_path / 'w.bin')
+    run_pipeline(fasta, output, 10, 1, ('tm',), 'binary', tm_method='salt_adjusted')
+    info, _ = read_window_file(output)
+    assert info['columns'] == ['tm_salt_adjusted']
+
+
+def test_bedgraph_skips_nan(tmp_path):
+    path = str(tmp_path / 'x.bedgraph')
+    writer = BedGraphWriter(path, ['GC'], 10, 5)
+    writer.write('r', np.array([0, 5]), np.array([[0.5], [np.nan]]))
+    writer.close()
+    with open(path) as f:
+        assert f.read().splitlines()[1:] == ['r\t0\t5\t0.5']
@@ -0,0 +1,94 @@
+import random
+
+import numpy as np
+import pytest
+
+from bioinf.labs import load_lab
+
+codon_usage = load_lab('lab4/codon_usage.py')
+ex1 = load_lab('lab4/ex1.py')
+
+FAMILIES = {}
+for _codon in ex1.CODONS:
+    if _codon not in ex1.STOP_CODONS:
+        FAMILIES.setdefault(ex1.CODON_TABLE[_codon], []).append(ex1.CODONS.index(_codon))
+
+
+def uniform():
+    counts = np.full(64, 100.0)
+    for codon in ex1.STOP_CODONS:
+        counts[ex1.CODONS.index(codon)] = 0
+    return counts
+
+
+def one_codon_per_amino_acid():
+    counts = np.zeros(64)
+    for members in FAMILIES.values():
+        counts[members[0]] = 50
+    return counts
+
+
+def reference_enc(counts):
+    """Wright (1990), one amino acid at a time."""
+    by_class = {}
+    for members in FAMILIES.values():
+        n = counts[members].sum()
+        if len(members) > 1 and n >= 2:
+            p = counts[members] / n
+            by_class.setdefault(len(members), []).append((n * (p ** 2).sum() - 1) / (n - 1))
+    averages = {size: np.mean(values) for size, values in by_class.items()}
+    if 3 not in averages:
+        averages[3] = (averages[2] + averages[4]) / 2
+    sizes = [len(members) for members in FAMILIES.values()]
+    enc = sizes.count(1) + sum(sizes.count(size) / averages[size] for size in (2, 3, 4, 6))
+    return min(enc, 61)
+
+
+def test_enc_bounds():
+    assert codon_usage.enc(uniform()) == 61
+    assert codon_usage.enc(one_codon_per_amino_acid()) == pytest.approx(20)
+
+
+def test_enc_matches_reference():
+    rng = np.random.default_rng(4)
+    matrix = rng.integers(0, 40, size=(5, 64)).astype(float)
+    matrix[-1, FAMILIES['I']] = 0  # missing 3-fold class
+    np.testing.assert_allclose(codon_usage.enc(matrix), [reference_enc(row) for row in matrix])
+
+
+def test_rscu():
+    values = codon_usage.rscu(uniform())
+    np.testing.assert_allclose(values[codon_usage.SENSE], 1.0)
+
+    counts = one_codon_per_amino_acid()
+    values = codon_usage.rscu(counts)
+    for members in FAMILIES.values():
+        assert values[members[0]] == pytest.approx(len(members))
+        assert not values[members[1:]].any()
+
+
+def test_cai_of_reference_set():
+    for reference in (uniform(), one_codon_per_amino_acid()):
+        assert codon_usage.cai(reference, reference) == pytest.approx(1.0)
+    # codons the reference never uses lower the index
+    assert codon_usage.cai(uniform(), one_codon_per_amino_acid()) < 0.5
+
+
+def test_gc3():
+    counts = uniform()
+    synonymous = [codon for codon, used in zip(ex1.CODONS, codon_usage.SYNONYMOUS) if used]
+    assert codon_usage.gc3(counts) == pytest.approx(
+        sum(codon[2] in 'GC' for codon in synonymous) / len(synonymous))
+    counts[~codon_usage.GC_THIRD] = 0
+    assert codon_usage.gc3(counts) == 1.0
+
+
+def test_matrix_rows_match_vectors():
+    rng = random.Random(2)
+    matrix = np.array([[rng.randint(0, 30) for _ in range(64)] for _ in range(3)], dtype=float)
+    table = codon_usage.usage_table(matrix, matrix)
+    for i, row in enumerate(matrix):
+        assert table['enc'][i] == pytest.approx(codon_usage.enc(row))
+        assert table['gc3s'][i] == pytest.approx(codon_usage.gc3(row))
+        assert table['cai'][i] == pytest.approx(codon_usage.cai(row, matrix))
+    np.testing.assert_array_equal(codon_usage.amino_acid_counts(matrix).sum(axis=1), matrix.sum(axis=1))
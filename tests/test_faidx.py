@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from bioinf.faidx import FastaIndex, build_index, parse_region, read_index
+
+
+def write_fasta(path, records, width, newline='\n', final_newline=True):
+    lines = []
+    for name, sequence in records:
+        lines.append('>' + name + ' description')
+        lines.extend(sequence[i:i + width] for i in range(0, len(sequence), width))
+    text = newline.join(lines) + (newline if final_newline else '')
+    path.write_bytes(text.encode('ascii'))
+
+
+def test_index_matches_samtools_layout(tmp_path):
+    fasta = tmp_path / 't.fa'
+    fasta.write_bytes(b'>a x\nACGT\nACGT\nAC\n>b\nGGGG\n')
+    assert build_index(str(fasta)) == [('a', 10, 5, 4, 5), ('b', 4, 21, 4, 5)]
+    assert read_index(str(fasta) + '.fai') == [('a', 10, 5, 4, 5), ('b', 4, 21, 4, 5)]
+
+
+def test_unterminated_last_line(tmp_path):
+    fasta = tmp_path / 't.fa'
+    fasta.write_bytes(b'>a\nACGT\nACGT')
+    assert build_index(str(fasta)) == [('a', 8, 3, 4, 5)]
+    with FastaIndex(str(fasta)) as index:
+        assert index.fetch('a') == 'ACGTACGT'
+
+
+def test_uneven_lines_rejected(tmp_path):
+    fasta = tmp_path / 't.fa'
+    fasta.write_bytes(b'>a\nACG\nACGT\n')
+    with pytest.raises(ValueError):
+        build_index(str(fasta))
+
+
+@pytest.mark.parametrize('newline,final_newline', [('\n', True), ('\r\n', True), ('\n', False)])
+def test_fetch_round_trip(tmp_path, newline, final_newline):
+    rng = random.Random(1)
+    records = [(f'r{i}', ''.join(rng.choice('ACGT') for _ in range(rng.randint(1, 500))))
+               for i in range(5)]
+    fasta = tmp_path / 't.fa'
+    write_fasta(fasta, records, 60, newline, final_newline)
+
+    with FastaIndex(str(fasta)) as index:
+        assert index.names == [name for name, _ in records]
+        for name, sequence in records:
+            assert index.length(name) == len(sequence)
+            assert index.fetch(name) == sequence
+            for _ in range(50):
+                start = rng.randint(0, len(sequence))
+                end = rng.randint(start, len(sequence))
+                assert index.fetch(name, start, end) == sequence[start:end]
+                assert index.record(name)[start:end] == sequence[start:end]
+            assert index.fetch_region(f'{name}:2-3') == sequence[1:3]
+
+
+def test_parse_region():
+    assert parse_region('chr1:1,000-2,000') == ('chr1', 999, 2000)
+    assert parse_region('chr1') == ('chr1', 0, None)
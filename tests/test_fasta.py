@@ -0,0 +1,24 @@
+from bioinf.fasta import ProgressFile, iter_fasta, iter_fasta_pieces, read_records
+
+
+def test_records_and_pieces(tmp_path):
+    fasta = tmp_path / 'a.fa'
+    fasta.write_text('>a first\nACGT\nAC\n\n>b\nGGGG\nTT\n')
+    assert read_records(str(fasta)) == [('a first', 'ACGTAC'), ('b', 'GGGGTT')]
+    pieces = list(iter_fasta_pieces(str(fasta), piece_size=4))
+    assert pieces == [(0, 'a first', 'ACGT'), (0, 'a first', 'AC'), (1, 'b', 'GGGG'), (1, 'b', 'TT')]
+
+
+def test_progress_file_counts_bytes(tmp_path):
+    fasta = tmp_path / 'a.fa'
+    fasta.write_bytes(b'>a\r\n' + b'ACGTACGTAC\r\n' * 5000 + b'>b\r\nGG\r\n')
+    positions = []
+    with ProgressFile(str(fasta)) as handle:
+        records = []
+        for record in iter_fasta(handle):
+            records.append(record)
+            positions.append(handle.position)
+        assert handle.size == len(fasta.read_bytes())
+        assert positions == sorted(positions)
+        assert positions[-1] == handle.size
+    assert records == [('a', 'ACGTACGTAC' * 5000), ('b', 'GG')]
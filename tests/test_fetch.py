@@ -0,0 +1,129 @@
+import collections
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bioinf import cache, fetch
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    /flaky answers 503 twice, /truncated cuts its first body short,
+    /missing is a 404, /text is not FASTA; anything else is a FASTA record
+    with an ETag.
+    """
+    hits = collections.Counter()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        hits = self.hits
+        hits[self.path] += 1
+        if self.path == '/flaky' and hits[self.path] <= 2:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path == '/missing':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = b'Error: unknown id' if self.path == '/text' else b'>%s\nACGT\n' % self.path[1:].encode()
+        etag = f'"{len(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.path == '/truncated' and hits[self.path] == 1:
+            body = body[:3]
+            self.close_connection = True
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setitem(cache._settings, 'directory', str(tmp_path / 'cache'))
+    monkeypatch.setitem(fetch._settings, 'offline', False)
+    Handler.hits = collections.Counter()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_cold_then_warm(server, tmp_path):
+    urls = [f'{server}/g{i}' for i in range(6)]
+    cold = fetch.fetch_many(urls, workers=3)
+    assert [read(cold[url]) for url in urls] == [b'>g%d\nACGT\n' % i for i in range(6)]
+    warm = fetch.fetch_many(urls)
+    assert warm == cold
+    assert sum(Handler.hits.values()) == 6
+
+
+def test_refresh_revalidates(server, tmp_path):
+    destination = tmp_path / 'g.fasta'
+    path = fetch.fetch(f'{server}/g', str(destination))
+    assert fetch.fetch(f'{server}/g', str(destination), refresh=True) == path
+    assert Handler.hits['/g'] == 2
+    assert read(destination) == read(path)
+
+
+@pytest.mark.parametrize('name,requests', [('flaky', 3), ('truncated', 2)])
+def test_retries(server, name, requests):
+    path = fetch.fetch(f'{server}/{name}', backoff=0.01)
+    assert read(path) == b'>%s\nACGT\n' % name.encode()
+    assert Handler.hits['/' + name] == requests
+
+
+def test_errors(server):
+    with pytest.raises(fetch.FetchError, match='HTTP 404'):
+        fetch.fetch(f'{server}/missing', backoff=0.01)
+    with pytest.raises(fetch.FetchError, match='not FASTA'):
+        fetch.fetch(f'{server}/text')
+
+    urls = [f'{server}/missing', f'{server}/g', f'{server}/text']
+    results = fetch.fetch_many(urls, raise_errors=False, backoff=0.01)
+    assert [isinstance(results[url], fetch.FetchError) for url in urls] == [True, False, True]
+    with pytest.raises(fetch.FetchError, match='2 of 3 downloads failed') as error:
+        fetch.fetch_many(urls, backoff=0.01)
+    assert len(error.value.errors) == 2
+
+
+def test_connection_refused(server):
+    with pytest.raises(fetch.FetchError, match='after 2 attempts'):
+        fetch.fetch('http://127.0.0.1:1/g', retries=1, backoff=0.01)
+
+
+def test_offline(server, monkeypatch):
+    path = fetch.fetch(f'{server}/g')
+    monkeypatch.setitem(fetch._settings, 'offline', True)
+    assert fetch.fetch(f'{server}/g', refresh=True) == path
+    with pytest.raises(fetch.FetchError, match='offline'):
+        fetch.fetch(f'{server}/new')
+    assert Handler.hits['/new'] == 0
+
+
+def test_existing_destination_is_imported(server, tmp_path, monkeypatch):
+    monkeypatch.setitem(fetch._settings, 'offline', True)
+    destination = tmp_path / 'local.fasta'
+    destination.write_bytes(b'>local\nGGCC\n')
+    path = fetch.fetch(f'{server}/g', str(destination))
+    assert read(path) == read(destination) == b'>local\nGGCC\n'
+    assert sum(Handler.hits.values()) == 0
+
+    # imported entries have no validators: refresh downloads the server copy
+    monkeypatch.setitem(fetch._settings, 'offline', False)
+    fetch.fetch(f'{server}/g', str(destination), refresh=True)
+    assert read(destination) == b'>g\nACGT\n'
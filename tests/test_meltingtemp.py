@@ -0,0 +1,96 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from bioinf.meltingtemp import (INIT_AT, INIT_GC, NN_PARAMS, R, SYMMETRY_DS, melting_temperature, tm_batch,
+                                tm_windows)
+
+COMPLEMENT = str.maketrans('ACGT', 'TGCA')
+
+
+def reference_nn(sequence, na=50, oligo_concentration=50):
+    """SantaLucia (1998) two-state Tm, one oligo at a time."""
+    dh = ds = 0.0
+    for i in range(len(sequence) - 1):
+        pair_dh, pair_ds = NN_PARAMS[sequence[i:i + 2]]
+        dh += pair_dh
+        ds += pair_ds
+    for terminal in (sequence[0], sequence[-1]):
+        init_dh, init_ds = INIT_GC if terminal in 'GC' else INIT_AT
+        dh += init_dh
+        ds += init_ds
+    symmetric = sequence == sequence.translate(COMPLEMENT)[::-1]
+    if symmetric:
+        ds += SYMMETRY_DS
+    ds += 0.368 * (len(sequence) - 1) * math.log(na / 1000)
+    strands = oligo_concentration * 1e-9 / (1 if symmetric else 4)
+    return 1000 * dh / (ds + R * math.log(strands)) - 273.15
+
+
+def test_published_values():
+    # Biopython Bio.SeqUtils.MeltingTemp docs: Tm_Wallace and Tm_NN (DNA_NN3,
+    # Na+ 50 mM, 25 nM of each strand, saltcorr=5)
+    sequence = 'CGTTCCAAAGATGTGGGCATGAGCTTAC'
+    assert melting_temperature(sequence, 'simple') == 84.0
+    assert melting_temperature(sequence) == pytest.approx(60.32, abs=0.005)
+
+
+@pytest.mark.parametrize('sequence', ['GCGCGC', 'ACGTACGT', 'AAAAATTTTT', 'CCGGATCCGG', 'ATGCAAGTCCTAG'])
+def test_nearest_neighbor_matches_reference(sequence):
+    assert melting_temperature(sequence) == pytest.approx(reference_nn(sequence), abs=1e-9)
+    assert melting_temperature(sequence, na=150, oligo_concentration=250) == pytest.approx(
+        reference_nn(sequence, 150, 250), abs=1e-9)
+
+
+def test_batch_and_windows_match_single_oligos():
+    rng = random.Random(11)
+    genome = ''.join(rng.choice('ACGT') for _ in range(399)) + 'GAATTC' + 'NACGT'
+    oligos = [genome[i:i + rng.randint(2, 40)] for i in range(0, 380, 7)] + ['ACGTNACG', 'A', '']
+    expected = [reference_nn(oligo) if len(oligo) >= 2 and 'N' not in oligo else np.nan for oligo in oligos]
+    np.testing.assert_allclose(tm_batch(oligos), expected, atol=1e-9)
+
+    positions, values = tm_windows(genome, 6, step=3)
+    windows = [genome[start:start + 6] for start in positions]
+    expected = [reference_nn(w) if 'N' not in w else np.nan for w in windows]
+    np.testing.assert_allclose(values, expected, atol=1e-9)
+    assert 'GAATTC' in windows  # self-complementary window
+
+
+@pytest.mark.parametrize('method', ['simple', 'salt_adjusted', 'basic'])
+def test_composition_methods(method):
+    sequence = 'ATGCGCATTAGC'
+    gc, n = 6, len(sequence)
+    expected = {'simple': 4 * gc + 2 * (n - gc),
+                'salt_adjusted': 81.5 + 16.6 * math.log10(0.05) + 0.41 * 100 * gc / n - 600 / n,
+                'basic': 4 * gc + 2 * (n - gc)}[method]
+    assert melting_temperature(sequence, method) == pytest.approx(expected)
+
+
+def test_basic_long_oligo():
+    # more than 14 bases: 64.9 + 41 (GC - 16.4) / N
+    assert melting_temperature('ATGCGCATTAGC' * 2, 'basic') == pytest.approx(64.9 + 41 * (12 - 16.4) / 24)
+
+
+@pytest.mark.parametrize('sequence', ['ACGU', 'acgtu', 'ATCTCGCU', 'ACGTRYKMACGTNNACGU', 'UUUU'])
+def test_only_literal_acgt_is_counted(sequence):
+    upper = sequence.upper()
+    gc = upper.count('G') + upper.count('C')
+    at = upper.count('A') + upper.count('T')
+    n = len(sequence)
+    assert melting_temperature(sequence, 'simple') == 4 * gc + 2 * at
+    assert melting_temperature(sequence, 'salt_adjusted') == pytest.approx(
+        81.5 + 16.6 * math.log10(0.05) + 0.41 * 100 * gc / n - 600 / n)
+    assert melting_temperature(sequence, 'basic') == pytest.approx(
+        4 * gc + 2 * at if n <= 14 else 64.9 + 41 * (gc - 16.4) / n)
+    assert math.isnan(melting_temperature(sequence))
+    np.testing.assert_array_equal(tm_windows(sequence, 3, 'simple')[1],
+                                  tm_batch([sequence[i:i + 3] for i in range(n - 2)], 'simple'))
+
+
+@pytest.mark.parametrize('conditions', [{'na': 0}, {'na': -5}, {'oligo_concentration': 0},
+                                        {'na': np.array([50.0, 0.0])}])
+def test_concentrations_must_be_positive(conditions):
+    with pytest.raises(ValueError, match='must be positive'):
+        tm_batch(['ACGTACGT', 'GGCC'], 'salt_adjusted', **conditions)
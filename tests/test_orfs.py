@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from bioinf.labs import load_lab
+
+ex1 = load_lab('lab4/ex1.py')
+
+COMPLEMENT = str.maketrans('ACGTN', 'TGCAN')
+
+
+def brute_force_orfs(records, min_length, start_codons, partial):
+    """Walk every frame codon by codon, opening at a start and closing at a stop."""
+    starts = {codon.replace('T', 'U') for codon in start_codons}
+    orfs = []
+    for record, (name, seq) in enumerate(records):
+        seq = seq.upper().replace('U', 'T')
+        for frame in ex1.FRAMES:
+            strand = seq if frame > 0 else seq.translate(COMPLEMENT)[::-1]
+
+            def emit(begin, end, protein):
+                if len(protein) >= max(min_length, 1):
+                    a, b = (begin, end) if frame > 0 else (len(seq) - end, len(seq) - begin)
+                    orfs.append((record, name, '+' if frame > 0 else '-', frame, a, b, protein))
+
+            begin = None
+            end = abs(frame) - 1
+            for i in range(abs(frame) - 1, len(strand) - 2, 3):
+                codon = strand[i:i + 3].replace('T', 'U')
+                end = i + 3
+                if begin is None:
+                    if codon in starts:
+                        begin, protein = i, 'M'
+                elif codon in ex1.STOP_CODONS:
+                    emit(begin, end, protein)
+                    begin = None
+                else:
+                    protein += ex1.CODON_TABLE.get(codon, 'X')
+            if begin is not None and partial:
+                emit(begin, end, protein)
+    orfs.sort(key=lambda orf: (orf[0], orf[4], orf[5]))
+    return [orf[1:] for orf in orfs]
+
+
+def random_records(seed):
+    rng = random.Random(seed)
+    records = []
+    for i in range(6):
+        # biased towards ATG and stops so that ORFs are frequent
+        parts = [rng.choice(['ATG', 'TAA', 'TGA', 'TAG', 'GTG', 'N', 'A', 'C', 'G', 'T', 'CCG', 'GCA'])
+                 for _ in range(rng.randint(0, 150))]
+        records.append((f'r{i}', ''.join(parts)))
+    return records + [('empty', ''), ('short', 'AT'), ('rna', 'aug' + 'gcu' * 12 + 'uaa')]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('min_length,start_codons,partial', [
+    (1, ('AUG',), False),
+    (5, ('AUG',), True),
+    (0, ex1.ALTERNATIVE_START_CODONS, True),
+    (3, ex1.ALTERNATIVE_START_CODONS, False),
+])
+def test_six_frames_match_brute_force(seed, min_length, start_codons, partial):
+    records = random_records(seed)
+    found = ex1.find_orfs(records, min_length, start_codons, partial, processes=1)
+    assert found
+    assert found == brute_force_orfs(records, min_length, start_codons, partial)
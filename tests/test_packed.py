@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from bioinf.kmers import repeated_kmers
+from bioinf.labs import load_lab
+from bioinf.packed import PackedGenome, iter_code_blocks, pack_sequence
+
+
+def random_dna(length, seed, alphabet='ACGT' * 6 + 'N'):
+    rng = random.Random(seed)
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+@pytest.fixture
+def genome(tmp_path):
+    sequence = random_dna(5000, 1)
+    path = str(tmp_path / 'g.packed')
+    pack_sequence(sequence, path)
+    with PackedGenome(path) as packed:
+        yield sequence, packed
+
+
+def test_round_trip(genome):
+    sequence, packed = genome
+    assert len(packed) == len(sequence)
+    assert packed.sequence() == sequence
+    assert packed[1234:1300] == sequence[1234:1300]
+    assert ''.join(packed.sequence(start, start + len(codes)) for start, codes in
+                   iter_code_blocks(packed, 777)) == sequence
+
+
+def brute_force_repeats(sequence, k):
+    positions = {}
+    for i in range(len(sequence) - k + 1):
+        positions.setdefault(sequence[i:i + k], []).append(i)
+    return [(pattern, found) for pattern, found in positions.items() if len(found) > 1]
+
+
+@pytest.mark.parametrize('k', [1, 3, 6])
+def test_repeated_kmers_brute_force(k):
+    sequence = random_dna(800, k, 'ACGT' * 4 + 'Nnu')
+    assert repeated_kmers(sequence, k) == brute_force_repeats(sequence, k)
+
+
+def test_consumers_accept_packed_genome(genome):
+    sequence, packed = genome
+    detector = load_lab('lab7/dna_repetition_detector.py')
+    transposons = load_lab('lab8/find_transposons_real.py')
+    codons = load_lab('lab4/ex2.py')
+
+    assert detector.detect_repetitions(packed, 6, 8) == detector.detect_repetitions(sequence, 6, 8)
+    assert transposons.find_inverted_repeats(packed) == transposons.find_inverted_repeats(sequence)
+    assert list(codons.count_codons(packed).items()) == list(codons.count_codons(sequence).items())
+
+
+def brute_force_inverted_repeats(sequence, min_length, max_length, min_spacing, max_spacing):
+    """The original string comparison: any letter but A/C/G/T complements to N."""
+    complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
+    sequence = sequence.upper()
+    found = []
+    for length in range(max_length, min_length - 1, -1):
+        for i in range(len(sequence) - length):
+            left = sequence[i:i + length]
+            if 'N' in left:
+                continue
+            rc = ''.join(complement.get(base, 'N') for base in reversed(left))
+            for j in range(i + length + min_spacing, min(i + length + max_spacing, len(sequence) - length + 1)):
+                if sequence[j:j + length] == rc:
+                    found.append((length, i, j, left))
+    used = set()
+    filtered = []
+    for length, i, j, left in sorted(found, key=lambda x: (-x[0], x[1])):
+        positions = set(range(i, i + length)) | set(range(j, j + length))
+        if not positions & used:
+            filtered.append((i, j, left))
+            used |= positions
+    return filtered
+
+
+@pytest.mark.parametrize('alphabet', ['ACGTN', 'ACGTU' * 3 + 'RYN', 'acgtnuRN'])
+def test_inverted_repeats_brute_force(alphabet):
+    transposons = load_lab('lab8/find_transposons_real.py')
+    sequence = random_dna(600, len(alphabet), alphabet)
+    found = transposons.find_inverted_repeats(sequence, 3, 5, 2, 30)
+    assert [(ir['left_start'], ir['right_start'], ir['sequence']) for ir in found] == \
+        brute_force_inverted_repeats(sequence, 3, 5, 2, 30)
+    assert found
@@ -0,0 +1,94 @@
+import io
+import random
+
+import numpy as np
+import pytest
+
+from bioinf import pyramid
+from bioinf.chunked import chunk_columns
+from bioinf.pyramid import WindowPyramid, build_pyramid
+
+
+def reference_levels(values):
+    """Mean/min/max over every 2^k consecutive values, NaN skipped, until one bin is left."""
+    values = np.asarray(values, dtype=np.float32)
+    yield 0, values, None, None
+    level, size = 0, len(values)
+    while size > 1:
+        level += 1
+        size = (size + 1) // 2
+        groups = np.full(size << level, np.nan)
+        groups[:len(values)] = values
+        groups = groups.reshape(size, 1 << level)
+        present = ~np.isnan(groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(present, groups, 0).sum(axis=1) / present.sum(axis=1)
+        minimum = np.where(present, groups, np.inf).min(axis=1)
+        maximum = np.where(present, groups, -np.inf).max(axis=1)
+        empty = ~present.any(axis=1)
+        minimum[empty] = maximum[empty] = np.nan
+        yield level, mean, minimum, maximum
+
+
+def write_fasta(path, records):
+    with open(path, 'w') as f:
+        for name, sequence in records:
+            f.write(f'>{name}\n')
+            f.writelines(sequence[i:i + 60] + '\n' for i in range(0, len(sequence), 60))
+    return str(path)
+
+
+@pytest.mark.parametrize('block_levels', [2, 5, 20])
+def test_levels_match_in_memory(tmp_path, monkeypatch, block_levels):
+    monkeypatch.setattr(pyramid, 'BLOCK_LEVELS', block_levels)
+    rng = random.Random(3)
+    records = [(f'r{i}', ''.join(rng.choice('ACGTN') for _ in range(length)))
+               for i, length in enumerate([1000, 37, 10, 300])]
+    fasta = write_fasta(tmp_path / 'g.fa', records)
+    path = build_pyramid(fasta, window_size=10, columns=('GC', 'A'), chunk_size=64)
+
+    with WindowPyramid(path) as pyr:
+        for name, sequence in records:
+            expected = chunk_columns(sequence, 10, 1, ('GC', 'A'))
+            assert pyr.windows(name) == len(expected)
+            for column, values in zip(('GC', 'A'), expected.T):
+                for level, mean, minimum, maximum in reference_levels(values):
+                    entry = pyr.records[name]['columns'][column][level]
+                    assert entry['bins'] == len(mean)
+                    np.testing.assert_allclose(pyr._array(entry, 0, 0, len(mean)), mean, rtol=1e-6)
+                    if minimum is not None:
+                        np.testing.assert_array_equal(pyr._array(entry, 1, 0, len(mean)), minimum)
+                        np.testing.assert_array_equal(pyr._array(entry, 2, 0, len(mean)), maximum)
+                assert len(pyr.records[name]['columns'][column]) == level + 1
+
+
+def test_short_record_has_empty_entry(tmp_path):
+    fasta = write_fasta(tmp_path / 'g.fa', [('long', 'ACGT' * 20), ('short', 'ACG'), ('empty', '')])
+    with WindowPyramid(build_pyramid(fasta, window_size=10)) as pyr:
+        assert list(pyr.records) == ['long', 'short', 'empty']
+        assert pyr.windows('short') == pyr.windows('empty') == 0
+        assert len(pyr.profile('short')[2]) == 0
+
+
+def test_duplicate_names_rejected(tmp_path):
+    fasta = write_fasta(tmp_path / 'g.fa', [('a', 'ACGT' * 10), ('b', 'ACGT' * 10), ('a', 'GGCC' * 10)])
+    with pytest.raises(ValueError, match="Duplicate record name 'a'"):
+        build_pyramid(fasta, window_size=5)
+
+
+@pytest.mark.parametrize('windows', [1, 2, 7, 64, 300])
+def test_write_levels_skips_nan(tmp_path, monkeypatch, windows):
+    monkeypatch.setattr(pyramid, 'BLOCK_LEVELS', 3)
+    values = np.random.default_rng(windows).random(windows).astype(np.float32)
+    values[windows // 3:windows // 3 + 20] = np.nan
+    spool = io.BytesIO(values.astype('<f4').tobytes())
+    out = io.BytesIO()
+    levels = pyramid._write_levels(out, spool, windows)
+    data = out.getvalue()
+
+    expected = list(reference_levels(values))
+    assert len(levels) == len(expected)
+    for entry, (level, mean, minimum, maximum) in zip(levels, expected):
+        arrays = [mean] if minimum is None else [mean, minimum, maximum]
+        written = np.frombuffer(data, dtype='<f4', count=len(arrays) * entry['bins'], offset=entry['offset'])
+        np.testing.assert_allclose(written, np.concatenate(arrays), rtol=1e-6)
@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from bioinf.labs import load_lab
+
+ex2 = load_lab('LAB3/ex2.py')
+
+
+@pytest.mark.parametrize('window', [8, 20])
+def test_windows_match_calculate_melting_temperature(window):
+    rng = random.Random(5)
+    # U and IUPAC letters are not counted by calculate_melting_temperature
+    sequence = 'ATCTCGCU' + ''.join(rng.choice('ACGTACGTUNRY') for _ in range(300))
+    rows = ex2.sliding_window_tm(sequence, window)
+    assert len(rows) == len(sequence) - window + 1
+    for position, subsequence, tm in rows:
+        assert subsequence == sequence[position:position + window]
+        assert tm == pytest.approx(ex2.calculate_melting_temperature(subsequence))
+
+
+def test_u_is_not_counted():
+    assert ex2.sliding_window_tm('ATCTCGCU', 8) == [(0, 'ATCTCGCU', 22.0)]
+    profile = ex2.sliding_window_tm('ATCTCGCUR', 8, vectorized=True)
+    assert list(profile) == [(0, 'ATCTCGCU', 22.0), (1, 'TCTCGCUR', 20.0)]
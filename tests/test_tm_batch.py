@@ -0,0 +1,36 @@
+import io
+
+import numpy as np
+import pytest
+
+from bioinf.labs import load_lab
+
+ex1 = load_lab('LAB3/ex1.py')
+
+
+def test_tsv_na_column(tmp_path):
+    path = tmp_path / 'oligos.tsv'
+    path.write_text('name\tsequence\tna\na\tACGTACGT\t100\nb\tGGCCAATT\t\nc\tACGU\n')
+    out = io.StringIO()
+    assert ex1.run_batch(str(path), out, ['simple', 'salt_adjusted'], na_concentration=50) == (3, 1)
+    rows = [line.split(',') for line in out.getvalue().splitlines()[1:]]
+    assert [row[4] for row in rows] == ['100.0', '50.0', '50.0']
+    assert rows[0][6] == str(round(ex1.calculate_tm_salt_adjusted('ACGTACGT', 100), 2))
+    assert rows[2][3:] == ['False', '50.0', '', '']
+
+
+@pytest.mark.parametrize('na', ['0', '-1'])
+def test_tsv_na_must_be_positive(tmp_path, na):
+    path = tmp_path / 'oligos.tsv'
+    path.write_text(f'a\tACGT\t50\nb\tACGG\t{na}\n')
+    with pytest.raises(ValueError, match="oligo 'b': Na\\+ concentration must be positive"):
+        ex1.run_batch(str(path), io.StringIO())
+
+
+def test_na_option_must_be_positive(capsys):
+    with pytest.raises(SystemExit) as error:
+        ex1.main(['--batch', '-', '--na', '0'])
+    assert error.value.code == 2
+    assert '--na: must be positive' in capsys.readouterr().err
+    with pytest.raises(ValueError, match='must be positive'):
+        ex1.batch_tm(['ACGT'], na_concentrations=np.array([-1.0]))